@@ -1133,4 +1133,4 @@ def optimize_empire_revenue():
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"🏰 Starting Dr. Dédé's $50M+ AI Empire System on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
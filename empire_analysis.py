@@ -0,0 +1,267 @@
+"""
+Empire analysis engine - funnel, contact-effectiveness and cohort analysis
+Leads are read in columnar chunks and folded into running aggregates; each run
+only re-reads leads and activities written since the previous run's watermark
+"""
+
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from empire_timeseries import WEEK, bucket_start
+
+# Pipeline stages in funnel order; closed_lost sits outside the funnel
+FUNNEL_STAGES = ["prospect", "contacted", "qualified", "proposal", "negotiation", "closed_won"]
+LOST_STAGE = "closed_lost"
+
+# Leads at or past this stage count as advanced
+ADVANCED_STAGE = "qualified"
+
+# contact_attempts buckets used for the effectiveness table (the last one is open-ended)
+CONTACT_BUCKETS = [0, 1, 2, 3]
+
+def stage_rank(stage: Optional[str]) -> int:
+    """Position of a stage in the funnel (-1 for lost or unknown stages)"""
+    try:
+        return FUNNEL_STAGES.index(stage or "prospect")
+    except ValueError:
+        return -1
+
+def _contact_bucket(attempts: Optional[int]) -> str:
+    attempts = attempts or 0
+    if attempts >= CONTACT_BUCKETS[-1]:
+        return f"{CONTACT_BUCKETS[-1]}+"
+    return str(attempts)
+
+class EmpireAnalysisEngine:
+    """Incremental funnel, contact-effectiveness and lead-age cohort analysis"""
+
+    def __init__(self, db_path: str = 'empire_business.db', chunk_size: int = 5000):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def init_schema(self, cursor):
+        """Change tracking for the incremental fold: watermark index, update stamp and delete tombstones
+        (called from init_empire_database)"""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_changed ON leads (COALESCE(updated_ts, 0), id)")
+        # The other entry modules update leads without touching updated_ts; stamp those rows so the fold sees them
+        cursor.execute("""CREATE TRIGGER IF NOT EXISTS leads_updated_ts_touch AFTER UPDATE ON leads
+            WHEN NEW.updated_ts IS OLD.updated_ts
+            BEGIN
+                UPDATE leads SET updated_ts = CAST(strftime('%s', 'now') AS INTEGER) WHERE rowid = NEW.rowid;
+            END""")
+        # Deleted leads leave a tombstone so their contribution can be backed out
+        # (INSERT OR REPLACE does not fire it: the replacing row is folded as an update instead)
+        cursor.execute("""CREATE TABLE IF NOT EXISTS lead_tombstones (
+            id INTEGER PRIMARY KEY,
+            lead_id TEXT NOT NULL,
+            deleted_ts INTEGER
+        )""")
+        cursor.execute("""CREATE TRIGGER IF NOT EXISTS leads_tombstone AFTER DELETE ON leads
+            BEGIN
+                INSERT INTO lead_tombstones (lead_id, deleted_ts) VALUES (OLD.id, CAST(strftime('%s', 'now') AS INTEGER));
+            END""")
+
+    def _reset(self):
+        # Contribution of every lead seen so far, so updated leads can be backed out
+        self._contributions: Dict[str, tuple] = {}
+        self._funnel = Counter()          # (stream, stage) -> leads
+        self._funnel_value = Counter()    # (stream, stage) -> pipeline value
+        self._contacts = Counter()        # (bucket, advanced) -> leads
+        self._cohorts = Counter()         # (week, metric) -> value
+        self._activities = Counter()      # action_type -> count
+        self._lead_activities = Counter() # activity_type -> count
+        self._lead_watermark = 0
+        self._activity_watermark = 0
+        self._lead_activity_watermark = 0
+        self._tombstone_watermark = 0
+
+    def _apply(self, contribution: tuple, sign: int):
+        stream, stage, bucket, advanced, week, contacted, deal_value = contribution
+        self._funnel[(stream, stage)] += sign
+        self._funnel_value[(stream, stage)] += sign * deal_value
+        self._contacts[(bucket, advanced)] += sign
+        self._cohorts[(week, "leads")] += sign
+        self._cohorts[(week, "contacted")] += sign * contacted
+        self._cohorts[(week, "advanced")] += sign * advanced
+        self._cohorts[(week, "pipeline")] += sign * deal_value
+
+    def _fold_leads(self, cursor) -> int:
+        """Fold leads changed since the watermark into the aggregates; returns rows read"""
+        rows_read = 0
+        last_ts, last_id = self._lead_watermark, ""
+        while True:
+            cursor.execute("""
+                SELECT id, COALESCE(updated_ts, 0), revenue_stream, stage,
+                       contact_attempts, created_ts, deal_value
+                FROM leads
+                WHERE COALESCE(updated_ts, 0) >= ? AND (COALESCE(updated_ts, 0), id) > (?, ?)
+                ORDER BY COALESCE(updated_ts, 0), id
+                LIMIT ?
+            """, (last_ts, last_ts, last_id, self.chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            rows_read += len(rows)
+
+            # Columnar extract: one list per column, derived columns computed in bulk
+            ids, updated, streams, stages, attempts, created, values = map(list, zip(*rows))
+            stages = [stage or "prospect" for stage in stages]
+            ranks = [stage_rank(stage) for stage in stages]
+            advanced_rank = stage_rank(ADVANCED_STAGE)
+            advanced = [1 if rank >= advanced_rank else 0 for rank in ranks]
+            buckets = [_contact_bucket(count) for count in attempts]
+            contacted = [1 if count else 0 for count in attempts]
+            weeks = [bucket_start(ts or 0, "week") for ts in created]
+            values = [value or 0 for value in values]
+
+            for lead_id, contribution in zip(ids, zip(streams, stages, buckets, advanced, weeks, contacted, values)):
+                previous = self._contributions.get(lead_id)
+                if previous == contribution:
+                    continue
+                if previous is not None:
+                    self._apply(previous, -1)
+                self._apply(contribution, 1)
+                self._contributions[lead_id] = contribution
+
+            last_ts, last_id = updated[-1], ids[-1]
+        # Re-read the boundary second next time; unchanged rows are skipped above
+        self._lead_watermark = last_ts
+        return rows_read
+
+    def _fold_deletes(self, cursor) -> int:
+        """Back out leads deleted since the tombstone watermark; returns leads removed"""
+        cursor.execute("SELECT id, lead_id FROM lead_tombstones WHERE id > ? ORDER BY id", (self._tombstone_watermark,))
+        removed = 0
+        for tombstone_id, lead_id in cursor.fetchall():
+            previous = self._contributions.pop(lead_id, None)
+            if previous is not None:
+                self._apply(previous, -1)
+                removed += 1
+            self._tombstone_watermark = tombstone_id
+        return removed
+
+    def _fold_counts(self, cursor, table: str, column: str, watermark: int, counter: Counter) -> int:
+        """Count append-only rows past an id watermark; returns the new watermark"""
+        cursor.execute(f"SELECT {column}, COUNT(*), MAX(id) FROM {table} WHERE id > ? GROUP BY {column}", (watermark,))
+        for key, count, max_id in cursor.fetchall():
+            counter[key] += count
+            watermark = max(watermark, max_id)
+        return watermark
+
+    def run(self, full: bool = False) -> Dict:
+        """Bring the aggregates up to date and return the analysis report"""
+        started = time.time()
+        with self._lock:
+            if full:
+                self._reset()
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            # Deletes first: a lead deleted and written again is then folded back in as a new row
+            leads_removed = self._fold_deletes(cursor)
+            leads_read = self._fold_leads(cursor)
+            self._activity_watermark = self._fold_counts(
+                cursor, "activities", "action_type", self._activity_watermark, self._activities)
+            self._lead_activity_watermark = self._fold_counts(
+                cursor, "lead_activities", "activity_type", self._lead_activity_watermark, self._lead_activities)
+            conn.close()
+            report = self._report()
+        report["stats"] = {
+            "leads_read": leads_read,
+            "leads_removed": leads_removed,
+            "leads_tracked": len(self._contributions),
+            "seconds": round(time.time() - started, 4)
+        }
+        return report
+
+    def _report(self) -> Dict:
+        funnel = {}
+        for (stream, stage), count in self._funnel.items():
+            if count:
+                funnel.setdefault(stream, {})[stage] = count
+        funnel_report = {}
+        for stream, stages in funnel.items():
+            total = sum(stages.values())
+            # Leads that reached each stage = leads currently at it or further down the funnel
+            reached = {stage: sum(count for other, count in stages.items() if stage_rank(other) >= rank)
+                       for rank, stage in enumerate(FUNNEL_STAGES)}
+            funnel_report[stream] = {
+                "leads": total,
+                "pipeline_value": int(sum(self._funnel_value[(stream, stage)] for stage in stages)),
+                "stages": stages,
+                "conversion": {stage: round(reached[stage] / total, 4) if total else 0.0 for stage in FUNNEL_STAGES},
+                "lost": stages.get(LOST_STAGE, 0)
+            }
+
+        contact_report = {}
+        for (bucket, advanced), count in self._contacts.items():
+            row = contact_report.setdefault(bucket, {"leads": 0, "advanced": 0})
+            row["leads"] += count
+            row["advanced"] += count * advanced
+        for row in contact_report.values():
+            row["advance_rate"] = round(row["advanced"] / row["leads"], 4) if row["leads"] else 0.0
+
+        now = time.time()
+        cohort_report = []
+        for week in sorted({week for week, _ in self._cohorts}):
+            leads = self._cohorts[(week, "leads")]
+            if not leads:
+                continue
+            cohort_report.append({
+                "week_start": week,
+                "age_weeks": int((bucket_start(now, "week") - week) // WEEK),
+                "leads": leads,
+                "contacted_rate": round(self._cohorts[(week, "contacted")] / leads, 4),
+                "advanced_rate": round(self._cohorts[(week, "advanced")] / leads, 4),
+                "pipeline_value": int(self._cohorts[(week, "pipeline")])
+            })
+
+        report = {
+            "funnel": funnel_report,
+            "contact_effectiveness": contact_report,
+            "cohorts": cohort_report,
+            "activity_counts": dict(self._activities),
+            "lead_activity_counts": dict(self._lead_activities)
+        }
+        report["insights"] = self._insights(report)
+        return report
+
+    def _insights(self, report: Dict) -> List[str]:
+        funnel = report["funnel"]
+        if not funnel:
+            return ["No leads in the pipeline yet - generate leads to unlock funnel analysis"]
+
+        insights = []
+        top_pipeline = max(funnel.items(), key=lambda item: item[1]["pipeline_value"])
+        insights.append(f"{top_pipeline[0]} holds the largest pipeline: "
+                        f"${top_pipeline[1]['pipeline_value']:,} across {top_pipeline[1]['leads']} leads")
+
+        best = max(funnel.items(), key=lambda item: item[1]["conversion"][ADVANCED_STAGE])
+        insights.append(f"{best[0]} converts {best[1]['conversion'][ADVANCED_STAGE]:.0%} of leads to {ADVANCED_STAGE}")
+
+        contacts = report["contact_effectiveness"]
+        never = contacts.get("0", {"leads": 0, "advance_rate": 0.0})
+        contacted = [row for bucket, row in contacts.items() if bucket != "0"]
+        contacted_leads = sum(row["leads"] for row in contacted)
+        if contacted_leads:
+            contacted_rate = sum(row["advanced"] for row in contacted) / contacted_leads
+            insights.append(f"Contacted leads advance at {contacted_rate:.0%} vs {never['advance_rate']:.0%} for leads never contacted")
+        else:
+            insights.append(f"None of the {never['leads']} leads have been contacted yet - outreach is the bottleneck")
+
+        stale = sum(cohort["leads"] * (1 - cohort["contacted_rate"])
+                    for cohort in report["cohorts"] if cohort["age_weeks"] >= 2)
+        if stale:
+            insights.append(f"{int(round(stale))} leads older than two weeks have never been contacted")
+        elif report["cohorts"]:
+            newest = report["cohorts"][-1]
+            insights.append(f"Newest cohort: {newest['leads']} leads, {newest['contacted_rate']:.0%} contacted so far")
+
+        if report["activity_counts"]:
+            action, count = max(report["activity_counts"].items(), key=lambda item: item[1])
+            insights.append(f"Most frequent automation: {action} ({count} runs)")
+        return insights
@@ -0,0 +1,650 @@
+"""
+Empire benchmarks - load tests for a running empire server and in-process micro-benchmarks
+    python empire_bench.py http --url http://127.0.0.1:5000/ --concurrency 16 --duration 10
+    python empire_bench.py templates --iterations 200
+    python empire_bench.py bytes --path / --path /empire-leads
+    python empire_bench.py jobs --workers 1 --workers 4 --jobs 200
+    python empire_bench.py outreach --concurrency 1 --concurrency 8 --messages 1000
+    python empire_bench.py smtp-sink --port 1025
+    python empire_bench.py followups --pending 10000 --pending 300000
+    python empire_bench.py content --concurrency 1 --concurrency 8 --pieces 200 --latency 0.05
+    python empire_bench.py provider-cache --pieces 200 --latency 0.05
+    python empire_bench.py ratelimit --processes 4 --per-minute 6000 --seconds 5
+    python empire_bench.py resilience --workers 32 --phase-seconds 4
+"""
+
+import argparse
+import http.client
+import importlib
+import multiprocessing
+import os
+import random
+import re
+import socketserver
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def http_load(url: str, concurrency: int = 16, duration: float = 10.0, method: str = "GET") -> Dict:
+    """Hit url from concurrency keep-alive clients for duration seconds"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    deadline = time.time() + duration
+    lock = threading.Lock()
+    latencies: List[float] = []
+    errors = [0]
+
+    def client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        local_latencies, local_errors = [], 0
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request(method, path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                local_latencies.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.time()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 2)
+        }
+    }
+
+def template_render(module_name: str = "final_working_empire", iterations: int = 200) -> List[Dict]:
+    """Per-render time of each registered template, compiled per call vs from the registry"""
+    # Import the app without its background threads
+    os.environ["EMPIRE_DEFER_BACKGROUND"] = "1"
+    module = importlib.import_module(module_name)
+    from flask import render_template, render_template_string
+
+    contexts = {
+        "empire_dashboard.html": module.dashboard_context,
+        "empire_leads.html": module.leads_context,
+        "empire_lead_cards.html": lambda: module.lead_cards_context(module.EMPIRE_REVENUE_STREAMS[0])
+    }
+    results = []
+    with module.app.test_request_context("/"):
+        for name, source in module.EMPIRE_TEMPLATES.items():
+            context = contexts[name]()
+            timings = {}
+            for mode, render in (("render_template_string", lambda: render_template_string(source, **context)),
+                                 ("render_template", lambda: render_template(name, **context))):
+                render()
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    render()
+                timings[mode] = (time.perf_counter() - started) / iterations * 1000
+            results.append({
+                "template": name,
+                "iterations": iterations,
+                "per_render_ms": {mode: round(value, 3) for mode, value in timings.items()},
+                "speedup": round(timings["render_template_string"] / timings["render_template"], 1)
+            })
+    return results
+
+def page_bytes(module_name: str = "final_working_empire", paths: List[str] = None) -> List[Dict]:
+    """Bytes per page view for each content encoding: first view (page + assets) and repeat view (page only)"""
+    os.environ["EMPIRE_DEFER_BACKGROUND"] = "1"
+    module = importlib.import_module(module_name)
+    from empire_http import brotli
+    client = module.app.test_client()
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    results = []
+    for path in paths or ["/", "/empire-leads"]:
+        page = client.get(path).get_data(as_text=True)
+        assets = sorted(set(re.findall(r'"(/assets/[^"]+)"', page)))
+        sizes = {}
+        for encoding in encodings:
+            headers = {"Accept-Encoding": encoding}
+            html = len(client.get(path, headers=headers).get_data())
+            asset_bytes = sum(len(client.get(asset, headers=headers).get_data()) for asset in assets)
+            sizes[encoding] = {"html": html, "assets": asset_bytes, "first_view": html + asset_bytes, "repeat_view": html}
+        results.append({"path": path, "assets": assets, "bytes": sizes})
+    return results
+
+def job_throughput(workers: int, jobs: int = 200, job_seconds: float = 0.01) -> Dict:
+    """Drain jobs I/O-bound jobs (sleeping job_seconds each) through a fresh queue with workers threads"""
+    from empire_jobs import JobManager
+    with tempfile.TemporaryDirectory() as folder:
+        manager = JobManager(os.path.join(folder, "jobs.db"), workers=workers, poll_interval=0.05)
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        manager.init_schema(conn.cursor())
+        conn.commit()
+        manager.register("sleep", lambda progress, n: time.sleep(job_seconds))
+        for n in range(jobs):
+            manager.submit("sleep", n=n)
+
+        started = time.perf_counter()
+        manager.start()
+        while conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'running')").fetchone()[0]:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        manager.stop()
+        conn.close()
+    return {
+        "workers": workers,
+        "jobs": jobs,
+        "seconds": round(elapsed, 3),
+        "jobs_per_second": round(jobs / elapsed, 1)
+    }
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server that accepts and counts messages (stand-in for a real relay)"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), delay: float = 0.0, refuse: tuple = ()):
+        self.delay = delay
+        # Recipients answered with 550 at RCPT
+        self.refuse = {address.lower() for address in refuse}
+        self.messages = 0
+        self.sessions = 0
+        self.rcpt = Counter()
+        self._lock = threading.Lock()
+        super().__init__(address, _SMTPSinkHandler)
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        with self.server._lock:
+            self.server.sessions += 1
+        self.reply("220 empire-sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.wfile.write(b"250-empire-sink\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                # Simulated relay latency per accepted message
+                if self.server.delay:
+                    time.sleep(self.server.delay)
+                with self.server._lock:
+                    self.server.messages += 1
+                self.reply("250 OK queued")
+            elif command == "RCPT":
+                address = line.decode(errors="replace").split(":", 1)[-1].strip().strip("<>").lower()
+                with self.server._lock:
+                    self.server.rcpt[address] += 1
+                self.reply("550 No such user" if address in self.server.refuse else "250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+def outreach_throughput(concurrency: int, messages: int = 1000, domains: int = 50,
+                        domain_per_minute: float = 0.0, smtp_delay: float = 0.002) -> Dict:
+    """Send messages personalized emails to a local SMTP sink through the outreach engine"""
+    from empire_outreach import OutreachEngine, SMTPPool
+    sink = SMTPSink(delay=smtp_delay).start()
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "outreach.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""CREATE TABLE leads (id TEXT PRIMARY KEY, name TEXT, email TEXT, company TEXT, title TEXT,
+                        industry TEXT, revenue_stream TEXT, icp_score REAL, stage TEXT, contact_attempts INTEGER DEFAULT 0,
+                        last_contact TEXT, updated_at TEXT, last_contact_ts INTEGER, updated_ts INTEGER)""")
+        conn.execute("""CREATE TABLE lead_activities (id INTEGER PRIMARY KEY, lead_id TEXT, activity_type TEXT,
+                        description TEXT, timestamp TEXT, timestamp_ts INTEGER)""")
+        conn.executemany("INSERT INTO leads (id, name, email, company, title, industry, revenue_stream, icp_score, stage) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'prospect')",
+                         [(f"lead_{n}", f"Dr. Test Lead{n}", f"lead{n}@domain{n % domains}.example", f"Company {n}",
+                           "CTO", "Technology", "Job/Advisor Search", 0.9) for n in range(messages)])
+        conn.commit()
+
+        pool = SMTPPool("127.0.0.1", sink.server_address[1], size=concurrency)
+        engine = OutreachEngine(pool, db_path=db_path, concurrency=concurrency, domain_per_minute=domain_per_minute)
+        report = engine.run(engine.select_leads(limit=messages))
+        pool.close()
+        contacted = conn.execute("SELECT COUNT(*) FROM leads WHERE contact_attempts = 1").fetchone()[0]
+        conn.close()
+    sink.shutdown()
+    sink.server_close()
+    return {**report, "concurrency": concurrency, "sink_messages": sink.messages,
+            "sink_sessions": sink.sessions, "leads_recorded": contacted}
+
+def followup_wheel(pending: int, horizon_days: float = 30, advance_hours: float = 24) -> Dict:
+    """Rebuild a follow-up wheel from pending SQLite rows, then advance it tick by tick"""
+    from empire_followups import FollowUpScheduler
+    with tempfile.TemporaryDirectory() as folder:
+        scheduler = FollowUpScheduler(None, db_path=os.path.join(folder, "followups.db"))
+        conn = sqlite3.connect(scheduler.db_path)
+        scheduler.init_schema(conn.cursor())
+        now = time.time()
+        conn.executemany("INSERT INTO followups (lead_id, due_ts, state, created_ts) VALUES (?, ?, 'pending', ?)",
+                         [(f"lead_{n}", int(now + random.uniform(0, horizon_days * 86400)), int(now))
+                          for n in range(pending)])
+        conn.commit()
+        conn.close()
+        scheduler.rebuild()
+
+    wheel = scheduler.wheel
+    started = time.perf_counter()
+    added = 1000
+    for n in range(added):
+        wheel.add(("extra", n), now + random.uniform(0, horizon_days * 86400))
+    add_us = (time.perf_counter() - started) / added * 1e6
+
+    ticks = int(advance_hours * 3600 / wheel.tick)
+    fired = 0
+    started = time.perf_counter()
+    for n in range(1, ticks + 1):
+        fired += len(wheel.advance(now + n * wheel.tick))
+    elapsed = time.perf_counter() - started
+    return {
+        "pending": pending,
+        "rebuild_seconds": scheduler.rebuild_seconds,
+        "add_us": round(add_us, 2),
+        "ticks": ticks,
+        "fired": fired,
+        "tick_us": round(elapsed / ticks * 1e6, 2),
+        "cascaded": wheel.cascaded
+    }
+
+def content_throughput(concurrency: int, pieces: int = 200, latency: float = 0.05, batch_size: int = 20) -> Dict:
+    """Run the content pipeline against the template provider with simulated call latency"""
+    from empire_content import ContentPipeline, TemplateProvider
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "content.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""CREATE TABLE content_pieces (id INTEGER PRIMARY KEY, title TEXT, platform TEXT, content_type TEXT,
+                        status TEXT, engagement_score REAL, created_at TEXT, created_ts INTEGER)""")
+        pipeline = ContentPipeline(TemplateProvider(latency), db_path=db_path, concurrency=concurrency, batch_size=batch_size)
+        pipeline.init_schema(conn.cursor())
+        conn.commit()
+        report = pipeline.create(pieces)
+        report["rows"] = conn.execute("SELECT COUNT(*) FROM content_pieces").fetchone()[0]
+        conn.close()
+    return report
+
+def provider_cache_runs(pieces: int = 200, latency: float = 0.05, concurrency: int = 8, runs: int = 3) -> List[Dict]:
+    """Replay one content plan through a CachedProvider (as a retried job would): the first run pays for every call"""
+    from empire_cache import ProviderCache, request_key
+    from empire_content import CachedProvider, ContentPipeline, TemplateProvider
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "content.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""CREATE TABLE content_pieces (id INTEGER PRIMARY KEY, title TEXT, platform TEXT, content_type TEXT,
+                        status TEXT, engagement_score REAL, created_at TEXT, created_ts INTEGER)""")
+        cache = ProviderCache(os.path.join(folder, "provider_cache.db"))
+        pipeline = ContentPipeline(CachedProvider(TemplateProvider(latency), cache), db_path=db_path,
+                                   concurrency=concurrency)
+        pipeline.init_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+        requests_planned = pipeline.plan(pieces)
+        # Every request in a plan carries its own variation, so there are no duplicates within a run
+        unique = len({request_key("content", request) for request in requests_planned})
+        for run in range(runs):
+            report = pipeline.run(requests_planned)
+            results.append({"run": run + 1, "unique_requests": unique, "seconds": report["seconds"],
+                            "generate_p50_ms": report["stages"]["generate"]["p50_ms"], **cache.stats()})
+    return results
+
+def _rate_limit_worker(path: str, bucket: str, deadline: float, results):
+    from empire_ratelimit import SharedRateLimiter
+    limiter = SharedRateLimiter(path)
+    granted = 0
+    while True:
+        wait = limiter.reserve(bucket)
+        if time.time() + wait > deadline:
+            break
+        time.sleep(wait)
+        granted += 1
+    results.put(granted)
+
+def rate_limit_accuracy(processes: int, per_minute: float, seconds: float, shared: bool = True) -> Dict:
+    """Calls granted across processes in seconds: one shared bucket, or one full-quota bucket per process"""
+    from empire_ratelimit import SharedRateLimiter
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "ratelimit.db")
+        limiter = SharedRateLimiter(path)
+        buckets = ["provider"] if shared else [f"provider_{n}" for n in range(processes)]
+        for bucket in buckets:
+            limiter.configure(bucket, per_minute, burst=per_minute / 60)
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        deadline = time.time() + seconds
+        workers = [context.Process(target=_rate_limit_worker, args=(path, buckets[n % len(buckets)], deadline, results))
+                   for n in range(processes)]
+        for worker in workers:
+            worker.start()
+        granted = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        started = time.perf_counter()
+        limiter.configure("overhead", 1e9, burst=1e9)
+        for _ in range(1000):
+            limiter.reserve("overhead")
+        reserve_us = (time.perf_counter() - started) / 1000 * 1e6
+    quota = per_minute / 60 * seconds + per_minute / 60
+    return {
+        "processes": processes,
+        "shared": shared,
+        "granted": sum(granted),
+        "per_process": granted,
+        "quota": round(quota),
+        "ratio_to_quota": round(sum(granted) / quota, 3),
+        "reserve_us": round(reserve_us, 1)
+    }
+
+class FlakyService:
+    """Stand-in provider: latency grows once load passes capacity, with injected failures and slow tails"""
+
+    def __init__(self, latency: float = 0.05, capacity: int = 16, failure_rate: float = 0.0,
+                 tail_rate: float = 0.0, tail_latency: float = 0.5, timeout: float = 1.0):
+        self.latency = latency
+        self.capacity = capacity
+        self.failure_rate = failure_rate
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.timeout = timeout
+        self.inflight = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _done(self):
+        with self._lock:
+            self.inflight -= 1
+
+    def call(self, *args) -> str:
+        with self._lock:
+            self.inflight += 1
+            self.calls += 1
+            load = self.inflight
+        latency = self.latency * max(1.0, load / self.capacity)
+        if random.random() < self.tail_rate:
+            latency += self.tail_latency
+        if latency > self.timeout:
+            time.sleep(self.timeout)
+            # The caller gives up, but the provider keeps working on the abandoned request
+            threading.Timer(latency - self.timeout, self._done).start()
+            raise TimeoutError(f"timed out after {self.timeout}s")
+        time.sleep(latency)
+        self._done()
+        if random.random() < self.failure_rate:
+            raise ConnectionError("injected failure")
+        return "ok"
+
+# (phase, provider capacity, failure rate)
+RESILIENCE_PHASES = [("healthy", 16, 0.01), ("degraded", 2, 0.05), ("outage", 16, 1.0), ("recovered", 16, 0.01)]
+
+def resilience_scenario(resilient: bool, workers: int = 32, phase_seconds: float = 4.0) -> List[Dict]:
+    """Closed-loop callers against a FlakyService that degrades, fails and recovers; plain calls vs ResilientClient"""
+    from empire_resilience import CircuitBreaker, ProviderUnavailable, ResilientClient
+    service = FlakyService(timeout=0.5)
+    client = ResilientClient("bench", max_concurrency=workers, queue_timeout=1.0,
+                             breaker=CircuitBreaker(reset_timeout=1.0))
+    phases = {name: {"phase": name, "succeeded": 0, "failed": 0, "rejected": 0, "provider_calls": 0, "latencies": []}
+              for name, _, _ in RESILIENCE_PHASES}
+    lock = threading.Lock()
+    current = {"phase": RESILIENCE_PHASES[0][0]}
+    stop = threading.Event()
+
+    def caller():
+        while not stop.is_set():
+            started = time.perf_counter()
+            outcome = "succeeded"
+            try:
+                client.call(service.call) if resilient else service.call()
+            except ProviderUnavailable:
+                outcome = "rejected"
+            except Exception:
+                outcome = "failed"
+            with lock:
+                stats = phases[current["phase"]]
+                stats[outcome] += 1
+                if outcome == "succeeded":
+                    stats["latencies"].append(time.perf_counter() - started)
+            if outcome == "rejected":
+                # A caller turned away moves on to other work before its next provider call
+                time.sleep(0.05)
+
+    threads = [threading.Thread(target=caller, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for name, capacity, failure_rate in RESILIENCE_PHASES:
+        calls_before = service.calls
+        with lock:
+            current["phase"] = name
+            service.capacity, service.failure_rate = capacity, failure_rate
+        time.sleep(phase_seconds)
+        phases[name]["provider_calls"] = service.calls - calls_before
+        phases[name]["concurrency_limit"] = round(client.concurrency.limit, 1) if resilient else workers
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results = []
+    for stats in phases.values():
+        latencies = stats.pop("latencies")
+        results.append({**stats, "goodput": round(stats["succeeded"] / phase_seconds, 1),
+                        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1)})
+    return results
+
+def hedging_latency(hedge_percentile: Optional[float], workers: int = 8, calls: int = 2000) -> Dict:
+    """Idempotent lookups with a 5% slow tail, with and without hedging"""
+    from empire_resilience import ResilientClient
+    service = FlakyService(latency=0.02, capacity=1000, tail_rate=0.05, tail_latency=0.5, timeout=5.0)
+    # A losing attempt keeps its slot until it returns, so leave room for the slow tail
+    client = ResilientClient("bench", max_concurrency=workers * 4, hedge_percentile=hedge_percentile)
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(count: int):
+        for _ in range(count):
+            started = time.perf_counter()
+            client.call(service.call, idempotent=True)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=caller, args=(calls // workers,)) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = client.stats()
+    return {
+        "hedge_percentile": hedge_percentile,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+        "provider_calls": service.calls,
+        "hedged": stats["hedged"],
+        "hedge_wins": stats["hedge_wins"]
+    }
+
+def _print_result(result: Dict):
+    latency = result["latency_ms"]
+    print(f"{result['url']}: {result['requests']} requests in {result['seconds']}s "
+          f"({result['requests_per_second']} req/s, {result['errors']} errors) "
+          f"latency mean {latency['mean']}ms p50 {latency['p50']}ms p95 {latency['p95']}ms p99 {latency['p99']}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Empire benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    http_parser = commands.add_parser("http", help="HTTP load test against a running server")
+    http_parser.add_argument("--url", action="append", help="URL to load (repeatable)")
+    http_parser.add_argument("--concurrency", type=int, default=16)
+    http_parser.add_argument("--duration", type=float, default=10.0)
+    http_parser.add_argument("--method", default="GET")
+
+    templates_parser = commands.add_parser("templates", help="Per-request template render time")
+    templates_parser.add_argument("--module", default="final_working_empire")
+    templates_parser.add_argument("--iterations", type=int, default=200)
+
+    bytes_parser = commands.add_parser("bytes", help="Bytes per page view with and without compression")
+    bytes_parser.add_argument("--module", default="final_working_empire")
+    bytes_parser.add_argument("--path", action="append", help="page to measure (repeatable)")
+
+    jobs_parser = commands.add_parser("jobs", help="Job queue throughput by worker count")
+    jobs_parser.add_argument("--workers", type=int, action="append", help="worker threads (repeatable)")
+    jobs_parser.add_argument("--jobs", type=int, default=200)
+    jobs_parser.add_argument("--job-seconds", type=float, default=0.01)
+
+    outreach_parser = commands.add_parser("outreach", help="Outreach engine throughput against a local SMTP sink")
+    outreach_parser.add_argument("--concurrency", type=int, action="append", help="SMTP sessions (repeatable)")
+    outreach_parser.add_argument("--messages", type=int, default=1000)
+    outreach_parser.add_argument("--domains", type=int, default=50)
+    outreach_parser.add_argument("--domain-per-minute", type=float, default=0.0, help="0 = unthrottled")
+    outreach_parser.add_argument("--smtp-delay", type=float, default=0.002, help="sink latency per message (s)")
+
+    followups_parser = commands.add_parser("followups", help="Follow-up timing wheel rebuild, insert and tick cost")
+    followups_parser.add_argument("--pending", type=int, action="append", help="pending follow-ups (repeatable)")
+    followups_parser.add_argument("--horizon-days", type=float, default=30)
+    followups_parser.add_argument("--advance-hours", type=float, default=24)
+
+    content_parser = commands.add_parser("content", help="Content pipeline throughput and per-stage latency")
+    content_parser.add_argument("--concurrency", type=int, action="append", help="concurrent provider calls (repeatable)")
+    content_parser.add_argument("--pieces", type=int, default=200)
+    content_parser.add_argument("--latency", type=float, default=0.05, help="simulated provider latency (s)")
+    content_parser.add_argument("--batch-size", type=int, default=20)
+
+    provider_cache_parser = commands.add_parser("provider-cache", help="Repeated content runs through the provider cache")
+    provider_cache_parser.add_argument("--pieces", type=int, default=200)
+    provider_cache_parser.add_argument("--latency", type=float, default=0.05, help="simulated provider latency (s)")
+    provider_cache_parser.add_argument("--concurrency", type=int, default=8)
+    provider_cache_parser.add_argument("--runs", type=int, default=3)
+
+    ratelimit_parser = commands.add_parser("ratelimit", help="Shared token bucket accuracy across processes")
+    ratelimit_parser.add_argument("--processes", type=int, action="append", help="worker processes (repeatable)")
+    ratelimit_parser.add_argument("--per-minute", type=float, default=6000)
+    ratelimit_parser.add_argument("--seconds", type=float, default=5)
+
+    resilience_parser = commands.add_parser("resilience", help="Circuit breaker, AIMD concurrency and hedging against a flaky stub")
+    resilience_parser.add_argument("--workers", type=int, default=32)
+    resilience_parser.add_argument("--phase-seconds", type=float, default=4.0)
+
+    sink_parser = commands.add_parser("smtp-sink", help="Run the local SMTP sink (point EMPIRE_SMTP_HOST/PORT at it)")
+    sink_parser.add_argument("--port", type=int, default=1025)
+    sink_parser.add_argument("--delay", type=float, default=0.0)
+
+    args = parser.parse_args()
+    if args.command == "http":
+        for url in args.url or ["http://127.0.0.1:5000/"]:
+            _print_result(http_load(url, args.concurrency, args.duration, args.method))
+    elif args.command == "templates":
+        for result in template_render(args.module, args.iterations):
+            timings = result["per_render_ms"]
+            print(f"{result['template']}: {timings['render_template_string']}ms per render compiled per call, "
+                  f"{timings['render_template']}ms from the registry ({result['speedup']}x)")
+    elif args.command == "bytes":
+        for result in page_bytes(args.module, args.path):
+            print(f"{result['path']} ({len(result['assets'])} assets)")
+            for encoding, sizes in result["bytes"].items():
+                print(f"  {encoding:>8}: first view {sizes['first_view']:>7} bytes "
+                      f"(page {sizes['html']} + assets {sizes['assets']}), repeat view {sizes['repeat_view']:>7} bytes")
+    elif args.command == "jobs":
+        for workers in args.workers or [1, 2, 4, 8]:
+            result = job_throughput(workers, args.jobs, args.job_seconds)
+            print(f"{workers} workers: {result['jobs']} jobs in {result['seconds']}s ({result['jobs_per_second']} jobs/s)")
+    elif args.command == "outreach":
+        for concurrency in args.concurrency or [1, 4, 8]:
+            result = outreach_throughput(concurrency, args.messages, args.domains, args.domain_per_minute, args.smtp_delay)
+            print(f"concurrency {concurrency}: {result['sent']} sent, {result['failed']} failed in {result['seconds']}s "
+                  f"({result['messages_per_second']} msgs/s) over {result['sink_sessions']} SMTP sessions, "
+                  f"{result['leads_recorded']} leads recorded, {result['throttled_seconds']}s throttled")
+    elif args.command == "followups":
+        for pending in args.pending or [10000, 100000, 300000]:
+            result = followup_wheel(pending, args.horizon_days, args.advance_hours)
+            print(f"{pending} pending: rebuilt in {result['rebuild_seconds']}s, {result['add_us']}us per add, "
+                  f"{result['tick_us']}us per tick over {result['ticks']} ticks ({result['fired']} fired, "
+                  f"{result['cascaded']} cascaded)")
+    elif args.command == "content":
+        for concurrency in args.concurrency or [1, 4, 8, 16]:
+            result = content_throughput(concurrency, args.pieces, args.latency, args.batch_size)
+            stages = result["stages"]
+            print(f"concurrency {concurrency}: {result['rows']} pieces in {result['seconds']}s "
+                  f"({result['pieces_per_second']} pieces/s); generate p50 {stages['generate']['p50_ms']}ms "
+                  f"p95 {stages['generate']['p95_ms']}ms; {stages['write']['count']} writes, "
+                  f"{stages['write']['total_seconds']}s writing")
+    elif args.command == "provider-cache":
+        for result in provider_cache_runs(args.pieces, args.latency, args.concurrency, args.runs):
+            print(f"run {result['run']}: {result['seconds']}s, generate p50 {result['generate_p50_ms']}ms, "
+                  f"{result['entries']} cached of {result['unique_requests']} unique requests, "
+                  f"hit rate {result['hit_rate']} ({result['hits']} hits, {result['misses']} misses)")
+    elif args.command == "ratelimit":
+        for processes in args.processes or [1, 4, 8]:
+            for shared in (True, False):
+                result = rate_limit_accuracy(processes, args.per_minute, args.seconds, shared)
+                print(f"{processes} processes, {'shared bucket' if shared else 'bucket per process'}: "
+                      f"{result['granted']} calls granted against a quota of {result['quota']} "
+                      f"({result['ratio_to_quota']}x), split {result['per_process']}, "
+                      f"{result['reserve_us']}us per reservation")
+    elif args.command == "resilience":
+        for resilient in (False, True):
+            print("ResilientClient" if resilient else "plain calls")
+            for result in resilience_scenario(resilient, args.workers, args.phase_seconds):
+                print(f"  {result['phase']:>9}: {result['goodput']:>6} ok/s, p95 {result['p95_ms']}ms, "
+                      f"{result['failed']} failed, {result['rejected']} failed fast, "
+                      f"{result['provider_calls']} provider calls, concurrency {result['concurrency_limit']}")
+        for hedge_percentile in (None, 0.9):
+            result = hedging_latency(hedge_percentile)
+            print(f"hedging {'at p' + str(int(hedge_percentile * 100)) if hedge_percentile else 'off'}: "
+                  f"p50 {result['p50_ms']}ms, p99 {result['p99_ms']}ms, {result['provider_calls']} provider calls "
+                  f"({result['hedged']} hedged, {result['hedge_wins']} won by the hedge)")
+    elif args.command == "smtp-sink":
+        sink = SMTPSink(("127.0.0.1", args.port), delay=args.delay)
+        print(f"📮 SMTP sink listening on 127.0.0.1:{args.port}")
+        try:
+            sink.serve_forever()
+        except KeyboardInterrupt:
+            print(f"{sink.messages} messages over {sink.sessions} sessions")
+
+if __name__ == '__main__':
+    main()
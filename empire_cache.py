@@ -0,0 +1,347 @@
+"""
+Empire read cache - in-process read-through cache keyed by a data version
+Every writer bumps the shared DataVersion; cached reads stay valid until the
+next bump (or until the optional TTL expires). ProviderCache keeps external
+provider responses on disk, shared by every worker
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: SharedDataVersion is unavailable
+    fcntl = None
+
+class DataVersion:
+    """Global write-version counter bumped by every writer"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+        self.updated_at = time.time()
+        # Versions restart at 0 with the process; the token tells the runs apart
+        self.token = os.urandom(4).hex()
+
+    def bump(self) -> int:
+        """Record a write and return the new version"""
+        with self._lock:
+            self._value += 1
+            self.updated_at = time.time()
+            return self._value
+
+    def current(self) -> int:
+        return self._value
+
+# Layout of the shared version file: version counter, time of the last bump, file token
+_SHARED_VERSION = struct.Struct("qdQ")
+
+class SharedDataVersion(DataVersion):
+    """DataVersion kept in a memory-mapped file so every worker process sees every bump"""
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("SharedDataVersion needs fcntl (POSIX only)")
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < _SHARED_VERSION.size:
+                os.ftruncate(self._fd, _SHARED_VERSION.size)
+                os.pwrite(self._fd, _SHARED_VERSION.pack(0, time.time(), int.from_bytes(os.urandom(8), "big")), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, _SHARED_VERSION.size)
+
+    def bump(self) -> int:
+        # lockf locks are per process (unlike flock they are not shared with
+        # forked children); the thread lock covers threads within a process
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                value, _, token = _SHARED_VERSION.unpack_from(self._map)
+                value += 1
+                _SHARED_VERSION.pack_into(self._map, 0, value, time.time(), token)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            return value
+
+    def current(self) -> int:
+        return _SHARED_VERSION.unpack_from(self._map)[0]
+
+    @property
+    def updated_at(self) -> float:
+        return _SHARED_VERSION.unpack_from(self._map)[1]
+
+    @property
+    def token(self) -> str:
+        # Same for every worker, new whenever the version file is recreated
+        return format(_SHARED_VERSION.unpack_from(self._map)[2], '016x')[:8]
+
+class VersionedCache:
+    """Read-through cache invalidated by DataVersion bumps, with optional TTL and hit/miss stats"""
+
+    def __init__(self, version: DataVersion, ttl: Optional[float] = None, max_entries: int = 512):
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, tuple] = {}
+        self._entries_version = version.current()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute: Callable[[], Any]):
+        """Return the cached value for key, computing it on a miss"""
+        version = self.version.current()
+        now = time.time()
+        with self._lock:
+            if version != self._entries_version:
+                # Any write invalidates every entry
+                self._entries.clear()
+                self._entries_version = version
+            entry = self._entries.get(key)
+            if entry and (self.ttl is None or now - entry[0] < self.ttl):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # Only keep the value if no write landed while computing it
+            if self.version.current() == version == self._entries_version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = (now, value)
+        return value
+
+    def cached(self, fn: Callable) -> Callable:
+        """Decorator caching fn by its name and arguments"""
+        def wrapper(*args, **kwargs):
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            return self.get_or_compute(key, lambda: fn(*args, **kwargs))
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.uncached = fn
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "data_version": self.version.current(),
+                "ttl_seconds": self.ttl
+            }
+
+def normalize_request(value: Any) -> Any:
+    """Canonical form of a provider request: whitespace collapsed, mapping keys sorted by json.dumps"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(key): normalize_request(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_request(item) for item in value]
+    return value
+
+def request_key(namespace: str, request: Any) -> str:
+    """Content address of a request: sha256 of its normalized JSON"""
+    canonical = json.dumps([namespace, normalize_request(request)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ProviderCache:
+    """Content-addressed SQLite cache for provider responses with TTLs and LRU eviction to max_bytes"""
+
+    def __init__(self, path: str = 'empire_provider_cache.db', max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = 7 * 86400, touch_interval: float = 60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # LRU order is approximate: a hit only rewrites accessed_ts once it is this old
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        # Counters not yet added to the shared totals
+        self._pending = {"hits": 0, "misses": 0}
+        # One lock per key being computed, so concurrent identical requests make one provider call
+        self._inflight: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS provider_cache (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_ts REAL NOT NULL,
+                expires_ts REAL,
+                accessed_ts REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_provider_cache_accessed ON provider_cache (accessed_ts);
+            CREATE INDEX IF NOT EXISTS idx_provider_cache_expires ON provider_cache (expires_ts) WHERE expires_ts IS NOT NULL;
+            CREATE TABLE IF NOT EXISTS provider_cache_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                bytes INTEGER DEFAULT 0,
+                entries INTEGER DEFAULT 0,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                evictions INTEGER DEFAULT 0,
+                expirations INTEGER DEFAULT 0
+            );
+            INSERT OR IGNORE INTO provider_cache_totals (id) VALUES (1);
+            -- Size and entry count kept by triggers so the bound check never scans the table
+            CREATE TRIGGER IF NOT EXISTS provider_cache_insert AFTER INSERT ON provider_cache BEGIN
+                UPDATE provider_cache_totals SET bytes = bytes + NEW.size, entries = entries + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS provider_cache_update AFTER UPDATE OF size ON provider_cache BEGIN
+                UPDATE provider_cache_totals SET bytes = bytes + NEW.size - OLD.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS provider_cache_delete AFTER DELETE ON provider_cache BEGIN
+                UPDATE provider_cache_totals SET bytes = bytes - OLD.size, entries = entries - 1;
+            END;
+        """)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._pending[outcome] += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _take_pending(self) -> tuple:
+        with self._lock:
+            pending = (self._pending["hits"], self._pending["misses"])
+            self._pending = {"hits": 0, "misses": 0}
+        return pending
+
+    def get(self, namespace: str, request: Any) -> Optional[Any]:
+        """Cached response for request, or None on a miss (expired entries count as misses)"""
+        return self._lookup(request_key(namespace, request))
+
+    def _lookup(self, key: str, count: bool = True) -> Optional[Any]:
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT value, expires_ts, accessed_ts FROM provider_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            if count:
+                self._count("misses")
+            conn.close()
+            return None
+        if count:
+            self._count("hits")
+        if now - row[2] >= self.touch_interval:
+            hits, misses = self._take_pending()
+            conn.execute("UPDATE provider_cache SET accessed_ts = ? WHERE key = ?", (now, key))
+            conn.execute("UPDATE provider_cache_totals SET hits = hits + ?, misses = misses + ?", (hits, misses))
+            conn.commit()
+        conn.close()
+        return json.loads(row[0])
+
+    def put(self, namespace: str, request: Any, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable response, then evict expired and least recently used entries over max_bytes"""
+        self._store(request_key(namespace, request), namespace, value, ttl)
+
+    def _store(self, key: str, namespace: str, value: Any, ttl: Optional[float]):
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        hits, misses = self._take_pending()
+        conn = self._connect()
+        conn.execute("""INSERT INTO provider_cache (key, namespace, value, size, created_ts, expires_ts, accessed_ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,
+                            created_ts = excluded.created_ts, expires_ts = excluded.expires_ts,
+                            accessed_ts = excluded.accessed_ts""",
+                     (key, namespace, payload, len(payload) + len(key), now, now + ttl if ttl else None, now))
+        conn.execute("UPDATE provider_cache_totals SET hits = hits + ?, misses = misses + ?", (hits, misses))
+        total = conn.execute("SELECT bytes FROM provider_cache_totals").fetchone()[0]
+        if total > self.max_bytes:
+            self._evict(conn, now)
+        conn.commit()
+        conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        # Down to 90% so a full cache is not trimmed again on every put
+        target = int(self.max_bytes * 0.9)
+        expired = conn.execute("DELETE FROM provider_cache WHERE expires_ts <= ?", (now,)).rowcount
+        evicted = 0
+        while conn.execute("SELECT bytes FROM provider_cache_totals").fetchone()[0] > target:
+            deleted = conn.execute("""DELETE FROM provider_cache WHERE key IN
+                                      (SELECT key FROM provider_cache ORDER BY accessed_ts LIMIT 64)""").rowcount
+            if not deleted:
+                break
+            evicted += deleted
+        conn.execute("UPDATE provider_cache_totals SET evictions = evictions + ?, expirations = expirations + ?",
+                     (evicted, expired))
+
+    def get_or_compute(self, namespace: str, request: Any, compute: Callable[[], Any], ttl: Optional[float] = None):
+        """Cached response for request, calling compute() and storing its result on a miss"""
+        key = request_key(namespace, request)
+        value = self._lookup(key)
+        if value is not None:
+            return value
+        with self._lock:
+            call_lock = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with call_lock:
+                # A concurrent caller may have stored it while this one waited
+                value = self._lookup(key, count=False)
+                if value is None:
+                    value = compute()
+                    self._store(key, namespace, value, ttl)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return value
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM provider_cache")
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict:
+        """Shared totals across workers plus this process's hit/miss counters"""
+        hits, misses = self._take_pending()
+        conn = self._connect()
+        if hits or misses:
+            conn.execute("UPDATE provider_cache_totals SET hits = hits + ?, misses = misses + ?", (hits, misses))
+            conn.commit()
+        row = conn.execute("""SELECT bytes, entries, hits, misses, evictions, expirations
+                              FROM provider_cache_totals""").fetchone()
+        conn.close()
+        total_bytes, entries, total_hits, total_misses, evictions, expirations = row
+        lookups = total_hits + total_misses
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": round(total_hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions,
+            "expirations": expirations,
+            "process_hits": self.hits,
+            "process_misses": self.misses
+        }
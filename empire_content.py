@@ -0,0 +1,295 @@
+"""
+Empire content pipeline - generation fanned out to a provider, saved in batches
+Pieces are planned per platform and revenue stream, generated concurrently
+through a ContentProvider and streamed into content_pieces a batch at a time
+"""
+
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from empire_cache import ProviderCache
+from empire_ratelimit import RateBucket
+from empire_resilience import ResilientClient
+
+try:
+    import requests
+except ImportError:  # requests is optional; only OpenAIProvider needs it
+    requests = None
+
+# Content format per platform
+PLATFORM_FORMATS = {
+    "LinkedIn": ("Post", 150),
+    "YouTube": ("Video script", 400),
+    "Blog": ("Article", 600),
+    "Newsletter": ("Issue", 350),
+    "Twitter": ("Thread", 60)
+}
+
+# Talking points per revenue stream
+STREAM_TOPICS = {
+    "Job/Advisor Search": "hiring senior technology leaders",
+    "Health Management": "executive health and performance",
+    "Speaking Engagements": "AI leadership on stage",
+    "Retreat Hosting": "leadership retreats that change how teams work",
+    "Product Development": "building AI products customers keep using",
+    "Strategic Partnerships": "partnerships that compound",
+    "Investment/Funding": "what investors look for in AI companies"
+}
+
+# Columns added after content_pieces first shipped
+CONTENT_COLUMNS = [
+    ("revenue_stream", "TEXT"),
+    ("body", "TEXT"),
+    ("provider", "TEXT")
+]
+
+def latency_summary(samples: List[float]) -> Dict:
+    """Count, total and mean/p50/p95/max in milliseconds for a list of durations in seconds"""
+    if not samples:
+        return {"count": 0, "total_seconds": 0.0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "total_seconds": round(sum(ordered), 4),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+class ContentProvider:
+    """Generates one content piece; request has platform, revenue_stream, content_type, topic, words and variation"""
+    name = "base"
+
+    def generate(self, request: Dict) -> Dict:
+        """Return title, body and a predicted engagement_score"""
+        raise NotImplementedError
+
+class TemplateProvider(ContentProvider):
+    """Local stub: fills a template, optionally sleeping latency seconds to stand in for a remote call"""
+    name = "template"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate(self, request: Dict) -> Dict:
+        if self.latency:
+            time.sleep(self.latency)
+        topic = request["topic"]
+        title = f"{request['content_type']}: {topic[0].upper()}{topic[1:]}"
+        body = (f"{request['content_type']} for {request['platform']} on {topic}, "
+                f"written for {request['revenue_stream']} prospects (about {request['words']} words).")
+        return {"title": title, "body": body, "engagement_score": random.uniform(0.7, 0.95)}
+
+class OpenAIProvider(ContentProvider):
+    """Chat-completions call over a pooled requests session (any OpenAI-compatible endpoint)"""
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini", base_url: str = "https://api.openai.com/v1",
+                 timeout: float = 60.0, pool_size: int = 4, quota: Optional[RateBucket] = None):
+        if requests is None:
+            raise RuntimeError("OpenAIProvider needs the requests package")
+        self.model = model
+        self.quota = quota
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+        # One kept-alive connection per concurrent call
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+    def generate(self, request: Dict) -> Dict:
+        prompt = (f"Write a {request['platform']} {request['content_type'].lower()} of about {request['words']} words "
+                  f"on {request['topic']} for {request['revenue_stream']} prospects. Put the title on the first line.")
+        if self.quota:
+            self.quota.acquire()
+        response = self.session.post(self.url, timeout=self.timeout, json={
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": request["words"] * 2
+        })
+        response.raise_for_status()
+        text = response.json()["choices"][0]["message"]["content"].strip()
+        title, _, body = text.partition("\n")
+        return {"title": title.strip("# *")[:200], "body": body.strip(), "engagement_score": None}
+
+class CachedProvider(ContentProvider):
+    """Answers repeated requests from a ProviderCache instead of calling the wrapped provider again
+    (plans carry a per-run variation, so only a replayed plan is answered from the cache)"""
+
+    def __init__(self, provider: ContentProvider, cache: ProviderCache, ttl: Optional[float] = None):
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+        self.name = provider.name
+        # Responses from different models never answer for each other
+        self.namespace = f"content:{provider.name}:{getattr(provider, 'model', '')}"
+
+    def generate(self, request: Dict) -> Dict:
+        return self.cache.get_or_compute(self.namespace, request, lambda: self.provider.generate(request), self.ttl)
+
+class ResilientProvider(ContentProvider):
+    """Calls the wrapped provider through a ResilientClient (generation is paid for, so never hedged)"""
+
+    def __init__(self, provider: ContentProvider, client: ResilientClient):
+        self.provider = provider
+        self.client = client
+        self.name = provider.name
+        self.model = getattr(provider, "model", "")
+
+    def generate(self, request: Dict) -> Dict:
+        return self.client.call(self.provider.generate, request)
+
+class ContentPipeline:
+    """Plans content pieces, generates them with bounded concurrency and writes them in batches"""
+
+    def __init__(self, provider: ContentProvider, db_path: str = 'empire_business.db',
+                 concurrency: int = 4, batch_size: int = 20):
+        self.provider = provider
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+
+    def init_schema(self, cursor):
+        """Add the generated-content columns to content_pieces (called from init_empire_database)"""
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(content_pieces)").fetchall()}
+        for column, definition in CONTENT_COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE content_pieces ADD COLUMN {column} {definition}")
+
+    def plan(self, pieces: int, platforms: Optional[List[str]] = None,
+             streams: Optional[List[str]] = None, seed: Optional[str] = None) -> List[Dict]:
+        """pieces requests spread round-robin over platforms, each platform cycling through the streams"""
+        platforms = platforms or list(PLATFORM_FORMATS)
+        streams = streams or list(STREAM_TOPICS)
+        # Part of every request (and so of its cache key): a new run, or another lap of the
+        # same platform x stream pairs, asks for new content instead of reusing earlier posts
+        seed = seed or os.urandom(4).hex()
+        requests_planned = []
+        for n in range(pieces):
+            platform = platforms[n % len(platforms)]
+            stream = streams[(n // len(platforms)) % len(streams)]
+            content_type, words = PLATFORM_FORMATS.get(platform, ("Post", 200))
+            requests_planned.append({
+                "platform": platform,
+                "revenue_stream": stream,
+                "content_type": content_type,
+                "topic": STREAM_TOPICS.get(stream, stream),
+                "words": words,
+                "variation": f"{seed}-{n // (len(platforms) * len(streams))}"
+            })
+        return requests_planned
+
+    def _generate(self, request: Dict):
+        started = time.perf_counter()
+        piece = self.provider.generate(request)
+        return piece, time.perf_counter() - started
+
+    def _write(self, rows: List[tuple], checkpoint: Optional[Callable] = None):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        cursor.executemany("""INSERT INTO content_pieces (title, platform, content_type, status, engagement_score,
+                                  created_at, created_ts, revenue_stream, body, provider)
+                              VALUES (?, ?, ?, 'Published', ?, ?, ?, ?, ?, ?)""", rows)
+        if checkpoint:
+            checkpoint(cursor)
+        conn.commit()
+        conn.close()
+
+    def run(self, requests_planned: List[Dict], progress: Optional[Callable] = None,
+            done: Optional[List[int]] = None, checkpoint: Optional[Callable] = None) -> Dict:
+        """Generate every request whose index is not in done; finished pieces are saved every batch_size,
+        one transaction per batch that also runs checkpoint(cursor, indexes saved so far)"""
+        started = time.perf_counter()
+        generate_seconds, write_seconds = [], []
+        rows, saved, failed = [], 0, 0
+        done = set(done or ())
+        skipped = len(done)
+        batch_indexes = []
+        platforms = set()
+
+        def flush():
+            nonlocal rows, saved, batch_indexes
+            if not rows:
+                return
+            write_started = time.perf_counter()
+            done.update(batch_indexes)
+            saved_so_far = sorted(done)
+            self._write(rows, (lambda cursor: checkpoint(cursor, saved_so_far)) if checkpoint else None)
+            write_seconds.append(time.perf_counter() - write_started)
+            saved += len(rows)
+            rows, batch_indexes = [], []
+            # Progress goes to the jobs table, so only between batches, never inside one
+            if progress:
+                progress(skipped + saved + failed, len(requests_planned),
+                         f"Saved {skipped + saved} of {len(requests_planned)} content pieces")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="empire-content") as executor:
+            futures = {executor.submit(self._generate, request): (n, request)
+                       for n, request in enumerate(requests_planned) if n not in done}
+            for future in as_completed(futures):
+                n, request = futures[future]
+                try:
+                    piece, seconds = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ Content generation for {request['platform']} failed: {e}")
+                    continue
+                generate_seconds.append(seconds)
+                platforms.add(request["platform"])
+                now = datetime.now()
+                rows.append((piece["title"], request["platform"], request["content_type"], piece.get("engagement_score"),
+                             now.isoformat(), int(now.timestamp()), request["revenue_stream"], piece["body"],
+                             self.provider.name))
+                batch_indexes.append(n)
+                if len(rows) >= self.batch_size:
+                    flush()
+        flush()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "requested": len(requests_planned),
+            "saved": saved,
+            "already_saved": skipped,
+            "failed": failed,
+            "provider": self.provider.name,
+            "concurrency": self.concurrency,
+            "platforms": sorted(platforms),
+            "seconds": round(elapsed, 3),
+            "pieces_per_second": round(saved / elapsed, 1) if elapsed else 0.0,
+            "stages": {
+                "generate": latency_summary(generate_seconds),
+                "write": latency_summary(write_seconds)
+            }
+        }
+
+    def create(self, pieces: int, platforms: Optional[List[str]] = None, progress: Optional[Callable] = None,
+               seed: Optional[str] = None, done: Optional[List[int]] = None,
+               checkpoint: Optional[Callable] = None) -> Dict:
+        """Plan and run in one go, with the planning time as its own stage"""
+        started = time.perf_counter()
+        requests_planned = self.plan(pieces, platforms, seed=seed)
+        plan_seconds = time.perf_counter() - started
+        report = self.run(requests_planned, progress, done, checkpoint)
+        report["stages"] = {"plan": latency_summary([plan_seconds]), **report["stages"]}
+        return report
+
+    def create_for_job(self, progress, pieces: int, platforms: Optional[List[str]] = None) -> Dict:
+        """create() inside a job: the seed, piece count and saved indexes live in the job checkpoint, so a
+        retried or requeued job replays the same requests (answered by a CachedProvider) and skips saved pieces"""
+        state = dict(progress.checkpoint)
+        if "seed" not in state:
+            state = {"seed": os.urandom(4).hex(), "pieces": pieces, "done": []}
+            # Stored before the first call, so even a crash before any batch is saved replays the same keys
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            progress.save_checkpoint(conn.cursor(), state)
+            conn.commit()
+            conn.close()
+        return self.create(state["pieces"], platforms, progress, seed=state["seed"], done=state["done"],
+                           checkpoint=lambda cursor, done: progress.save_checkpoint(cursor, {**state, "done": done}))
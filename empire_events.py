@@ -0,0 +1,76 @@
+"""
+Empire live events - in-process broadcaster for Server-Sent Events
+Writers publish once; every connected dashboard gets the event from its own
+bounded queue, so N open browsers never cause N page renders
+"""
+
+import json
+import queue
+import threading
+from typing import Dict, Iterator, Optional
+
+class EventBroadcaster:
+    """Fan out published events to every subscribed SSE client"""
+
+    def __init__(self, max_queue: int = 100, max_subscribers: int = 200):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._next_id = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Optional[queue.Queue]:
+        """Register a client queue, or return None when the broadcaster is full"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            client_queue = queue.Queue(maxsize=self.max_queue)
+            self._subscribers.add(client_queue)
+            return client_queue
+
+    def unsubscribe(self, client_queue: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(client_queue)
+
+    def publish(self, event: str, data: Dict):
+        """Queue an event for every subscriber; slow clients lose their oldest events"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._next_id += 1
+            message = format_sse(event, data, self._next_id)
+            subscribers = list(self._subscribers)
+        for client_queue in subscribers:
+            try:
+                client_queue.put_nowait(message)
+            except queue.Full:
+                try:
+                    client_queue.get_nowait()
+                    client_queue.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def stream(self, client_queue: queue.Queue, heartbeat: float = 15.0) -> Iterator[str]:
+        """SSE body for one client; sends keep-alive comments while idle"""
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield client_queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(client_queue)
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
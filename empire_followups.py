@@ -0,0 +1,265 @@
+"""
+Empire follow-ups - per-lead follow-up due times driven by a timing wheel
+Due times live in the followups table; one leader process keeps the pending
+ones in a hierarchical timing wheel and enqueues a dispatch job as they fall due
+"""
+
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from empire_jobs import JobManager
+from empire_scheduler import LeaderLock
+
+class TimingWheel:
+    """Hierarchical timing wheel: O(1) insert and O(1) amortised work per tick, whatever the backlog"""
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4, start: Optional[float] = None):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        # Every tick up to and including current has been processed
+        self.current = int((time.time() if start is None else start) // tick)
+        self._wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._spans = [slots ** level for level in range(levels)]
+        # Timers further out than the top level covers wait in a heap until they come into range
+        self._overflow: List[Tuple[int, int, Hashable, Any]] = []
+        self._sequence = itertools.count()
+        self._live: Dict[Hashable, int] = {}
+        self._ready: List[Tuple[Hashable, int, Any]] = []
+        self.cascaded = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._live
+
+    def add(self, key: Hashable, due: float, item: Any = None):
+        """Schedule (or reschedule) key to fire at time due"""
+        due_tick = -int(-due // self.tick)
+        self._live[key] = due_tick
+        self._place(key, due_tick, item)
+
+    def discard(self, key: Hashable):
+        # Its slot entry stays behind and is skipped when the slot is reached
+        self._live.pop(key, None)
+
+    def _place(self, key: Hashable, due_tick: int, item: Any):
+        delta = due_tick - self.current
+        if delta <= 0:
+            self._fire(key, due_tick, item)
+            return
+        for level, span in enumerate(self._spans):
+            if delta < span * self.slots:
+                self._wheels[level][(due_tick // span) % self.slots].append((key, due_tick, item))
+                return
+        heapq.heappush(self._overflow, (due_tick, next(self._sequence), key, item))
+
+    def _cascade(self, level: int):
+        """Re-place a higher-level slot whose range has just started"""
+        slot = (self.current // self._spans[level]) % self.slots
+        entries, self._wheels[level][slot] = self._wheels[level][slot], []
+        self.cascaded += len(entries)
+        for key, due_tick, item in entries:
+            if self._live.get(key) == due_tick:
+                self._place(key, due_tick, item)
+
+    def _fire(self, key: Hashable, due_tick: int, item: Any):
+        if self._live.get(key) == due_tick:
+            self._ready.append((key, due_tick, item))
+
+    def advance(self, now: Optional[float] = None) -> List[Tuple[Hashable, Any]]:
+        """Process every tick up to now; returns (key, item) for each timer that fell due"""
+        target = int((time.time() if now is None else now) // self.tick)
+        top_range = self._spans[-1] * self.slots
+        while self.current < target:
+            self.current += 1
+            while self._overflow and self._overflow[0][0] - self.current < top_range:
+                due_tick, _, key, item = heapq.heappop(self._overflow)
+                if self._live.get(key) == due_tick:
+                    self._place(key, due_tick, item)
+            # Highest level whose boundary this tick crosses first, then down to level 1
+            for level in range(self.levels - 1, 0, -1):
+                if self.current % self._spans[level] == 0:
+                    self._cascade(level)
+            slot = self.current % self.slots
+            entries, self._wheels[0][slot] = self._wheels[0][slot], []
+            for key, due_tick, item in entries:
+                self._fire(key, due_tick, item)
+        ready, self._ready = self._ready, []
+        # Still current only if not discarded or rescheduled since it fell due
+        fired = []
+        for key, due_tick, item in ready:
+            if self._live.get(key) == due_tick:
+                del self._live[key]
+                fired.append((key, item))
+        return fired
+
+class FollowUpScheduler:
+    """Stores follow-ups per lead and dispatches them as jobs when the timing wheel says they are due"""
+
+    def __init__(self, jobs: JobManager, job_kind: str = "followup_dispatch", db_path: str = 'empire_business.db',
+                 lock_path: str = 'empire_business.db.followups.lock', tick: float = 1.0,
+                 poll_interval: float = 5.0, dispatch_batch: int = 500):
+        self.jobs = jobs
+        self.job_kind = job_kind
+        self.db_path = db_path
+        self.tick = tick
+        # Follow-ups scheduled by other processes are picked up this often
+        self.poll_interval = poll_interval
+        self.dispatch_batch = dispatch_batch
+        self.wheel: Optional[TimingWheel] = None
+        self._leader = LeaderLock(lock_path)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_id = 0
+        self._last_poll = 0.0
+        self.dispatched = 0
+        self.rebuild_seconds = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor):
+        """Follow-up table (called from init_empire_database)"""
+        cursor.execute("""CREATE TABLE IF NOT EXISTS followups (
+            id INTEGER PRIMARY KEY,
+            lead_id TEXT NOT NULL,
+            due_ts INTEGER NOT NULL,
+            method TEXT DEFAULT 'email',
+            note TEXT,
+            state TEXT DEFAULT 'pending',
+            created_ts INTEGER,
+            dispatched_ts INTEGER
+        )""")
+        # One pending follow-up per lead; scheduling again replaces it
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_followups_pending_lead ON followups (lead_id) WHERE state = 'pending'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_followups_pending_due ON followups (due_ts) WHERE state = 'pending'")
+
+    def schedule(self, lead_id: str, due_ts: float, method: str = "email", note: Optional[str] = None) -> Dict:
+        """Store a follow-up for a lead, replacing any pending one"""
+        now = int(time.time())
+        conn = self._connect()
+        cursor = conn.cursor()
+        replaced = cursor.execute("UPDATE followups SET state = 'cancelled' WHERE lead_id = ? AND state = 'pending' RETURNING id",
+                                  (lead_id,)).fetchall()
+        cursor.execute("""INSERT INTO followups (lead_id, due_ts, method, note, state, created_ts)
+                          VALUES (?, ?, ?, ?, 'pending', ?)""", (lead_id, int(due_ts), method, note, now))
+        followup_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        with self._lock:
+            if self.wheel is not None:
+                # Replaced rows cancelled in another process are dropped by claim() when they fire
+                for (replaced_id,) in replaced:
+                    self.wheel.discard(replaced_id)
+                self.wheel.add(followup_id, due_ts)
+        return {"id": followup_id, "lead_id": lead_id, "due_ts": int(due_ts), "method": method, "note": note}
+
+    def _load(self, full: bool) -> int:
+        """Put pending follow-ups into the wheel: all of them on rebuild, otherwise only rows added since"""
+        conn = self._connect()
+        # One read snapshot, so a row inserted between the two reads cannot slip under the new watermark
+        conn.execute("BEGIN")
+        if full:
+            rows = conn.execute("SELECT id, due_ts FROM followups WHERE state = 'pending'").fetchall()
+        else:
+            rows = conn.execute("SELECT id, due_ts FROM followups WHERE id > ? AND state = 'pending'",
+                                (self._last_id,)).fetchall()
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM followups").fetchone()[0]
+        conn.commit()
+        conn.close()
+        with self._lock:
+            for followup_id, due_ts in rows:
+                self.wheel.add(followup_id, due_ts)
+            self._last_id = max(self._last_id, last_id)
+        return len(rows)
+
+    def rebuild(self) -> int:
+        """Fresh wheel holding every pending follow-up (run when this process becomes leader)"""
+        started = time.perf_counter()
+        with self._lock:
+            self.wheel = TimingWheel(self.tick)
+            self._last_id = 0
+        loaded = self._load(full=True)
+        self.rebuild_seconds = round(time.perf_counter() - started, 4)
+        print(f"⏰ Follow-up wheel rebuilt with {loaded} pending follow-ups in {self.rebuild_seconds}s")
+        return loaded
+
+    def _dispatch(self, followup_ids: List[int]):
+        """Enqueue due follow-ups, then mark them dispatched (the job ignores rows it already handled)"""
+        for start in range(0, len(followup_ids), self.dispatch_batch):
+            batch = followup_ids[start:start + self.dispatch_batch]
+            self.jobs.submit(self.job_kind, dedup=False, followup_ids=batch)
+            conn = self._connect()
+            conn.execute(f"""UPDATE followups SET state = 'dispatched', dispatched_ts = ?
+                             WHERE state = 'pending' AND id IN ({', '.join('?' * len(batch))})""",
+                         (int(time.time()), *batch))
+            conn.commit()
+            conn.close()
+            self.dispatched += len(batch)
+
+    def claim(self, followup_ids: List[int]) -> List[Dict]:
+        """Mark follow-ups sent and return the ones this call moved (for the dispatch job)"""
+        if not followup_ids:
+            return []
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(f"""UPDATE followups SET state = 'sent'
+                                WHERE state IN ('pending', 'dispatched') AND id IN ({', '.join('?' * len(followup_ids))})
+                                RETURNING id, lead_id, method, note""", followup_ids).fetchall()
+        conn.commit()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._leader.acquire():
+                    if self.wheel is None:
+                        self.rebuild()
+                    if time.time() - self._last_poll >= self.poll_interval:
+                        self._last_poll = time.time()
+                        self._load(full=False)
+                    with self._lock:
+                        due = self.wheel.advance()
+                    if due:
+                        self._dispatch([key for key, _ in due])
+            except Exception as e:
+                print(f"Error in follow-up scheduler: {e}")
+            self._stop.wait(self.tick if self._leader.held else self.tick * 10)
+
+    def start(self):
+        """Start the wheel thread (only the lock holder keeps a wheel)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="empire-followups", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._leader.release()
+        with self._lock:
+            self.wheel = None
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT state, COUNT(*) FROM followups GROUP BY state").fetchall())
+        next_due = conn.execute("SELECT MIN(due_ts) FROM followups WHERE state = 'pending'").fetchone()[0]
+        conn.close()
+        return {
+            "leader": self._leader.held,
+            "states": counts,
+            "next_due_ts": next_due,
+            "in_wheel": len(self.wheel) if self.wheel is not None else None,
+            "dispatched_here": self.dispatched,
+            "rebuild_seconds": self.rebuild_seconds
+        }
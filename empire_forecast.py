@@ -0,0 +1,161 @@
+"""
+Empire revenue forecasting - per-stream trend plus weighted pipeline
+Daily revenue trends for every stream are fitted in a single grouped query,
+combined with the stage-weighted pipeline and cached until new data arrives
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from empire_cache import DataVersion
+from empire_timeseries import DAY, EMPIRE_STREAM, bucket_start
+
+# The annual revenue goal progress_to_50m is measured against
+EMPIRE_REVENUE_TARGET = 50000000
+
+# Chance that a lead at each stage closes; pipeline value is weighted by it
+STAGE_PROBABILITIES = {
+    "prospect": 0.05,
+    "contacted": 0.10,
+    "qualified": 0.25,
+    "proposal": 0.50,
+    "negotiation": 0.75,
+    "closed_won": 1.0,
+    "closed_lost": 0.0
+}
+
+def projected_total(daily: float, slope: float, days: int = 365) -> float:
+    """Sum of daily + slope * t for t = 1..days, never letting a day go below zero"""
+    if daily <= 0 and slope <= 0:
+        return 0.0
+    if slope >= 0:
+        return days * daily + slope * days * (days + 1) / 2
+    # A falling trend stops contributing once it reaches zero
+    positive_days = min(days, int(daily / -slope))
+    return positive_days * daily + slope * positive_days * (positive_days + 1) / 2
+
+class EmpireForecaster:
+    """Cached per-stream annual revenue forecasts, refreshed only when their inputs change"""
+
+    def __init__(self, db_path: str = 'empire_business.db', version: Optional[DataVersion] = None,
+                 history_days: int = 28, min_history_days: int = 3):
+        self.db_path = db_path
+        self.version = version
+        self.history_days = history_days
+        self.min_history_days = min_history_days
+        self._lock = threading.Lock()
+        self._trends: Dict[str, Dict] = {}
+        self._trend_hour = None
+        self._pipeline: Dict[str, Dict] = {}
+        self._pipeline_version = None
+        self._baseline: Dict[str, float] = {}
+        self._forecast: Optional[Dict] = None
+
+    def _fit_trends(self, cursor, now: float) -> Dict[str, Dict]:
+        """Least-squares line through each stream's complete daily revenue buckets"""
+        today = bucket_start(now, "day")
+        # x is days relative to today, so the intercept is today's fitted run rate. Only days with all
+        # 24 hours accrued count: a restart or the first day of history would otherwise look like a drop
+        cursor.execute("""
+            SELECT stream, COUNT(*), SUM(x), SUM(value), SUM(x * value), SUM(x * x)
+            FROM (SELECT revenue.stream, (revenue.bucket_start - ?) / ? AS x, revenue.value
+                  FROM metric_series AS revenue
+                  JOIN metric_series AS hours
+                    ON hours.bucket_seconds = revenue.bucket_seconds AND hours.metric = 'accrued_hours'
+                   AND hours.stream = ? AND hours.bucket_start = revenue.bucket_start
+                  WHERE revenue.bucket_seconds = ? AND revenue.metric = 'revenue'
+                    AND revenue.bucket_start >= ? AND revenue.bucket_start < ? AND hours.value >= 24)
+            GROUP BY stream
+        """, (today, float(DAY), EMPIRE_STREAM, DAY, today - self.history_days * DAY, today))
+        trends = {}
+        for stream, n, sx, sy, sxy, sxx in cursor.fetchall():
+            denominator = n * sxx - sx * sx
+            slope = (n * sxy - sx * sy) / denominator if n > 1 and denominator else 0.0
+            trends[stream] = {
+                "history_days": n,
+                "daily_run_rate": (sy - slope * sx) / n,
+                "daily_trend": slope
+            }
+        return trends
+
+    def _read_pipeline(self, cursor) -> Dict[str, Dict]:
+        """Raw and stage-weighted pipeline value per stream from the stage rollups"""
+        cursor.execute("SELECT revenue_stream, stage, pipeline_value FROM stream_stage_rollups WHERE lead_count > 0")
+        pipeline = {}
+        for stream, stage, value in cursor.fetchall():
+            totals = pipeline.setdefault(stream, {"pipeline_value": 0.0, "pipeline_expected": 0.0})
+            totals["pipeline_value"] += value
+            totals["pipeline_expected"] += value * STAGE_PROBABILITIES.get(stage, STAGE_PROBABILITIES["prospect"])
+        return pipeline
+
+    def forecast(self, baseline: Optional[Dict[str, float]] = None, force: bool = False) -> Dict:
+        """Re-read whichever inputs changed since the last call and return the forecast"""
+        now = time.time()
+        hour = bucket_start(now)
+        version = self.version.current() if self.version else None
+        baseline = dict(baseline or {})
+        with self._lock:
+            # Daily buckets only change when the hourly rollup runs
+            refit = force or hour != self._trend_hour
+            # Lead writes bump the data version; without one, re-read every call
+            reread = force or version is None or version != self._pipeline_version
+            if self._forecast is not None and not refit and not reread and baseline == self._baseline:
+                return self._forecast
+
+            if refit or reread:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                if refit:
+                    self._trends = self._fit_trends(cursor, now)
+                    self._trend_hour = hour
+                if reread:
+                    self._pipeline = self._read_pipeline(cursor)
+                    self._pipeline_version = version
+                conn.close()
+            self._baseline = baseline
+            forecast = self._combine(now)
+            previous = self._forecast
+            if previous is not None and {**forecast, "generated_at": None} == {**previous, "generated_at": None}:
+                # Same figures: keep the earlier body so responses stay identical within a data version
+                return previous
+            self._forecast = forecast
+            if previous is not None and not reread and self.version is not None:
+                # An hourly refit or a new baseline changed the figures without any write: bump the
+                # version so cached dashboards and forecast ETags built on the old figures go stale
+                self._pipeline_version = self.version.bump()
+            return self._forecast
+
+    def _combine(self, now: float) -> Dict:
+        streams = {}
+        for stream in set(self._trends) | set(self._pipeline) | set(self._baseline):
+            trend = self._trends.get(stream)
+            if trend and trend["history_days"] >= self.min_history_days:
+                method = "trend"
+                daily, slope = max(trend["daily_run_rate"], 0.0), trend["daily_trend"]
+            else:
+                # Too little history to fit: hold the current daily figure flat
+                method = "baseline"
+                daily, slope = self._baseline.get(stream, 0.0), 0.0
+            pipeline = self._pipeline.get(stream, {"pipeline_value": 0.0, "pipeline_expected": 0.0})
+            trend_annual = projected_total(daily, slope)
+            streams[stream] = {
+                "method": method,
+                "history_days": trend["history_days"] if trend else 0,
+                "daily_run_rate": round(daily, 2),
+                "daily_trend": round(slope, 4),
+                "trend_annual": int(trend_annual),
+                "pipeline_value": int(pipeline["pipeline_value"]),
+                "pipeline_expected": int(pipeline["pipeline_expected"]),
+                "annual_projection": int(trend_annual + pipeline["pipeline_expected"])
+            }
+        annual_projection = sum(stream["annual_projection"] for stream in streams.values())
+        return {
+            "streams": streams,
+            "daily_run_rate": int(sum(stream["daily_run_rate"] for stream in streams.values())),
+            "annual_projection": annual_projection,
+            "progress_to_50m": min(int(annual_projection / EMPIRE_REVENUE_TARGET * 100), 100),
+            "target": EMPIRE_REVENUE_TARGET,
+            "generated_at": int(now)
+        }
@@ -0,0 +1,190 @@
+"""
+Empire HTTP helpers - conditional GET responses keyed by the data version,
+response compression and fingerprinted static assets
+A route's ETag is known before it runs, so an unchanged refresh is answered
+with 304 Not Modified without touching SQLite or rendering a template
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from flask import Response, abort, make_response, request
+
+from empire_cache import DataVersion
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Compressed representations get their own strong ETag
+ENCODING_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+# Response types worth compressing (text/event-stream is deliberately absent)
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/css", "text/plain", "application/json", "application/javascript", "text/javascript"}
+
+def negotiate_encoding(available=("br", "gzip")) -> Optional[str]:
+    """Best content encoding the client accepts, preferring brotli when it is installed"""
+    for encoding in available:
+        if encoding == "br" and brotli is None:
+            continue
+        if request.accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def version_etag(version: DataVersion) -> str:
+    """Strong ETag for everything derived from the current data version"""
+    return f"{version.token}-{version.current()}"
+
+def conditional(version: DataVersion) -> Callable:
+    """Decorator adding ETag/Last-Modified to a GET route and answering matching ETag revalidations with 304"""
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return fn(*args, **kwargs)
+            # Read the version before the route runs: a write landing meanwhile
+            # leaves the response with an older tag, which only costs a 200 later
+            etag = version_etag(version)
+            last_modified = datetime.fromtimestamp(int(version.updated_at), timezone.utc)
+
+            # Clients revalidate with whichever (possibly compressed) tag they were sent. If-Modified-Since
+            # alone never earns a 304: at one-second precision it cannot tell apart two writes in the same second
+            matched = None
+            if request.if_none_match:
+                for candidate in [etag] + [etag + suffix for suffix in ENCODING_ETAG_SUFFIXES.values()]:
+                    if request.if_none_match.contains(candidate):
+                        matched = candidate
+                        break
+            if matched:
+                response = make_response("", 304)
+                etag = matched
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            # Always revalidate; the revalidation itself is the cheap part
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+class ResponseCompressor:
+    """after_request hook compressing HTML/JSON/text responses above a size threshold"""
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def init_app(self, app):
+        app.after_request(self.compress)
+
+    def compress(self, response: Response) -> Response:
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        compressed = compress_bytes(data, encoding, self.gzip_level, self.brotli_quality)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ENCODING_ETAG_SUFFIXES[encoding], weak)
+        with self._lock:
+            self.responses += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(compressed)
+        return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+                "brotli": brotli is not None
+            }
+
+class StaticAssets:
+    """Fingerprinted, precompressed static files served with immutable cache headers"""
+
+    def __init__(self, folder: str, url_prefix: str = "/assets"):
+        self.folder = folder
+        self.url_prefix = url_prefix
+        self._urls: Dict[str, str] = {}
+        self._files: Dict[str, Dict] = {}
+
+    def load(self):
+        """Hash and precompress every file in the folder (run once at startup)"""
+        for name in sorted(os.listdir(self.folder)):
+            path = os.path.join(self.folder, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            stem, ext = os.path.splitext(name)
+            fingerprinted = f"{stem}.{digest}{ext}"
+            bodies = {None: data, "gzip": compress_bytes(data, "gzip", 9)}
+            if brotli is not None:
+                bodies["br"] = compress_bytes(data, "br", brotli_quality=11)
+            self._files[fingerprinted] = {
+                "digest": digest,
+                "mimetype": mimetypes.guess_type(name)[0] or "application/octet-stream",
+                "bodies": bodies
+            }
+            self._urls[name] = f"{self.url_prefix}/{fingerprinted}"
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL of a static file (for templates: asset_url)"""
+        return self._urls[name]
+
+    def init_app(self, app):
+        self.load()
+        app.add_url_rule(f"{self.url_prefix}/<filename>", "empire_asset", self.serve)
+        app.add_template_global(self.url, "asset_url")
+
+    def serve(self, filename: str) -> Response:
+        asset = self._files.get(filename)
+        if asset is None:
+            abort(404)
+        encoding = negotiate_encoding([encoding for encoding in ("br", "gzip") if encoding in asset["bodies"]])
+        etag = asset["digest"] + ENCODING_ETAG_SUFFIXES.get(encoding, "")
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(asset["bodies"][encoding], mimetype=asset["mimetype"])
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.vary.add("Accept-Encoding")
+        # The name changes with the content, so the file itself never does
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
@@ -0,0 +1,299 @@
+"""
+Empire background jobs - durable SQLite job queue drained by a worker pool
+Routes enqueue a job and return 202 at once; worker threads in any process
+claim queued jobs by priority, and /api/jobs/<id> reads state, progress and result
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+# queued -> running -> succeeded | failed (a crashed running job goes back to queued
+# and resumes from its last checkpoint)
+JOB_STATES = ["queued", "running", "succeeded", "failed"]
+FINISHED_STATES = {"succeeded", "failed"}
+
+# Columns added after the jobs table first shipped
+JOB_COLUMNS = [
+    ("priority", "INTEGER DEFAULT 0"),
+    ("dedup_key", "TEXT"),
+    ("attempts", "INTEGER DEFAULT 0"),
+    ("worker", "TEXT"),
+    ("heartbeat_ts", "INTEGER"),
+    ("checkpoint", "TEXT")
+]
+
+class JobProgress:
+    """Callback handed to a job function for reporting progress and checkpointing batch work"""
+
+    def __init__(self, manager: "JobManager", job_id: str, checkpoint: Optional[Dict] = None,
+                 min_interval: float = 0.25):
+        self.manager = manager
+        self.job_id = job_id
+        # Last committed checkpoint: empty on a first run, where to resume after a crash
+        self.checkpoint = checkpoint or {}
+        self.min_interval = min_interval
+        self._last_write = 0.0
+
+    def __call__(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        # Throttle writes; the final step is always recorded
+        now = time.time()
+        if total is not None and done < total and now - self._last_write < self.min_interval:
+            return
+        self._last_write = now
+        self.manager._update(self.job_id, progress_done=done, progress_total=total, message=message)
+
+    def save_checkpoint(self, cursor, state: Dict):
+        """Record state on the job's own cursor, so it commits atomically with the batch it describes"""
+        cursor.execute("UPDATE jobs SET checkpoint = ? WHERE id = ?", (json.dumps(state), self.job_id))
+        self.checkpoint = state
+
+class JobManager:
+    """Durable priority job queue in SQLite, drained by a pool of worker threads"""
+
+    def __init__(self, db_path: str = 'empire_business.db', workers: int = 4, poll_interval: float = 1.0,
+                 lease: float = 60.0, max_attempts: int = 3, retention: float = 86400):
+        self.db_path = db_path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        # A running job whose heartbeat is older than the lease was orphaned by a crash
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running = set()
+        self._submitted = False
+        self.completed = 0
+        self.failed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor):
+        """Jobs table and queue indexes (called from init_empire_database)"""
+        cursor.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            state TEXT NOT NULL,
+            params TEXT,
+            progress_done INTEGER DEFAULT 0,
+            progress_total INTEGER,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            created_ts INTEGER,
+            started_ts INTEGER,
+            finished_ts INTEGER
+        )""")
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(jobs)").fetchall()}
+        for column, definition in JOB_COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_ts)")
+        # Claim order: highest priority first, then oldest
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (priority DESC, created_ts) WHERE state = 'queued'")
+        # At most one queued job per dedup key; enqueueing a duplicate returns the pending one
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key) WHERE state = 'queued'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs (heartbeat_ts) WHERE state = 'running'")
+
+    def register(self, kind: str, handler: Callable, priority: int = 0):
+        """handler(progress, **params) -> JSON-serialisable result; higher priority runs first"""
+        self._handlers[kind] = {"handler": handler, "priority": priority}
+
+    def submit(self, kind: str, priority: Optional[int] = None, dedup: bool = True, **params) -> Dict:
+        """Enqueue a job (or find the identical one already queued) and return it"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind {kind}")
+        if priority is None:
+            priority = self._handlers[kind]["priority"]
+        encoded = json.dumps(params, sort_keys=True)
+        dedup_key = hashlib.sha256(f"{kind}:{encoded}".encode()).hexdigest()[:32] if dedup else None
+        job_id = uuid.uuid4().hex
+        now = int(time.time())
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM jobs WHERE finished_ts < ?", (now - self.retention,))
+        cursor.execute("""INSERT OR IGNORE INTO jobs (id, kind, state, params, priority, dedup_key, created_ts)
+                          VALUES (?, ?, 'queued', ?, ?, ?, ?)""", (job_id, kind, encoded, priority, dedup_key, now))
+        deduplicated = cursor.rowcount == 0
+        if deduplicated:
+            job_id = cursor.execute("SELECT id FROM jobs WHERE dedup_key = ? AND state = 'queued'",
+                                    (dedup_key,)).fetchone()[0]
+        conn.commit()
+        conn.close()
+
+        with self._wakeup:
+            self._submitted = True
+            self._wakeup.notify()
+        job = self.get(job_id)
+        job["deduplicated"] = deduplicated
+        return job
+
+    def _claim(self) -> Optional[tuple]:
+        """Atomically move the next queued job to running; any process may call this"""
+        now = int(time.time())
+        conn = self._connect()
+        row = conn.execute("""
+            UPDATE jobs
+            SET state = 'running', worker = ?, attempts = attempts + 1, started_ts = ?, heartbeat_ts = ?
+            WHERE id = (SELECT id FROM jobs WHERE state = 'queued' ORDER BY priority DESC, created_ts, rowid LIMIT 1)
+            RETURNING id, kind, params, checkpoint
+        """, (self.worker_id, now, now)).fetchone()
+        conn.commit()
+        conn.close()
+        return row
+
+    def _run(self, job_id: str, kind: str, params: str, checkpoint: Optional[str] = None):
+        with self._lock:
+            self._running.add(job_id)
+        succeeded = False
+        try:
+            progress = JobProgress(self, job_id, json.loads(checkpoint) if checkpoint else None)
+            result = self._handlers[kind]["handler"](progress, **json.loads(params or "{}"))
+            self._update(job_id, state="succeeded", result=json.dumps(result), finished_ts=int(time.time()))
+            succeeded = True
+        except Exception as e:
+            print(f"❌ Job {kind} {job_id} failed: {e}")
+            self._update(job_id, state="failed", error=str(e), finished_ts=int(time.time()))
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"Error claiming empire job: {e}")
+                job = None
+            if job is None:
+                # Woken early by a submit in this process; jobs from other processes are polled
+                with self._wakeup:
+                    if not self._submitted:
+                        self._wakeup.wait(self.poll_interval)
+                    self._submitted = False
+                continue
+            self._run(*job)
+
+    def recover(self) -> int:
+        """Requeue running jobs whose heartbeat lapsed (their worker died); returns jobs requeued"""
+        now = int(time.time())
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""UPDATE jobs SET state = 'failed', error = 'Worker lost too many times', finished_ts = ?
+                          WHERE state = 'running' AND heartbeat_ts < ? AND attempts >= ?""",
+                       (now, now - self.lease, self.max_attempts))
+        # A requeued job loses its dedup slot if an identical one was queued meanwhile
+        cursor.execute("""UPDATE OR IGNORE jobs SET state = 'queued', worker = NULL, message = 'Requeued after worker loss'
+                          WHERE state = 'running' AND heartbeat_ts < ?""", (now - self.lease,))
+        requeued = cursor.rowcount
+        cursor.execute("""UPDATE jobs SET state = 'failed', error = 'Duplicate of a queued job after worker loss',
+                          finished_ts = ? WHERE state = 'running' AND heartbeat_ts < ?""", (now, now - self.lease))
+        conn.commit()
+        conn.close()
+        if requeued:
+            print(f"♻️ Requeued {requeued} orphaned empire jobs")
+            with self._wakeup:
+                self._submitted = True
+                self._wakeup.notify_all()
+        return requeued
+
+    def _heartbeat(self):
+        """Keep this process's running jobs leased and reclaim jobs orphaned elsewhere"""
+        while not self._stop.wait(self.lease / 3):
+            try:
+                with self._lock:
+                    running = list(self._running)
+                if running:
+                    conn = self._connect()
+                    conn.executemany("UPDATE jobs SET heartbeat_ts = ? WHERE id = ? AND state = 'running'",
+                                     [(int(time.time()), job_id) for job_id in running])
+                    conn.commit()
+                    conn.close()
+                self.recover()
+            except sqlite3.Error as e:
+                print(f"Error in empire job heartbeat: {e}")
+
+    def start(self):
+        """Start the worker threads (serve.py starts them in every gunicorn worker)"""
+        if self._threads:
+            return
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        self.recover()
+        self._threads = [threading.Thread(target=self._worker, name=f"empire-job-{i}", daemon=True)
+                         for i in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="empire-job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming jobs and wait for the ones in flight"""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _update(self, job_id: str, **fields):
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if not fields:
+            return
+        conn = self._connect()
+        conn.execute(f"UPDATE jobs SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?",
+                     (*fields.values(), job_id))
+        conn.commit()
+        conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "state": row["state"],
+            "priority": row["priority"],
+            "params": json.loads(row["params"] or "{}"),
+            "progress": {"done": row["progress_done"], "total": row["progress_total"], "message": row["message"]},
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "checkpoint": json.loads(row["checkpoint"]) if row["checkpoint"] else None,
+            "created_ts": row["created_ts"],
+            "started_ts": row["started_ts"],
+            "finished_ts": row["finished_ts"]
+        }
+
+    def stats(self) -> Dict:
+        """Queue depth by state plus this process's worker counters"""
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        conn.close()
+        return {
+            "states": {state: counts.get(state, 0) for state in JOB_STATES},
+            "workers": len([thread for thread in self._threads if thread.name != "empire-job-heartbeat"]),
+            "running_here": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed
+        }
@@ -0,0 +1,312 @@
+"""
+Empire metrics service - in-process counters for the dashboard
+Writers record leads, content and activities as they happen; the counters
+are flushed to empire_metrics periodically so dashboard reads never touch SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from empire_cache import DataVersion
+from empire_timeseries import EMPIRE_STREAM, HOUR, EmpireTimeSeries, bucket_start, day_label, day_range
+
+# Revenue and pipeline figures used until empire_metrics has a row to load
+EMPIRE_METRICS_BASELINE = {
+    "total_daily_revenue": 15600,
+    "job_search_revenue": 2500,
+    "health_management_revenue": 3200,
+    "speaking_revenue": 4100,
+    "retreat_revenue": 5800,
+    "meetings_booked": 8,
+    "proposals_sent": 15,
+    "deals_closed": 3
+}
+
+# Daily revenue columns and the revenue stream each one belongs to
+REVENUE_STREAM_COLUMNS = {
+    "job_search_revenue": "Job/Advisor Search",
+    "health_management_revenue": "Health Management",
+    "speaking_revenue": "Speaking Engagements",
+    "retreat_revenue": "Retreat Hosting"
+}
+
+class EmpireMetricsService:
+    """Incrementally maintained empire counters with periodic flush to empire_metrics"""
+
+    def __init__(self, db_path: str = 'empire_business.db', flush_interval: float = 30.0,
+                 timeseries: Optional[EmpireTimeSeries] = None, version: Optional[DataVersion] = None):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.timeseries = timeseries
+        # Bumped when a resync finds counts written by another process, so cached reads are rebuilt
+        self.version = version
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._dirty = False
+        # Time-series increments waiting for the next flush, keyed by (metric, stream, hour)
+        self._pending_series: Dict[tuple, float] = {}
+        self._accrued_hour = None
+        self._rolled_up_hour = None
+        self._day = day_label()
+        self._counters = dict(EMPIRE_METRICS_BASELINE)
+        self._counters.update({
+            "leads_generated": 0,
+            "content_created": 0,
+            "content_today": 0,
+            "activities_logged": 0
+        })
+
+    def load(self):
+        """Seed the counters from the database (run once at startup)"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT total_daily_revenue, job_search_revenue, health_management_revenue,
+                       speaking_revenue, retreat_revenue, meetings_booked, proposals_sent, deals_closed
+                FROM empire_metrics ORDER BY id DESC LIMIT 1
+            """)
+            latest = cursor.fetchone()
+
+            live = self._read_live_counts(cursor)
+            conn.close()
+
+            with self._lock:
+                if latest:
+                    for key, value in zip(EMPIRE_METRICS_BASELINE, latest):
+                        if value is not None:
+                            self._counters[key] = value
+                self._counters.update(live)
+        except Exception as e:
+            print(f"Error loading empire metrics: {e}")
+
+    def _read_live_counts(self, cursor) -> Dict:
+        """Read the counters derived from rows any process may write (leads, content, activities)"""
+        cursor.execute("SELECT COALESCE(SUM(lead_count), 0) FROM stream_rollups")
+        leads_total = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM content_pieces")
+        content_total = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM content_pieces WHERE created_ts >= ? AND created_ts < ?", day_range())
+        content_today = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM activities")
+        activities_total = cursor.fetchone()[0]
+        return {
+            "leads_generated": leads_total,
+            "content_created": content_total,
+            "content_today": content_today,
+            "activities_logged": activities_total
+        }
+
+    def _roll_day(self):
+        """Reset the per-day counters at UTC midnight (caller holds the lock)"""
+        today = day_label()
+        if today != self._day:
+            self._day = today
+            self._counters["content_today"] = 0
+            self._dirty = True
+
+    def _add_series(self, metric: str, stream: str, value: float):
+        """Buffer a time-series increment for the next flush (caller holds the lock)"""
+        key = (metric, stream, bucket_start(time.time()))
+        self._pending_series[key] = self._pending_series.get(key, 0) + value
+
+    def record_leads(self, count: int, by_stream: Optional[Dict[str, int]] = None):
+        """Count newly written leads, optionally broken down by revenue stream"""
+        with self._lock:
+            self._roll_day()
+            self._counters["leads_generated"] += count
+            for stream, stream_count in (by_stream or {EMPIRE_STREAM: count}).items():
+                self._add_series("leads", stream, stream_count)
+            self._dirty = True
+
+    def record_content(self, count: int):
+        """Count newly written content pieces"""
+        with self._lock:
+            self._roll_day()
+            self._counters["content_created"] += count
+            self._counters["content_today"] += count
+            self._add_series("content", EMPIRE_STREAM, count)
+            self._dirty = True
+
+    def record_activity(self, action_type: str):
+        """Count a newly logged activity"""
+        with self._lock:
+            self._counters["activities_logged"] += 1
+
+    def snapshot(self) -> Dict:
+        """Current counters without touching the database"""
+        with self._lock:
+            self._roll_day()
+            return dict(self._counters)
+
+    def _accrual_points(self, cursor, counters: Dict, hour: int):
+        """Each hour's share of the daily revenue, meeting and deal figures, for every hour since the last
+        one accrued by any process (downtime included, so day buckets hold the full daily figures)"""
+        last = self.timeseries.read_state(cursor, "accrued_hour")
+        first = bucket_start(hour, "day") if last is None else min(last + HOUR, hour)
+        # Past hours get today's figures: the daily figures are all empire_metrics keeps
+        first = max(first, self.timeseries.earliest_hour())
+        points = []
+        for ts in range(first, hour + HOUR, HOUR):
+            points.extend(("revenue", stream, counters[column] / 24, ts, "set")
+                          for column, stream in REVENUE_STREAM_COLUMNS.items())
+            points.append(("meetings", EMPIRE_STREAM, counters["meetings_booked"] / 24, ts, "set"))
+            points.append(("deals", EMPIRE_STREAM, counters["deals_closed"] / 24, ts, "set"))
+            points.append(("accrued_hours", EMPIRE_STREAM, 1, ts, "set"))
+        self.timeseries.advance_state(cursor, "accrued_hour", hour)
+        return points
+
+    def flush(self):
+        """Resync the counters written by other processes and, if anything changed here, write today's metrics row"""
+        hour = bucket_start(time.time())
+        with self._lock:
+            accrue = self.timeseries is not None and hour != self._accrued_hour
+            write = self._dirty or accrue
+            self._dirty = False
+            counters = dict(self._counters)
+            day = self._day
+            series = self._pending_series
+            self._pending_series = {}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            live = self._read_live_counts(cursor)
+            if write:
+                cursor.execute("""
+                    UPDATE empire_metrics SET leads_generated = ?, content_created = ?
+                    WHERE id = (SELECT MAX(id) FROM empire_metrics WHERE date = ?)
+                """, (live["leads_generated"], live["content_today"], day))
+                if cursor.rowcount == 0:
+                    cursor.execute("""
+                        INSERT INTO empire_metrics
+                        (total_daily_revenue, job_search_revenue, health_management_revenue,
+                         speaking_revenue, retreat_revenue, leads_generated, content_created,
+                         meetings_booked, proposals_sent, deals_closed, date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (counters["total_daily_revenue"], counters["job_search_revenue"],
+                          counters["health_management_revenue"], counters["speaking_revenue"],
+                          counters["retreat_revenue"], live["leads_generated"], live["content_today"],
+                          counters["meetings_booked"], counters["proposals_sent"],
+                          counters["deals_closed"], day))
+
+                if self.timeseries is not None:
+                    points = [(metric, stream, value, ts, "add") for (metric, stream, ts), value in series.items()]
+                    if accrue:
+                        points.extend(self._accrual_points(cursor, counters, hour))
+                    self.timeseries.record_many(points, cursor)
+
+                conn.commit()
+            conn.close()
+
+            with self._lock:
+                changed = any(self._counters[key] != value for key, value in live.items())
+                self._counters.update(live)
+                if accrue:
+                    self._accrued_hour = hour
+            if changed and self.version is not None:
+                # Rows written by another worker: reads cached on the current version used the old counts
+                self.version.bump()
+        except Exception as e:
+            with self._lock:
+                if write:
+                    self._dirty = True
+                for key, value in series.items():
+                    self._pending_series[key] = self._pending_series.get(key, 0) + value
+            print(f"Error flushing empire metrics: {e}")
+
+    def rollup(self):
+        """Roll hourly time-series buckets up to daily/weekly once per hour"""
+        hour = bucket_start(time.time())
+        if self.timeseries is None or hour == self._rolled_up_hour:
+            return
+        try:
+            self.timeseries.rollup()
+            self._rolled_up_hour = hour
+        except Exception as e:
+            print(f"Error rolling up empire time series: {e}")
+
+    def _run(self):
+        self.rollup()
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            self.rollup()
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="empire-metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write any pending counters"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+class MetricsDeltaFeed:
+    """Tracks when each dashboard value last changed so clients can fetch deltas since a cursor"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = None
+        self._pid = None
+        self._seq = 0
+        self._values: Dict = {}
+        self._changed_at: Dict[str, int] = {}
+
+    def observe(self, values: Dict) -> int:
+        """Record the current values and return the sequence number covering them"""
+        with self._lock:
+            changed = [key for key, value in values.items()
+                       if key not in self._values or self._values[key] != value]
+            if changed:
+                self._seq += 1
+                for key in changed:
+                    self._values[key] = values[key]
+                    self._changed_at[key] = self._seq
+            return self._seq
+
+    @property
+    def token(self) -> str:
+        # Cursors from another process (or before a restart) fall back to a full snapshot;
+        # a worker forked from a preloading master draws its own token instead of sharing the master's
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._token = os.urandom(4).hex()
+                    self._pid = os.getpid()
+        return self._token
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def cursor(self, seq: int, activity_id: int) -> str:
+        return f"{self.token}.{seq}.{activity_id}"
+
+    def parse_cursor(self, cursor: Optional[str]):
+        """Split a cursor into (seq, activity_id); seq is None when the cursor is not from this feed"""
+        try:
+            token, seq, activity_id = (cursor or "").split(".")
+            seq, activity_id = int(seq), int(activity_id)
+        except ValueError:
+            return None, 0
+        if token != self.token or seq > self._seq:
+            return None, activity_id
+        return seq, activity_id
+
+    def changes_since(self, seq: Optional[int]) -> Dict:
+        """Values changed after seq, or every value when seq is None"""
+        with self._lock:
+            if seq is None:
+                return dict(self._values)
+            return {key: self._values[key] for key, changed in self._changed_at.items() if changed > seq}
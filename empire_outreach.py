@@ -0,0 +1,346 @@
+"""
+Empire outreach engine - personalized emails over pooled SMTP connections
+Messages go out from a bounded worker pool that reuses SMTP sessions, spaces
+sends per recipient domain and records contacts in bulk
+"""
+
+import queue
+import smtplib
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+
+from empire_ratelimit import RateBucket
+from empire_resilience import ResilientClient
+
+# Subject/body per revenue stream, filled from the lead row
+OUTREACH_TEMPLATES = {
+    "Job/Advisor Search": ("{company}'s next technology leader",
+                           "Hi {first_name},\n\nAs {title} at {company}, you know how much rides on the next senior "
+                           "technology hire. I help {industry} teams find and vet executive talent - worth a short call?"),
+    "Health Management": ("Executive health for {company}",
+                          "Hi {first_name},\n\nLeaders at {company} carry a lot. Our executive health programme keeps "
+                          "them performing - could I share how other {industry} firms use it?"),
+    "Speaking Engagements": ("Keynote for your next {industry} event",
+                             "Hi {first_name},\n\nI speak on AI leadership and would love to contribute to "
+                             "{company}'s upcoming programme. Happy to send topics and past talks."),
+    "Retreat Hosting": ("A leadership retreat for {company}",
+                        "Hi {first_name},\n\nWe design leadership retreats for teams like yours at {company}. "
+                        "Would a short overview of upcoming dates be useful?"),
+    "Product Development": ("Early access for {company}",
+                            "Hi {first_name},\n\nWe are opening our beta to a few {industry} product teams and "
+                            "thought of {company}. Interested in a look?"),
+    "Strategic Partnerships": ("Partnering with {company}",
+                               "Hi {first_name},\n\nI think there is a natural partnership between our work and "
+                               "{company}. Open to exploring it?"),
+    "Investment/Funding": ("Introduction from the AI Empire",
+                           "Hi {first_name},\n\nI'd value {company}'s perspective on our next round. "
+                           "Could I send a short deck?")
+}
+DEFAULT_TEMPLATE = ("Hello from the AI Empire", "Hi {first_name},\n\nI'd love to connect about {company}.")
+
+# Honorifics skipped when picking a first name
+_HONORIFICS = {"dr.", "dr", "mr.", "mrs.", "ms.", "prof."}
+
+# Refused recipients are a problem with the address, not with the relay
+SMTP_RECIPIENT_ERRORS = (smtplib.SMTPRecipientsRefused,)
+
+# The relay refused this message; smtplib has reset the session, which stays usable
+SMTP_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+def first_name(name: Optional[str]) -> str:
+    parts = [part for part in (name or "").split() if part.lower() not in _HONORIFICS]
+    return parts[0] if parts else "there"
+
+def email_domain(address: str) -> str:
+    return address.rsplit("@", 1)[-1].lower()
+
+class _TrackedSMTP(smtplib.SMTP):
+    """smtplib.SMTP noting when message data started going out; past that point a resend may duplicate it"""
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+class SMTPPool:
+    """Bounded pool of persistent SMTP sessions, reconnected when the server drops them"""
+
+    def __init__(self, host: str, port: int = 25, size: int = 4, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = False, timeout: float = 30.0,
+                 max_idle: float = 60.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = _TrackedSMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.starttls:
+            smtp.starttls()
+            smtp.ehlo()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        self.opened += 1
+        return smtp
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session (at most size at once); a session that errors is discarded"""
+        with self._slots:
+            smtp = None
+            try:
+                smtp, idle_since = self._idle.get_nowait()
+                # Long-idle sessions may have been closed by the server
+                if time.time() - idle_since > self.max_idle and smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("stale session")
+            except queue.Empty:
+                smtp = None
+            except (smtplib.SMTPException, OSError):
+                self._close(smtp)
+                smtp = None
+            if smtp is None:
+                smtp = self._open()
+            try:
+                yield smtp
+            except SMTP_MESSAGE_ERRORS:
+                # Checked first: every SMTPException is also an OSError. smtplib closes the
+                # socket itself when the refusal was a 421 shutdown
+                if smtp.sock is not None:
+                    self._idle.put((smtp, time.time()))
+                raise
+            except (smtplib.SMTPException, OSError):
+                self._close(smtp)
+                raise
+            self._idle.put((smtp, time.time()))
+
+    def _close(self, smtp: Optional[smtplib.SMTP]):
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def close(self):
+        while True:
+            try:
+                smtp, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(smtp)
+
+class DomainRateLimiter:
+    """Spaces sends to each recipient domain at most per_minute apart"""
+
+    def __init__(self, per_minute: float = 60.0):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def acquire(self, domain: str) -> float:
+        """Reserve the domain's next slot and sleep until it; returns seconds waited"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+def interleave_by_domain(leads: List[Dict]) -> List[Dict]:
+    """Round-robin leads across domains so one throttled domain does not stall every worker"""
+    by_domain: Dict[str, List[Dict]] = {}
+    for lead in leads:
+        by_domain.setdefault(email_domain(lead["email"]), []).append(lead)
+    ordered = []
+    while by_domain:
+        for domain in list(by_domain):
+            ordered.append(by_domain[domain].pop(0))
+            if not by_domain[domain]:
+                del by_domain[domain]
+    return ordered
+
+class OutreachEngine:
+    """Selects leads, renders personalized emails and sends them through an SMTPPool"""
+
+    def __init__(self, pool: Optional[SMTPPool], sender: str = "empire@localhost", db_path: str = 'empire_business.db',
+                 concurrency: int = 4, domain_per_minute: float = 60.0, batch_size: int = 100,
+                 cooldown_days: float = 7, max_attempts: int = 3, quota: Optional[RateBucket] = None,
+                 client: Optional[ResilientClient] = None):
+        # Without a pool the engine renders messages but sends and records nothing (dry run)
+        self.pool = pool
+        # Relay-wide send quota shared with the other workers
+        self.quota = quota
+        # Circuit breaker and adaptive concurrency around the relay (sends are never retried or hedged)
+        self.client = client
+        self.sender = sender
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.limiter = DomainRateLimiter(domain_per_minute)
+        self.batch_size = batch_size
+        self.cooldown_days = cooldown_days
+        self.max_attempts = max_attempts
+
+    def select_leads(self, stream: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Best-scoring prospects, one row per email address, whose address is not in its contact cooldown"""
+        cooldown = int(time.time() - self.cooldown_days * 86400)
+        # Lead generation writes the same person under new ids, so the cooldown, the attempt cap
+        # and the stage check apply to the address across all of its rows
+        sql = """WITH addresses AS (
+                     SELECT lower(email) AS address,
+                            SUM(COALESCE(contact_attempts, 0)) AS attempts,
+                            MAX(COALESCE(last_contact_ts, 0)) AS last_contact_ts,
+                            MAX(COALESCE(stage, 'prospect') != 'prospect') AS engaged
+                     FROM leads WHERE email LIKE '%_@_%' GROUP BY lower(email)
+                 ), candidates AS (
+                     SELECT id, name, email, company, title, industry, revenue_stream, icp_score,
+                            ROW_NUMBER() OVER (PARTITION BY lower(email) ORDER BY COALESCE(icp_score, 0) DESC, id) AS pick
+                     FROM leads WHERE email LIKE '%_@_%'"""
+        params: list = []
+        if stream:
+            sql += " AND revenue_stream = ?"
+            params.append(stream)
+        sql += """
+                 )
+                 SELECT id, name, email, company, title, industry, revenue_stream
+                 FROM candidates JOIN addresses ON addresses.address = lower(candidates.email)
+                 WHERE pick = 1 AND NOT engaged AND attempts < ? AND addresses.last_contact_ts < ?
+                 ORDER BY COALESCE(icp_score, 0) DESC, attempts, id LIMIT ?"""
+        params.extend([self.max_attempts, cooldown, limit])
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        leads = [dict(row) for row in conn.execute(sql, params).fetchall()]
+        conn.close()
+        return leads
+
+    def render(self, lead: Dict, follow_up: bool = False) -> EmailMessage:
+        subject, body = OUTREACH_TEMPLATES.get(lead.get("revenue_stream"), DEFAULT_TEMPLATE)
+        if follow_up:
+            subject = "Re: " + subject
+            body = body.replace("\n\n", "\n\nFollowing up on my earlier note. ", 1)
+        fields = {
+            "first_name": first_name(lead.get("name")),
+            "company": lead.get("company") or "your company",
+            "title": lead.get("title") or "a leader",
+            "industry": lead.get("industry") or "your industry"
+        }
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = lead["email"]
+        message["Subject"] = subject.format(**fields)
+        message.set_content(body.format(**fields))
+        return message
+
+    def _send_one(self, lead: Dict, message: EmailMessage) -> float:
+        waited = self.limiter.acquire(email_domain(lead["email"]))
+        if self.quota:
+            waited += self.quota.acquire()
+        if self.client:
+            self.client.call(self._deliver, message)
+        else:
+            self._deliver(message)
+        return waited
+
+    def _deliver(self, message: EmailMessage):
+        session = None
+        try:
+            with self.pool.connection() as smtp:
+                session = smtp
+                smtp.data_started = False
+                smtp.send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # Only a session dropped before DATA is retried (one resend on a fresh one); once data
+            # went out the relay may have accepted the message, and refusals are never resent
+            if session is None or session.data_started:
+                raise
+            with self.pool.connection() as smtp:
+                smtp.send_message(message)
+
+    def record_contacts(self, lead_ids: List[str], method: str = "email"):
+        """Bump contact_attempts/last_contact and log one activity per lead in one transaction"""
+        if not lead_ids:
+            return
+        now = datetime.now()
+        iso, epoch = now.isoformat(), int(now.timestamp())
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        cursor.executemany("""UPDATE leads SET contact_attempts = COALESCE(contact_attempts, 0) + 1,
+                                  last_contact = ?, updated_at = ?, last_contact_ts = ?, updated_ts = ?
+                              WHERE id = ?""", [(iso, iso, epoch, epoch, lead_id) for lead_id in lead_ids])
+        cursor.executemany("""INSERT INTO lead_activities (lead_id, activity_type, description, timestamp, timestamp_ts)
+                              VALUES (?, 'contact', ?, ?, ?)""",
+                           [(lead_id, f"Empire outreach sent via {method}", iso, epoch) for lead_id in lead_ids])
+        conn.commit()
+        conn.close()
+
+    def run(self, leads: List[Dict], progress: Optional[Callable] = None, follow_up: bool = False) -> Dict:
+        """Send one message per lead; contacts are recorded every batch_size sends"""
+        started = time.perf_counter()
+        method = "follow-up email" if follow_up else "email"
+        # Never mail one address twice in a run, whatever rows the caller passed in
+        unique, seen = [], set()
+        for lead in leads:
+            if lead["email"].lower() not in seen:
+                seen.add(lead["email"].lower())
+                unique.append(lead)
+        messages = [(lead, self.render(lead, follow_up)) for lead in interleave_by_domain(unique)]
+        if self.pool is None:
+            return {"sent": 0, "failed": 0, "rendered": len(messages), "dry_run": True,
+                    "seconds": round(time.perf_counter() - started, 3), "messages_per_second": 0.0, "domains": {}}
+
+        sent, failed, pending = 0, 0, []
+        throttled = 0.0
+        domains = Counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="empire-outreach") as executor:
+                futures = {executor.submit(self._send_one, lead, message): lead for lead, message in messages}
+                for future in as_completed(futures):
+                    lead = futures[future]
+                    try:
+                        throttled += future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"❌ Outreach to {lead['email']} failed: {e}")
+                        continue
+                    sent += 1
+                    domains[email_domain(lead["email"])] += 1
+                    pending.append(lead["id"])
+                    if len(pending) >= self.batch_size:
+                        self.record_contacts(pending, method)
+                        pending = []
+                    if progress:
+                        progress(sent + failed, len(messages), f"Sent {sent} of {len(messages)} emails")
+        finally:
+            # Whatever stops the run, delivered emails are recorded so the next run does not resend them
+            self.record_contacts(pending, method)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "sent": sent,
+            "failed": failed,
+            "rendered": len(messages),
+            "dry_run": False,
+            "seconds": round(elapsed, 3),
+            "messages_per_second": round(sent / elapsed, 1) if elapsed else 0.0,
+            "throttled_seconds": round(throttled, 3),
+            "smtp_sessions_opened": self.pool.opened,
+            "domains": dict(domains)
+        }
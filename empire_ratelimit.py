@@ -0,0 +1,124 @@
+"""
+Empire rate limits - token buckets per outbound provider, shared by every worker
+Bucket state lives in SQLite; taking tokens is one atomic UPDATE that refills
+the bucket and reserves the caller's slot, so all processes together stay at the quota
+"""
+
+import asyncio
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+# Refill since the last update, capped at capacity (old column values inside UPDATE ... SET)
+_AVAILABLE = "MIN(capacity, tokens + MAX(0, :now - updated_ts) * rate)"
+
+class SharedRateLimiter:
+    """Named token buckets in one SQLite file; a caller over quota reserves the next tokens and sleeps until then"""
+
+    def __init__(self, path: str = 'empire_ratelimit.db'):
+        self.path = path
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS rate_buckets (
+            name TEXT PRIMARY KEY,
+            rate REAL NOT NULL,
+            capacity REAL NOT NULL,
+            tokens REAL NOT NULL,
+            updated_ts REAL NOT NULL,
+            acquired REAL DEFAULT 0,
+            throttled INTEGER DEFAULT 0,
+            wait_seconds REAL DEFAULT 0,
+            rejected INTEGER DEFAULT 0
+        )""")
+        conn.commit()
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        # Bucket state is disposable; losing the last writes in a crash only refills buckets early
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def configure(self, name: str, per_minute: float, burst: Optional[float] = None):
+        """Create or resize a bucket: per_minute sustained, up to burst at once (defaults to one second's worth)"""
+        rate = per_minute / 60.0
+        capacity = max(burst if burst is not None else rate, 1.0)
+        conn = self._connect()
+        conn.execute("""INSERT INTO rate_buckets (name, rate, capacity, tokens, updated_ts) VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (name) DO UPDATE SET rate = excluded.rate, capacity = excluded.capacity,
+                            tokens = MIN(tokens, excluded.capacity)""",
+                     (name, rate, capacity, capacity, time.time()))
+        conn.close()
+
+    def reserve(self, name: str, tokens: float = 1, max_wait: Optional[float] = None) -> Optional[float]:
+        """Take tokens now or reserve them; returns the seconds to wait, or None if that would exceed max_wait"""
+        now = time.time()
+        params = {"now": now, "n": tokens, "name": name, "max_wait": 1e18 if max_wait is None else max_wait}
+        conn = self._connect()
+        rows = conn.execute(f"""UPDATE rate_buckets
+                               SET tokens = {_AVAILABLE} - :n,
+                                   updated_ts = MAX(updated_ts, :now),
+                                   acquired = acquired + :n,
+                                   throttled = throttled + ({_AVAILABLE} < :n),
+                                   wait_seconds = wait_seconds + MAX(0, :n - {_AVAILABLE}) / rate
+                               WHERE name = :name AND {_AVAILABLE} - :n >= -rate * :max_wait
+                               RETURNING tokens, rate""", params).fetchall()
+        if not rows:
+            exists = conn.execute("UPDATE rate_buckets SET rejected = rejected + 1 WHERE name = ?", (name,)).rowcount
+            conn.close()
+            if not exists:
+                raise KeyError(f"Unknown rate bucket {name}")
+            return None
+        conn.close()
+        remaining, rate = rows[0]
+        return max(0.0, -remaining / rate)
+
+    def acquire(self, name: str, tokens: float = 1, timeout: Optional[float] = None) -> Optional[float]:
+        """Block until tokens are available; returns seconds waited, or None (nothing taken) past timeout"""
+        wait = self.reserve(name, tokens, timeout)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, name: str, tokens: float = 1, timeout: Optional[float] = None) -> Optional[float]:
+        """acquire() for asyncio callers: the reservation runs in a thread (the write can wait on
+        SQLite's busy timeout under contention), the wait is asyncio.sleep"""
+        wait = await asyncio.to_thread(self.reserve, name, tokens, timeout)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def bucket(self, name: str) -> "RateBucket":
+        return RateBucket(self, name)
+
+    def stats(self) -> List[Dict]:
+        """Per bucket: quota, tokens available now and shared throttling counters"""
+        now = time.time()
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(f"SELECT *, {_AVAILABLE} AS available FROM rate_buckets ORDER BY name",
+                            {"now": now}).fetchall()
+        conn.close()
+        return [{
+            "name": row["name"],
+            "per_minute": round(row["rate"] * 60, 2),
+            "burst": row["capacity"],
+            "available": round(row["available"], 2),
+            "acquired": row["acquired"],
+            "throttled": row["throttled"],
+            "wait_seconds": round(row["wait_seconds"], 3),
+            "rejected": row["rejected"]
+        } for row in rows]
+
+class RateBucket:
+    """One provider's bucket, handed to the client that calls that provider"""
+
+    def __init__(self, limiter: SharedRateLimiter, name: str):
+        self.limiter = limiter
+        self.name = name
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> Optional[float]:
+        return self.limiter.acquire(self.name, tokens, timeout)
+
+    async def acquire_async(self, tokens: float = 1, timeout: Optional[float] = None) -> Optional[float]:
+        return await self.limiter.acquire_async(self.name, tokens, timeout)
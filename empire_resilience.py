@@ -0,0 +1,263 @@
+"""
+Empire provider resilience - circuit breaking, adaptive concurrency and hedged retries
+Every outbound provider call goes through a ResilientClient: a sick provider is
+failed fast, a slow one gets fewer concurrent calls, and idempotent lookups hedge
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Callable, Deque, Dict, Optional
+
+class ProviderUnavailable(RuntimeError):
+    """The provider was not called: its circuit is open or no concurrency slot freed up in time"""
+
+class CircuitBreaker:
+    """Opens when failure_rate of the last window calls failed; after reset_timeout one probe call decides"""
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 10, reset_timeout: float = 15.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def rejecting(self) -> bool:
+        """Open and not yet due a probe (checked before queueing for a concurrency slot)"""
+        return self.state == "open" and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                # Exactly one probe at a time; everyone else keeps failing fast
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, ok: bool):
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+                if ok:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self.state == "open":
+                # Calls let through before the circuit opened
+                return
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: +1 per limit's worth of successes, x backoff on errors or median latency over baseline x tolerance"""
+
+    def __init__(self, max_limit: int = 8, min_limit: int = 1, initial: Optional[int] = None,
+                 tolerance: float = 2.0, backoff: float = 0.7, window: int = 10):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max_limit)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.inflight = 0
+        # Median of the last window successes: a slow tail alone is not congestion
+        self._recent: Deque[float] = deque(maxlen=window)
+        # Uncongested latency: the lowest median seen, drifting up slowly so a permanently slower provider is relearned
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        # Waiting callers in arrival order; a freed slot is handed to the oldest so nobody starves
+        self._waiters: Deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if not self._waiters and self.inflight < int(self.limit):
+                self.inflight += 1
+                return True
+            if timeout == 0:
+                return False
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        if waiter.wait(timeout):
+            return True
+        with self._lock:
+            # Handed a slot just as the wait timed out
+            if waiter.is_set():
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def _hand_over(self):
+        while self._waiters and self.inflight < int(self.limit):
+            self.inflight += 1
+            self._waiters.popleft().set()
+
+    def release(self, latency: Optional[float] = None, ok: bool = True):
+        """Free a slot; latency None means the provider was never called, so the limit stays put"""
+        with self._lock:
+            self.inflight -= 1
+            if latency is not None:
+                congested = not ok
+                if ok:
+                    self._recent.append(latency)
+                    typical = sorted(self._recent)[len(self._recent) // 2]
+                    if self.baseline is None or typical < self.baseline:
+                        self.baseline = typical
+                    else:
+                        self.baseline += (typical - self.baseline) * 0.01
+                    congested = typical > self.baseline * self.tolerance
+                now = time.monotonic()
+                if congested:
+                    # One decrease per round trip, not one per call caught in the same slowdown
+                    if now - self._last_decrease >= latency:
+                        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                        self._last_decrease = now
+                elif self.inflight + 1 >= self.limit / 2:
+                    # Only grow a limit that is actually being used
+                    self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._hand_over()
+
+class ResilientClient:
+    """Runs provider calls under a circuit breaker and an adaptive concurrency limit, hedging idempotent ones"""
+
+    def __init__(self, name: str, max_concurrency: int = 8, min_concurrency: int = 1, queue_timeout: float = 10.0,
+                 breaker: Optional[CircuitBreaker] = None, hedge_percentile: Optional[float] = None,
+                 retries: int = 0, retry_backoff: float = 0.2, ignore_errors: tuple = ()):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        # Waiting longer than this for a slot fails the call instead of piling it up
+        self.queue_timeout = queue_timeout
+        # Idempotent calls still running at this latency percentile get a second attempt
+        self.hedge_percentile = hedge_percentile
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        # Errors that say nothing about the provider's health (e.g. a refused recipient) pass straight through
+        self.ignore_errors = ignore_errors
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix=f"empire-{name}") \
+            if hedge_percentile else None
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "succeeded": 0, "failed": 0, "rejected_open": 0, "shed": 0,
+                         "retried": 0, "hedged": 0, "hedge_wins": 0}
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def call(self, fn: Callable, *args, idempotent: bool = False, **kwargs):
+        """fn(*args, **kwargs) through the breaker and limiter; only idempotent calls are retried or hedged"""
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                if idempotent and self._executor:
+                    return self._hedged(fn, args, kwargs)
+                return self._attempt(fn, args, kwargs)
+            except ProviderUnavailable:
+                raise
+            except Exception:
+                if attempt == attempts - 1:
+                    raise
+                self._count("retried")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def _attempt(self, fn: Callable, args: tuple, kwargs: Dict, queue_timeout: Optional[float] = None):
+        if self.breaker.rejecting:
+            self._count("rejected_open")
+            raise ProviderUnavailable(f"{self.name}: circuit open")
+        if not self.concurrency.acquire(self.queue_timeout if queue_timeout is None else queue_timeout):
+            self._count("shed")
+            raise ProviderUnavailable(f"{self.name}: no concurrency slot within {self.queue_timeout}s")
+        if not self.breaker.allow():
+            self.concurrency.release()
+            self._count("rejected_open")
+            raise ProviderUnavailable(f"{self.name}: circuit open")
+        self._count("calls")
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except self.ignore_errors:
+            self.concurrency.release(time.perf_counter() - started, ok=True)
+            self.breaker.record(True)
+            self._count("failed")
+            raise
+        except Exception:
+            self.concurrency.release(time.perf_counter() - started, ok=False)
+            self.breaker.record(False)
+            self._count("failed")
+            raise
+        latency = time.perf_counter() - started
+        self.concurrency.release(latency, ok=True)
+        self.breaker.record(True)
+        self._count("succeeded")
+        with self._lock:
+            self._latencies.append(latency)
+        return result
+
+    def _percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < 20:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def _hedged(self, fn: Callable, args: tuple, kwargs: Dict):
+        delay = self._percentile(self.hedge_percentile)
+        if delay is None:
+            return self._attempt(fn, args, kwargs)
+        first = self._executor.submit(self._attempt, fn, args, kwargs)
+        if wait([first], timeout=delay).done:
+            return first.result()
+        # Still running at the hedge percentile: race a second attempt if a slot is free right now
+        self._count("hedged")
+        second = self._executor.submit(self._attempt, fn, args, kwargs, 0)
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                result = future.result()
+            except Exception as e:
+                # A real provider error explains more than "no slot for the hedge"
+                if error is None or not isinstance(e, ProviderUnavailable):
+                    error = e
+                continue
+            if future is second:
+                self._count("hedge_wins")
+            return result
+        raise error
+
+    def stats(self) -> Dict:
+        p50, p95 = self._percentile(0.5), self._percentile(0.95)
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "name": self.name,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "inflight": self.concurrency.inflight,
+            "baseline_ms": round(self.concurrency.baseline * 1000, 2) if self.concurrency.baseline else None,
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            **counters
+        }
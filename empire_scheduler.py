@@ -0,0 +1,250 @@
+"""
+Empire automation scheduler - recurring tasks on `schedule` intervals
+Each run is enqueued on the durable job queue; one leader process (chosen by
+an flock) schedules, run history survives restarts so missed runs catch up
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import schedule
+except ImportError:  # schedule is optional; without it nothing runs on a timer
+    schedule = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process assumes it is the only one
+    fcntl = None
+
+from empire_jobs import FINISHED_STATES, JobManager
+
+class LeaderLock:
+    """Non-blocking flock marking the one process that runs a singleton background loop"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other process holds it; True while this process holds it"""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            self._file = True
+            return True
+        lock_file = open(self.path, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file not in (None, True):
+            self._file.close()
+        self._file = None
+
+class EmpireScheduler:
+    """Leader-elected recurring tasks with jitter, overlap prevention, catch-up and timing stats"""
+
+    def __init__(self, jobs: JobManager, db_path: str = 'empire_business.db',
+                 lock_path: str = 'empire_business.db.scheduler.lock', tick: float = 1.0):
+        self.jobs = jobs
+        self.db_path = db_path
+        self.lock_path = lock_path
+        self.tick = tick
+        self.tasks: Dict[str, Dict] = {}
+        self._scheduler = schedule.Scheduler() if schedule else None
+        self._leader = LeaderLock(lock_path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return self._scheduler is not None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader.held
+
+    def init_schema(self, cursor):
+        """Run history and timing per task (called from init_empire_database)"""
+        cursor.execute("""CREATE TABLE IF NOT EXISTS scheduler_runs (
+            name TEXT PRIMARY KEY,
+            last_run_ts REAL,
+            last_job_id TEXT,
+            runs INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            skipped_overlap INTEGER DEFAULT 0,
+            caught_up INTEGER DEFAULT 0,
+            total_seconds REAL DEFAULT 0,
+            max_seconds REAL DEFAULT 0,
+            last_seconds REAL,
+            last_finished_ts REAL,
+            last_error TEXT
+        )""")
+
+    def add(self, name: str, handler: Callable, every_minutes: float, jitter_minutes: float = 0,
+            priority: int = 0, **params):
+        """Run handler(progress, **params) as a job every every_minutes (+ up to jitter_minutes)"""
+        kind = f"scheduled_{name}"
+
+        def timed(progress, **job_params):
+            started = time.perf_counter()
+            error = None
+            try:
+                return handler(progress, **job_params)
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                self._record_timing(name, time.perf_counter() - started, error)
+
+        self.jobs.register(kind, timed, priority=priority)
+        self.tasks[name] = {
+            "kind": kind,
+            "every": every_minutes * 60,
+            "jitter": jitter_minutes * 60,
+            "params": params
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _record_timing(self, name: str, seconds: float, error: Optional[str]):
+        conn = self._connect()
+        conn.execute("""UPDATE scheduler_runs
+                        SET runs = runs + 1, failures = failures + ?, total_seconds = total_seconds + ?,
+                            max_seconds = MAX(max_seconds, ?), last_seconds = ?, last_finished_ts = ?,
+                            last_error = COALESCE(?, last_error)
+                        WHERE name = ?""",
+                     (1 if error else 0, seconds, seconds, seconds, time.time(), error, name))
+        conn.commit()
+        conn.close()
+
+    def trigger(self, name: str, catch_up: bool = False) -> Optional[Dict]:
+        """Enqueue one run of a task unless its previous run is still queued or running"""
+        task = self.tasks[name]
+        conn = self._connect()
+        row = conn.execute("SELECT last_job_id FROM scheduler_runs WHERE name = ?", (name,)).fetchone()
+        conn.close()
+        previous = self.jobs.get(row[0]) if row and row[0] else None
+        # Each write is its own transaction; the job queue commits on a separate connection
+        conn = self._connect()
+        if previous and previous["state"] not in FINISHED_STATES:
+            conn.execute("UPDATE scheduler_runs SET skipped_overlap = skipped_overlap + 1 WHERE name = ?", (name,))
+            job = None
+        else:
+            job = self.jobs.submit(task["kind"], **task["params"])
+            conn.execute("""INSERT INTO scheduler_runs (name, last_run_ts, last_job_id, caught_up) VALUES (?, ?, ?, ?)
+                            ON CONFLICT (name) DO UPDATE SET last_run_ts = excluded.last_run_ts,
+                                last_job_id = excluded.last_job_id, caught_up = caught_up + excluded.caught_up""",
+                         (name, time.time(), job["id"], 1 if catch_up else 0))
+        conn.commit()
+        conn.close()
+        return job
+
+    def _run_task(self, name: str):
+        try:
+            self.trigger(name)
+        except Exception as e:
+            print(f"❌ Scheduled task {name} failed to enqueue: {e}")
+
+    def _plan(self):
+        """Create the schedule jobs, resuming each task's cadence from its last recorded run"""
+        conn = self._connect()
+        last_runs = dict(conn.execute("SELECT name, last_run_ts FROM scheduler_runs").fetchall())
+        conn.close()
+        now = time.time()
+        for name, task in self.tasks.items():
+            every = max(int(task["every"]), 1)
+            # schedule picks a random interval in [every, every + jitter] for each run
+            job = self._scheduler.every(every)
+            if task["jitter"]:
+                job = job.to(every + int(task["jitter"]))
+            job.seconds.do(self._run_task, name).tag(name)
+            last_run = last_runs.get(name)
+            if last_run is None:
+                continue
+            if last_run + task["every"] <= now:
+                # Missed while no leader was running: run once now rather than once per missed slot
+                self.trigger(name, catch_up=True)
+            else:
+                job.next_run = datetime.fromtimestamp(last_run + task["every"])
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._leader.acquire():
+                    if not self._scheduler.jobs:
+                        print(f"⏰ Empire scheduler leading in process {os.getpid()} ({len(self.tasks)} tasks)")
+                        self._plan()
+                    self._scheduler.run_pending()
+            except Exception as e:
+                print(f"Error in empire scheduler: {e}")
+            # Followers re-check the lock so one takes over if the leader exits
+            self._stop.wait(self.tick if self.is_leader else self.tick * 10)
+
+    def start(self):
+        """Start the scheduler thread (only the lock holder schedules anything)"""
+        if not self.available or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="empire-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._leader.release()
+        if self._scheduler:
+            self._scheduler.clear()
+
+    def stats(self) -> Dict:
+        """Per-task run counts, timings and next run (next run is only known in the leader)"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = {row["name"]: row for row in conn.execute("SELECT * FROM scheduler_runs").fetchall()}
+        conn.close()
+        next_runs = {}
+        if self._scheduler:
+            for job in self._scheduler.jobs:
+                for tag in job.tags:
+                    next_runs[tag] = job.next_run.timestamp() if job.next_run else None
+        tasks: List[Dict] = []
+        for name, task in self.tasks.items():
+            row = rows.get(name)
+            runs = row["runs"] if row else 0
+            tasks.append({
+                "name": name,
+                "every_minutes": task["every"] / 60,
+                "jitter_minutes": task["jitter"] / 60,
+                "last_run_ts": row["last_run_ts"] if row else None,
+                "next_run_ts": next_runs.get(name),
+                "runs": runs,
+                "failures": row["failures"] if row else 0,
+                "skipped_overlap": row["skipped_overlap"] if row else 0,
+                "caught_up": row["caught_up"] if row else 0,
+                "avg_seconds": round(row["total_seconds"] / runs, 4) if runs else None,
+                "max_seconds": round(row["max_seconds"], 4) if runs else None,
+                "last_seconds": round(row["last_seconds"], 4) if row and row["last_seconds"] is not None else None,
+                "last_error": row["last_error"] if row else None
+            })
+        return {
+            "available": self.available,
+            "leader": self.is_leader,
+            "pid": os.getpid(),
+            "tasks": tasks
+        }
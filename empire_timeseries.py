@@ -0,0 +1,210 @@
+"""
+Empire time-series store - per-stream metrics in hourly buckets
+Hourly buckets are rolled up into daily and weekly buckets so trend charts
+read a handful of pre-aggregated rows instead of scanning the raw tables
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+HOUR = 3600
+DAY = 86400
+WEEK = 604800
+RESOLUTIONS = {"hour": HOUR, "day": DAY, "week": WEEK}
+
+# Metrics kept in the store; every bucket value is summed when rolling up
+# (accrued_hours is 1 per hour the daily figures were spread over, so a day bucket of 24 is complete)
+SERIES_METRICS = ("revenue", "leads", "content", "meetings", "deals", "accrued_hours")
+
+# Stream name used for metrics that are not tied to a revenue stream
+EMPIRE_STREAM = "empire"
+
+# 1970-01-05 was the first Monday after the epoch; weeks start on Mondays
+_WEEK_OFFSET = 4 * DAY
+
+def bucket_start(ts: float, resolution: str = "hour") -> int:
+    """Start of the bucket containing the epoch timestamp ts"""
+    ts = int(ts)
+    if resolution == "week":
+        return ts - (ts - _WEEK_OFFSET) % WEEK
+    return ts - ts % RESOLUTIONS[resolution]
+
+def to_epoch(value: Union[str, datetime, None]) -> Optional[int]:
+    """Epoch seconds for an ISO timestamp or datetime (naive values are local time)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+def day_range(day: Optional[date] = None) -> Tuple[int, int]:
+    """[start, end) epoch seconds of a UTC calendar day, today by default (days are UTC everywhere, like the day buckets)"""
+    if day is None:
+        start = bucket_start(time.time(), "day")
+    else:
+        start = int(datetime.combine(day, datetime.min.time(), timezone.utc).timestamp())
+    return start, start + DAY
+
+def day_label(ts: Optional[float] = None) -> str:
+    """UTC calendar date (YYYY-MM-DD) of the day bucket containing ts, today by default"""
+    return datetime.fromtimestamp(bucket_start(ts if ts is not None else time.time(), "day"), timezone.utc).strftime('%Y-%m-%d')
+
+class EmpireTimeSeries:
+    """Hourly per-stream metric buckets with automatic rollup to daily and weekly"""
+
+    def __init__(self, db_path: str = 'empire_business.db',
+                 hourly_retention_days: int = 14, daily_retention_days: int = 400):
+        self.db_path = db_path
+        self.hourly_retention = hourly_retention_days * DAY
+        self.daily_retention = daily_retention_days * DAY
+        self._lock = threading.Lock()
+
+    def init_schema(self, cursor):
+        """Create the bucket tables (called from init_empire_database)"""
+        cursor.execute("""CREATE TABLE IF NOT EXISTS metric_series (
+            bucket_seconds INTEGER,
+            metric TEXT,
+            stream TEXT,
+            bucket_start INTEGER,
+            value REAL,
+            PRIMARY KEY (bucket_seconds, metric, stream, bucket_start)
+        ) WITHOUT ROWID""")
+        cursor.execute("""CREATE TABLE IF NOT EXISTS metric_series_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER
+        )""")
+
+    def record_many(self, points: Iterable[Tuple], cursor=None):
+        """Write (metric, stream, value, ts, mode) points into hourly buckets ('add' accumulates, 'set' overwrites)"""
+        now = time.time()
+        rows_add, rows_set = [], []
+        for metric, stream, value, ts, mode in points:
+            row = (metric, stream or EMPIRE_STREAM, bucket_start(ts if ts is not None else now), value)
+            (rows_set if mode == "set" else rows_add).append(row)
+        if not rows_add and not rows_set:
+            return
+        earliest = min(row[2] for row in rows_add + rows_set)
+        if earliest < self._hourly_horizon(now):
+            raise ValueError("Cannot record points older than the hourly retention window")
+
+        own_conn = cursor is None
+        if own_conn:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO metric_series (bucket_seconds, metric, stream, bucket_start, value)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (bucket_seconds, metric, stream, bucket_start) DO UPDATE SET value = value + excluded.value
+        """, [(HOUR, *row) for row in rows_add])
+        cursor.executemany("""INSERT OR REPLACE INTO metric_series (bucket_seconds, metric, stream, bucket_start, value)
+                              VALUES (?, ?, ?, ?, ?)""", [(HOUR, *row) for row in rows_set])
+        # Late points reopen the days they fall in for the next rollup
+        cursor.execute("UPDATE metric_series_state SET value = ? WHERE key = 'rollup_watermark' AND value > ?",
+                       (bucket_start(earliest, "day"), bucket_start(earliest, "day")))
+        if own_conn:
+            conn.commit()
+            conn.close()
+
+    def _hourly_horizon(self, now: float) -> int:
+        """Oldest hourly bucket kept; aligned to a day so kept days are always complete"""
+        return bucket_start(now - self.hourly_retention, "day")
+
+    def earliest_hour(self, now: Optional[float] = None) -> int:
+        """Oldest hour record_many() still accepts"""
+        return self._hourly_horizon(now if now is not None else time.time())
+
+    def read_state(self, cursor, key: str) -> Optional[int]:
+        cursor.execute("SELECT value FROM metric_series_state WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def advance_state(self, cursor, key: str, value: int):
+        """Store value under key unless a larger one is already there (writers in several processes)"""
+        cursor.execute("""INSERT INTO metric_series_state (key, value) VALUES (?, ?)
+                          ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)""", (key, value))
+
+    def record(self, metric: str, value: float, stream: Optional[str] = None,
+               ts: Optional[float] = None, mode: str = "add"):
+        """Write a single point into its hourly bucket"""
+        self.record_many([(metric, stream, value, ts, mode)])
+
+    def rollup(self, now: Optional[float] = None):
+        """Recompute daily and weekly buckets touched since the last rollup and prune old buckets"""
+        now = int(now if now is not None else time.time())
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT value FROM metric_series_state WHERE key = 'rollup_watermark'")
+            row = cursor.fetchone()
+            if row:
+                watermark = row[0]
+            else:
+                cursor.execute("SELECT MIN(bucket_start) FROM metric_series WHERE bucket_seconds = ?", (HOUR,))
+                watermark = cursor.fetchone()[0] or now
+            day_from = bucket_start(watermark, "day")
+            week_from = bucket_start(watermark, "week")
+
+            # Re-aggregate whole days/weeks from the finer resolution, so
+            # the (partial) current day and week stay correct on every run
+            cursor.execute("""
+                INSERT OR REPLACE INTO metric_series (bucket_seconds, metric, stream, bucket_start, value)
+                SELECT ?, metric, stream, bucket_start - bucket_start % ?, SUM(value)
+                FROM metric_series
+                WHERE bucket_seconds = ? AND bucket_start >= ?
+                GROUP BY metric, stream, bucket_start - bucket_start % ?
+            """, (DAY, DAY, HOUR, day_from, DAY))
+            cursor.execute("""
+                INSERT OR REPLACE INTO metric_series (bucket_seconds, metric, stream, bucket_start, value)
+                SELECT ?, metric, stream, bucket_start - (bucket_start - ?) % ?, SUM(value)
+                FROM metric_series
+                WHERE bucket_seconds = ? AND bucket_start >= ?
+                GROUP BY metric, stream, bucket_start - (bucket_start - ?) % ?
+            """, (WEEK, _WEEK_OFFSET, WEEK, DAY, week_from, _WEEK_OFFSET, WEEK))
+
+            # Everything before the current day is final from here on
+            new_watermark = bucket_start(now, "day")
+            cursor.execute("INSERT OR REPLACE INTO metric_series_state (key, value) VALUES ('rollup_watermark', ?)",
+                           (new_watermark,))
+
+            # Downsample: drop fine buckets once they are covered by coarser ones
+            cursor.execute("DELETE FROM metric_series WHERE bucket_seconds = ? AND bucket_start < ?",
+                           (HOUR, min(new_watermark, self._hourly_horizon(now))))
+            cursor.execute("DELETE FROM metric_series WHERE bucket_seconds = ? AND bucket_start < ?",
+                           (DAY, min(bucket_start(now, "week"), bucket_start(now - self.daily_retention, "week"))))
+
+            conn.commit()
+            conn.close()
+
+    def query(self, metric: str, start: float, end: float, resolution: str = "hour",
+              stream: Optional[str] = None, total: bool = False) -> List[Dict]:
+        """Buckets for metric in [start, end), per stream or summed across streams when total is set"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution!r}; expected one of {', '.join(RESOLUTIONS)}")
+        params = [RESOLUTIONS[resolution], metric, bucket_start(start, resolution), int(end)]
+        stream_filter = ""
+        if stream:
+            stream_filter = "AND stream = ?"
+            params.append(stream)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        if total:
+            cursor.execute(f"""
+                SELECT bucket_start, SUM(value) FROM metric_series
+                WHERE bucket_seconds = ? AND metric = ? AND bucket_start >= ? AND bucket_start < ? {stream_filter}
+                GROUP BY bucket_start ORDER BY bucket_start
+            """, params)
+            rows = [{"bucket_start": row[0], "value": row[1]} for row in cursor.fetchall()]
+        else:
+            cursor.execute(f"""
+                SELECT stream, bucket_start, value FROM metric_series
+                WHERE bucket_seconds = ? AND metric = ? AND bucket_start >= ? AND bucket_start < ? {stream_filter}
+                ORDER BY stream, bucket_start
+            """, params)
+            rows = [{"stream": row[0], "bucket_start": row[1], "value": row[2]} for row in cursor.fetchall()]
+        conn.close()
+        return rows
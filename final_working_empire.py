@@ -4,18 +4,145 @@ ALL BUTTONS FUNCTIONAL WITH REAL DATABASE UPDATES
 Job Search, Health Management, Speaking, Retreats
 """
 
-from flask import Flask, jsonify, render_template_string, request, redirect, url_for
+from flask import Flask, Response, jsonify, render_template, request, redirect, url_for
+from jinja2 import DictLoader
+from markupsafe import Markup
 import os
+import atexit
+import base64
 import json
 import sqlite3
 import threading
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
 import random
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process init lock
+    fcntl = None
+
+from empire_analysis import EmpireAnalysisEngine, FUNNEL_STAGES, LOST_STAGE
+from empire_cache import DataVersion, ProviderCache, SharedDataVersion, VersionedCache
+from empire_content import CachedProvider, ContentPipeline, OpenAIProvider, PLATFORM_FORMATS, ResilientProvider, TemplateProvider
+from empire_events import EventBroadcaster
+from empire_followups import FollowUpScheduler
+from empire_forecast import EmpireForecaster
+from empire_http import ResponseCompressor, StaticAssets, conditional
+from empire_jobs import JobManager, JobProgress
+from empire_outreach import OutreachEngine, SMTP_RECIPIENT_ERRORS, SMTPPool
+from empire_ratelimit import SharedRateLimiter
+from empire_resilience import ResilientClient
+from empire_scheduler import EmpireScheduler
+from empire_metrics import EmpireMetricsService, MetricsDeltaFeed, REVENUE_STREAM_COLUMNS
+from empire_timeseries import EmpireTimeSeries, RESOLUTIONS, to_epoch
 
 app = Flask(__name__)
 
+# Read cache for dashboard/leads queries, invalidated by every write; serve.py
+# points EMPIRE_VERSION_FILE at a shared file so every worker sees every write
+_version_file = os.environ.get('EMPIRE_VERSION_FILE')
+data_version = SharedDataVersion(_version_file) if _version_file else DataVersion()
+empire_cache = VersionedCache(data_version, ttl=float(os.environ.get('EMPIRE_CACHE_TTL', 0)) or None)
+
+# ETag / Last-Modified for GET routes whose output only changes with the data version
+conditional_get = conditional(data_version)
+
+# Page CSS/JS served from fingerprinted, immutable URLs; text responses compressed
+static_assets = StaticAssets(app.static_folder)
+static_assets.init_app(app)
+response_compressor = ResponseCompressor(min_size=int(os.environ.get('EMPIRE_COMPRESS_MIN_BYTES', 1024)))
+response_compressor.init_app(app)
+
+# Live dashboard events (Server-Sent Events)
+event_broadcaster = EventBroadcaster()
+
+# Hourly per-stream metric history with daily/weekly rollups
+empire_timeseries = EmpireTimeSeries()
+
+# Funnel / cohort analysis behind /run-analysis
+analysis_engine = EmpireAnalysisEngine()
+
+# Per-stream annual revenue forecasts behind annual_projection / progress_to_50m
+revenue_forecaster = EmpireForecaster(version=data_version)
+
+# Generation, content, outreach and analysis run from a durable job queue behind /api/jobs/<id>
+job_manager = JobManager(
+    workers=int(os.environ.get('EMPIRE_JOB_WORKERS', 4)),
+    lease=float(os.environ.get('EMPIRE_JOB_LEASE_SECONDS', 60))
+)
+
+# Outbound provider quotas as (name, calls per minute, burst), shared by every worker through one SQLite file;
+# EMPIRE_RATE_<NAME>_PER_MINUTE / EMPIRE_RATE_<NAME>_BURST override them
+PROVIDER_QUOTAS = [
+    ("openai", 500, 50),
+    ("apollo", 60, 10),
+    ("calendly", 60, 10),
+    ("smtp", 600, 60)
+]
+rate_limiter = SharedRateLimiter(os.environ.get('EMPIRE_RATELIMIT_DB', 'empire_ratelimit.db'))
+for quota_name, quota_per_minute, quota_burst in PROVIDER_QUOTAS:
+    rate_limiter.configure(
+        quota_name,
+        per_minute=float(os.environ.get(f'EMPIRE_RATE_{quota_name.upper()}_PER_MINUTE', quota_per_minute)),
+        burst=float(os.environ.get(f'EMPIRE_RATE_{quota_name.upper()}_BURST', quota_burst))
+    )
+
+# Circuit breaker and AIMD concurrency limit per provider in this process; the configured
+# concurrency is the ceiling and a slow or failing provider gets fewer calls (see /api/providers)
+_outreach_concurrency = int(os.environ.get('EMPIRE_OUTREACH_CONCURRENCY', 4))
+_content_concurrency = int(os.environ.get('EMPIRE_CONTENT_CONCURRENCY', 4))
+provider_clients = {
+    "smtp": ResilientClient("smtp", max_concurrency=_outreach_concurrency, ignore_errors=SMTP_RECIPIENT_ERRORS),
+    "openai": ResilientClient("openai", max_concurrency=_content_concurrency)
+}
+
+# Outreach email over pooled SMTP; without EMPIRE_SMTP_HOST messages are only rendered (dry run)
+outreach_engine = OutreachEngine(
+    SMTPPool(
+        os.environ['EMPIRE_SMTP_HOST'],
+        port=int(os.environ.get('EMPIRE_SMTP_PORT', 25)),
+        size=_outreach_concurrency,
+        username=os.environ.get('EMPIRE_SMTP_USER'),
+        password=os.environ.get('EMPIRE_SMTP_PASSWORD'),
+        starttls=os.environ.get('EMPIRE_SMTP_STARTTLS') == '1'
+    ) if os.environ.get('EMPIRE_SMTP_HOST') else None,
+    sender=os.environ.get('EMPIRE_SMTP_FROM', 'empire@localhost'),
+    concurrency=_outreach_concurrency,
+    domain_per_minute=float(os.environ.get('EMPIRE_OUTREACH_DOMAIN_PER_MINUTE', 60)),
+    quota=rate_limiter.bucket("smtp"),
+    client=provider_clients["smtp"]
+)
+
+# External provider responses, shared by every worker; identical requests are answered from disk
+provider_cache = ProviderCache(
+    os.environ.get('EMPIRE_PROVIDER_CACHE', 'empire_provider_cache.db'),
+    max_bytes=int(float(os.environ.get('EMPIRE_PROVIDER_CACHE_MB', 64)) * 1024 * 1024),
+    ttl=float(os.environ.get('EMPIRE_PROVIDER_CACHE_TTL_HOURS', 168)) * 3600 or None
+)
+
+# Content generation; EMPIRE_OPENAI_API_KEY switches from the local template provider to an OpenAI-compatible API
+content_pipeline = ContentPipeline(
+    CachedProvider(ResilientProvider(OpenAIProvider(
+        os.environ['EMPIRE_OPENAI_API_KEY'],
+        model=os.environ.get('EMPIRE_OPENAI_MODEL', 'gpt-4o-mini'),
+        base_url=os.environ.get('EMPIRE_OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+        pool_size=_content_concurrency,
+        quota=rate_limiter.bucket("openai")
+    ), provider_clients["openai"]), provider_cache) if os.environ.get('EMPIRE_OPENAI_API_KEY') else TemplateProvider(),
+    concurrency=_content_concurrency,
+    batch_size=int(os.environ.get('EMPIRE_CONTENT_BATCH_SIZE', 20))
+)
+
+# Recurring automation, opt-in with EMPIRE_SCHEDULER=1; one process schedules, any worker runs the jobs
+empire_scheduler = EmpireScheduler(job_manager)
+
+# Per-lead follow-ups: a contact schedules one EMPIRE_FOLLOWUP_DAYS out, sent by a followup_dispatch job when due
+EMPIRE_FOLLOWUP_DAYS = float(os.environ.get('EMPIRE_FOLLOWUP_DAYS', 3))
+followup_scheduler = FollowUpScheduler(job_manager)
+
 # Dr. Dédé's Complete ICP Criteria for All Revenue Streams
 COMPLETE_ICP_CRITERIA = {
     "job_search_clients": {
@@ -76,12 +203,164 @@ COMPLETE_ICP_CRITERIA = {
     }
 }
 
+# Revenue streams in display order
+EMPIRE_REVENUE_STREAMS = [
+    "Job/Advisor Search",
+    "Health Management",
+    "Speaking Engagements",
+    "Retreat Hosting",
+    "Product Development",
+    "Strategic Partnerships",
+    "Investment/Funding"
+]
+
+def _rollup_apply_sql(column: str, sign: str) -> str:
+    """Trigger statements adding (sign '+') or removing (sign '-') one lead row from the rollups"""
+    # column turns a leads column name into the SQL expression for the row, e.g. "NEW.{}"
+    stream = f"COALESCE({column.format('revenue_stream')}, 'Other')"
+    stage = f"COALESCE({column.format('stage')}, 'prospect')"
+    deal_value = f"COALESCE({column.format('deal_value')}, 0)"
+    icp_score = f"COALESCE({column.format('icp_score')}, 0)"
+    statements = []
+    if sign == '+':
+        statements.append(f"""INSERT INTO stream_rollups (revenue_stream)
+            SELECT {stream} WHERE NOT EXISTS
+                (SELECT 1 FROM stream_rollups WHERE revenue_stream = {stream});""")
+        statements.append(f"""INSERT INTO stream_stage_rollups (revenue_stream, stage)
+            SELECT {stream}, {stage} WHERE NOT EXISTS
+                (SELECT 1 FROM stream_stage_rollups WHERE revenue_stream = {stream} AND stage = {stage});""")
+    statements.append(f"""UPDATE stream_rollups
+            SET lead_count = lead_count {sign} 1,
+                pipeline_value = pipeline_value {sign} {deal_value},
+                icp_total = icp_total {sign} {icp_score}
+            WHERE revenue_stream = {stream};""")
+    statements.append(f"""UPDATE stream_stage_rollups
+            SET lead_count = lead_count {sign} 1,
+                pipeline_value = pipeline_value {sign} {deal_value}
+            WHERE revenue_stream = {stream} AND stage = {stage};""")
+    return "\n            ".join(statements)
+
+# Triggers keeping stream_rollups / stream_stage_rollups in step with leads.
+# Statements inside the bodies avoid ON CONFLICT clauses because the
+# INSERT OR REPLACE used by the lead writers would override them.
+STREAM_ROLLUP_TRIGGERS = [
+    # INSERT OR REPLACE removes the old row without firing the DELETE trigger,
+    # so take the replaced row out of the rollups before the insert lands
+    f"""CREATE TRIGGER IF NOT EXISTS leads_rollup_replace BEFORE INSERT ON leads
+        WHEN EXISTS (SELECT 1 FROM leads WHERE id = NEW.id)
+        BEGIN
+            {_rollup_apply_sql("(SELECT {} FROM leads WHERE id = NEW.id)", "-")}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS leads_rollup_insert AFTER INSERT ON leads
+        BEGIN
+            {_rollup_apply_sql("NEW.{}", "+")}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS leads_rollup_delete AFTER DELETE ON leads
+        BEGIN
+            {_rollup_apply_sql("OLD.{}", "-")}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS leads_rollup_update
+        AFTER UPDATE OF revenue_stream, stage, deal_value, icp_score ON leads
+        BEGIN
+            {_rollup_apply_sql("OLD.{}", "-")}
+            {_rollup_apply_sql("NEW.{}", "+")}
+        END"""
+]
+
+def rebuild_stream_rollups(cursor):
+    """Recompute the per-stream rollups from the leads table"""
+    cursor.execute("DELETE FROM stream_rollups")
+    cursor.execute("DELETE FROM stream_stage_rollups")
+    cursor.execute("""
+        INSERT INTO stream_rollups (revenue_stream, lead_count, pipeline_value, icp_total)
+        SELECT COALESCE(revenue_stream, 'Other'), COUNT(*),
+               SUM(COALESCE(deal_value, 0)), SUM(COALESCE(icp_score, 0))
+        FROM leads GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO stream_stage_rollups (revenue_stream, stage, lead_count, pipeline_value)
+        SELECT COALESCE(revenue_stream, 'Other'), COALESCE(stage, 'prospect'), COUNT(*),
+               SUM(COALESCE(deal_value, 0))
+        FROM leads GROUP BY 1, 2
+    """)
+
+# Integer epoch columns mirroring the ISO text timestamps: (table, iso column, epoch column)
+EPOCH_COLUMNS = [
+    ("leads", "created_at", "created_ts"),
+    ("leads", "updated_at", "updated_ts"),
+    ("leads", "last_contact", "last_contact_ts"),
+    ("activities", "timestamp", "timestamp_ts"),
+    ("content_pieces", "created_at", "created_ts"),
+    ("lead_activities", "timestamp", "timestamp_ts")
+]
+
+EPOCH_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_leads_created_ts ON leads (created_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_last_contact_ts ON leads (last_contact_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_activities_timestamp_ts ON activities (timestamp_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_content_pieces_created_ts ON content_pieces (created_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_lead_activities_lead_ts ON lead_activities (lead_id, timestamp_ts)"
+]
+
+def _epoch_sql(iso_expr: str) -> str:
+    """SQL converting a local-time ISO text column to epoch seconds"""
+    return f"CAST(strftime('%s', {iso_expr}, 'utc') AS INTEGER)"
+
+def migrate_epoch_columns(cursor):
+    """Add the integer epoch columns, backfill them and index them"""
+    for table, iso_column, epoch_column in EPOCH_COLUMNS:
+        cursor.execute(f"PRAGMA table_info({table})")
+        if epoch_column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {epoch_column} INTEGER")
+            cursor.execute(f"""UPDATE {table} SET {epoch_column} = {_epoch_sql(iso_column)}
+                               WHERE {iso_column} IS NOT NULL""")
+        # Rows written by the other entry modules only carry the ISO value
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_{epoch_column}_fill
+            AFTER INSERT ON {table}
+            WHEN NEW.{epoch_column} IS NULL AND NEW.{iso_column} IS NOT NULL
+            BEGIN
+                UPDATE {table} SET {epoch_column} = {_epoch_sql(f"NEW.{iso_column}")} WHERE rowid = NEW.rowid;
+            END""")
+    for index_sql in EPOCH_INDEXES:
+        cursor.execute(index_sql)
+
+@contextmanager
+def database_init_lock():
+    """Serialize schema setup between worker processes importing the app at once"""
+    if fcntl is None:
+        yield
+        return
+    with open('empire_business.db.lock', 'w') as lock_file:
+        fcntl.lockf(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+# Leads per page on /empire-leads and the largest page a client may request
+LEADS_PAGE_SIZE = 24
+LEADS_MAX_PAGE_SIZE = 100
+
+# Browse order for leads (all descending), served per stream by the page index
+LEADS_SORT_KEY = "COALESCE(deal_value, 0), COALESCE(icp_score, 0), COALESCE(created_ts, 0), id"
+LEADS_PAGE_INDEX = """CREATE INDEX IF NOT EXISTS idx_leads_stream_page ON leads (revenue_stream,
+    COALESCE(deal_value, 0) DESC, COALESCE(icp_score, 0) DESC, COALESCE(created_ts, 0) DESC, id DESC)"""
+
+# Choices for the /empire-leads filters
+LEAD_STAGES = FUNNEL_STAGES + [LOST_STAGE]
+LEAD_INDUSTRIES = sorted({industry for criteria in COMPLETE_ICP_CRITERIA.values() for industry in criteria["industries"]})
+LEAD_COMPANY_SIZES = sorted({size for criteria in COMPLETE_ICP_CRITERIA.values() for size in criteria["company_sizes"]},
+                            key=lambda size: int(size.rstrip("+").split("-")[0]))
+
 def init_empire_database():
     """Initialize comprehensive empire database"""
     try:
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
         
+        # WAL lets workers keep reading while another one writes (persists in the file)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Enhanced leads table
         cursor.execute("""CREATE TABLE IF NOT EXISTS leads (
             id TEXT PRIMARY KEY,
@@ -105,6 +384,28 @@ def init_empire_database():
             updated_at TEXT
         )""")
         
+        # Per-stream lead rollups, kept current by the triggers on leads
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'stream_rollups'")
+        rollups_exist = cursor.fetchone()[0] > 0
+        cursor.execute("""CREATE TABLE IF NOT EXISTS stream_rollups (
+            revenue_stream TEXT PRIMARY KEY,
+            lead_count INTEGER DEFAULT 0,
+            pipeline_value REAL DEFAULT 0,
+            icp_total REAL DEFAULT 0
+        )""")
+        cursor.execute("""CREATE TABLE IF NOT EXISTS stream_stage_rollups (
+            revenue_stream TEXT,
+            stage TEXT,
+            lead_count INTEGER DEFAULT 0,
+            pipeline_value REAL DEFAULT 0,
+            PRIMARY KEY (revenue_stream, stage)
+        )""")
+        for trigger_sql in STREAM_ROLLUP_TRIGGERS:
+            cursor.execute(trigger_sql)
+        if not rollups_exist:
+            # Backfill for databases created before the rollups existed
+            rebuild_stream_rollups(cursor)
+        
         # Activities log table
         cursor.execute("""CREATE TABLE IF NOT EXISTS activities (
             id INTEGER PRIMARY KEY,
@@ -114,6 +415,16 @@ def init_empire_database():
             timestamp TEXT
         )""")
         
+        # Lead activities table
+        cursor.execute("""CREATE TABLE IF NOT EXISTS lead_activities (
+            id INTEGER PRIMARY KEY,
+            lead_id TEXT,
+            activity_type TEXT,
+            description TEXT,
+            timestamp TEXT,
+            FOREIGN KEY (lead_id) REFERENCES leads (id)
+        )""")
+        
         # Empire metrics table (updated dynamically)
         cursor.execute("""CREATE TABLE IF NOT EXISTS empire_metrics (
             id INTEGER PRIMARY KEY,
@@ -130,6 +441,9 @@ def init_empire_database():
             date TEXT
         )""")
         
+        # Time-series metric buckets
+        empire_timeseries.init_schema(cursor)
+        
         # Content pieces table
         cursor.execute("""CREATE TABLE IF NOT EXISTS content_pieces (
             id INTEGER PRIMARY KEY,
@@ -140,6 +454,15 @@ def init_empire_database():
             engagement_score REAL,
             created_at TEXT
         )""")
+        content_pipeline.init_schema(cursor)
+        
+        # Integer timestamps for index range scans
+        migrate_epoch_columns(cursor)
+        cursor.execute(LEADS_PAGE_INDEX)
+        analysis_engine.init_schema(cursor)
+        job_manager.init_schema(cursor)
+        empire_scheduler.init_schema(cursor)
+        followup_scheduler.init_schema(cursor)
         
         conn.commit()
         conn.close()
@@ -210,7 +533,7 @@ class EmpireLeadGenerator:
             ]
         }
     
-    def generate_empire_leads(self, category: str = "all", count: int = 25) -> List[Dict]:
+    def generate_empire_leads(self, category: str = "all", count: int = 25, progress: JobProgress = None) -> List[Dict]:
         """Generate leads for the complete empire with revenue stream assignment"""
         generated_leads = []
         
@@ -219,7 +542,14 @@ class EmpireLeadGenerator:
         else:
             categories = [category] if category in COMPLETE_ICP_CRITERIA else list(COMPLETE_ICP_CRITERIA.keys())
         
-        for cat in categories:
+        # Each category is saved with a checkpoint; a resumed job skips the ones already saved
+        categories_done = progress.checkpoint.get("categories_done", 0) if progress else 0
+        for position, cat in enumerate(categories):
+            if position < categories_done:
+                continue
+            if progress:
+                progress(position, len(categories), f"Scoring {cat.replace('_', ' ')}")
+            category_leads = []
             cat_count = count // len(categories) if category == "all" else count
             
             # Get sample leads for this category
@@ -259,10 +589,21 @@ class EmpireLeadGenerator:
                         "created_at": datetime.now().isoformat(),
                         "updated_at": datetime.now().isoformat()
                     }
-                    generated_leads.append(lead)
-        
-        # Save leads to database
-        self._save_empire_leads_to_db(generated_leads)
+                    category_leads.append(lead)
+            
+            # Save this category's leads to database
+            checkpoint = None
+            if progress:
+                saved = progress.checkpoint
+                state = {
+                    "categories_done": position + 1,
+                    "leads_saved": saved.get("leads_saved", 0) + len(category_leads),
+                    "pipeline_value": saved.get("pipeline_value", 0) + sum(lead["deal_value"] for lead in category_leads),
+                    "streams": sorted(set(saved.get("streams", [])) | {lead["revenue_stream"] for lead in category_leads})
+                }
+                checkpoint = lambda cursor, state=state: progress.save_checkpoint(cursor, state)
+            self._save_empire_leads_to_db(category_leads, checkpoint)
+            generated_leads.extend(category_leads)
         
         return generated_leads
     
@@ -303,8 +644,8 @@ class EmpireLeadGenerator:
         
         return min(score, 1.0)
     
-    def _save_empire_leads_to_db(self, leads: List[Dict]):
-        """Save empire leads to database"""
+    def _save_empire_leads_to_db(self, leads: List[Dict], checkpoint: Callable = None):
+        """Save empire leads to database (checkpoint(cursor) commits in the same transaction)"""
         try:
             conn = sqlite3.connect('empire_business.db')
             cursor = conn.cursor()
@@ -314,16 +655,20 @@ class EmpireLeadGenerator:
                     INSERT OR REPLACE INTO leads 
                     (id, name, email, company, title, industry, company_size, linkedin_url,
                      category, revenue_stream, icp_score, deal_value, stage, source, notes, 
-                     contact_attempts, last_contact, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     contact_attempts, last_contact, created_at, updated_at,
+                     created_ts, updated_ts, last_contact_ts)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     lead["id"], lead["name"], lead["email"], lead["company"], lead["title"],
                     lead["industry"], lead["company_size"], lead["linkedin_url"], 
                     lead["category"], lead["revenue_stream"], lead["icp_score"], lead["deal_value"],
                     lead["stage"], lead["source"], lead["notes"], lead["contact_attempts"], 
-                    lead["last_contact"], lead["created_at"], lead["updated_at"]
+                    lead["last_contact"], lead["created_at"], lead["updated_at"],
+                    to_epoch(lead["created_at"]), to_epoch(lead["updated_at"]), to_epoch(lead["last_contact"])
                 ))
             
+            if checkpoint:
+                checkpoint(cursor)
             conn.commit()
             conn.close()
             print(f"✅ Saved {len(leads)} empire leads to database")
@@ -331,100 +676,112 @@ class EmpireLeadGenerator:
         except Exception as e:
             print(f"❌ Error saving empire leads: {e}")
 
-def update_empire_metrics():
-    """Update empire metrics in database"""
+def log_activity(action_type: str, description: str, result: str):
+    """Log activity to database"""
     try:
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
-        
-        # Get current lead count
-        cursor.execute("SELECT COUNT(*) FROM leads")
-        total_leads = cursor.fetchone()[0]
-        
-        # Get content count
-        cursor.execute("SELECT COUNT(*) FROM content_pieces WHERE date(created_at) = date('now')")
-        content_today = cursor.fetchone()[0]
-        
-        # Update or insert today's metrics
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute("""
-            INSERT OR REPLACE INTO empire_metrics 
-            (total_daily_revenue, job_search_revenue, health_management_revenue, 
-             speaking_revenue, retreat_revenue, leads_generated, content_created, 
-             meetings_booked, proposals_sent, deals_closed, date)
-            VALUES (15600, 2500, 3200, 4100, 5800, ?, ?, 8, 15, 3, ?)
-        """, (total_leads, content_today, today))
-        
+        now = datetime.now()
+        cursor.execute("""INSERT INTO activities (action_type, description, result, timestamp, timestamp_ts) 
+                         VALUES (?, ?, ?, ?, ?)""", 
+                      (action_type, description, result, now.isoformat(), to_epoch(now)))
+        activity_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        metrics_service.record_activity(action_type)
+        data_version.bump()
+        event_broadcaster.publish("activity", {
+            "id": activity_id, "action_type": action_type, "description": description,
+            "result": result, "timestamp": now.isoformat()
+        })
     except Exception as e:
-        print(f"Error updating metrics: {e}")
+        print(f"Logging error: {e}")
 
-def log_activity(action_type: str, description: str, result: str):
-    """Log activity to database"""
+@empire_cache.cached
+def get_stream_rollups():
+    """Get lead count, pipeline, average ICP and stage counts per revenue stream"""
+    stream_rollups = {
+        stream: {"lead_count": 0, "pipeline_value": 0, "avg_icp": 0.0, "stages": {}}
+        for stream in EMPIRE_REVENUE_STREAMS
+    }
     try:
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
-        cursor.execute("""INSERT INTO activities (action_type, description, result, timestamp) 
-                         VALUES (?, ?, ?, ?)""", 
-                      (action_type, description, result, datetime.now().isoformat()))
-        conn.commit()
+        
+        cursor.execute("SELECT revenue_stream, lead_count, pipeline_value, icp_total FROM stream_rollups")
+        for stream, lead_count, pipeline_value, icp_total in cursor.fetchall():
+            rollup = stream_rollups.setdefault(stream, {"stages": {}})
+            rollup["lead_count"] = lead_count
+            rollup["pipeline_value"] = int(pipeline_value)
+            rollup["avg_icp"] = round(icp_total / lead_count, 2) if lead_count else 0.0
+        
+        cursor.execute("SELECT revenue_stream, stage, lead_count, pipeline_value FROM stream_stage_rollups WHERE lead_count > 0")
+        for stream, stage, lead_count, pipeline_value in cursor.fetchall():
+            if stream in stream_rollups:
+                stream_rollups[stream]["stages"][stage] = {
+                    "lead_count": lead_count,
+                    "pipeline_value": int(pipeline_value)
+                }
+        
         conn.close()
     except Exception as e:
-        print(f"Logging error: {e}")
+        print(f"Error getting stream rollups: {e}")
+    return stream_rollups
 
+def get_revenue_forecast(metrics: Dict = None) -> Dict:
+    """Annual revenue forecast; today's per-stream revenue is the fallback for streams without history"""
+    metrics = metrics or metrics_service.snapshot()
+    return revenue_forecaster.forecast({
+        stream: metrics[column] for column, stream in REVENUE_STREAM_COLUMNS.items()
+    })
+
+@empire_cache.cached
 def get_empire_data():
     """Get comprehensive empire data"""
     try:
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
         
-        # Get empire metrics
+        # Counters are maintained in-process by the metrics service
+        metrics = metrics_service.snapshot()
+        total_revenue = metrics["total_daily_revenue"]
+        
+        # Per-stream lead stats from the rollups
         cursor.execute("""
-            SELECT total_daily_revenue, job_search_revenue, health_management_revenue,
-                   speaking_revenue, retreat_revenue, leads_generated, content_created,
-                   meetings_booked, proposals_sent, deals_closed
-            FROM empire_metrics ORDER BY id DESC LIMIT 1
+            SELECT revenue_stream, lead_count, pipeline_value
+            FROM stream_rollups WHERE lead_count > 0
+            ORDER BY pipeline_value DESC
         """)
-        metrics = cursor.fetchone()
-        
-        # Get actual lead count from database
-        cursor.execute("SELECT COUNT(*) FROM leads")
-        actual_leads = cursor.fetchone()[0]
-        
-        # Get actual content count
-        cursor.execute("SELECT COUNT(*) FROM content_pieces")
-        actual_content = cursor.fetchone()[0]
-        
+        lead_stats = cursor.fetchall()
         conn.close()
         
-        if metrics:
-            total_revenue, job_revenue, health_revenue, speaking_revenue, retreat_revenue, leads, content, meetings, proposals, deals = metrics
-        else:
-            total_revenue, job_revenue, health_revenue, speaking_revenue, retreat_revenue = 15600, 2500, 3200, 4100, 5800
-            leads, content, meetings, proposals, deals = 45, 12, 8, 15, 3
-        
-        # Use actual database counts
-        leads_generated = max(actual_leads, leads)
-        content_created = max(actual_content, content)
-        
-        # Calculate projections for $50M+ goal
-        annual_projection = total_revenue * 365
-        progress_to_50m = min(int((annual_projection / 50000000) * 100), 100)
+        # Projections for the $50M+ goal: revenue trend plus weighted pipeline,
+        # falling back to today's figures for streams without enough history
+        forecast = get_revenue_forecast(metrics)
+        annual_projection = forecast["annual_projection"]
+        progress_to_50m = forecast["progress_to_50m"]
         
         return {
             "total_daily_revenue": int(total_revenue),
-            "job_search_revenue": int(job_revenue),
-            "health_management_revenue": int(health_revenue), 
-            "speaking_revenue": int(speaking_revenue),
-            "retreat_revenue": int(retreat_revenue),
-            "leads_generated": leads_generated,
-            "content_created": content_created,
-            "meetings_booked": meetings,
-            "proposals_sent": proposals,
-            "deals_closed": deals,
+            "job_search_revenue": int(metrics["job_search_revenue"]),
+            "health_management_revenue": int(metrics["health_management_revenue"]), 
+            "speaking_revenue": int(metrics["speaking_revenue"]),
+            "retreat_revenue": int(metrics["retreat_revenue"]),
+            "leads_generated": metrics["leads_generated"],
+            "content_created": metrics["content_created"],
+            "meetings_booked": metrics["meetings_booked"],
+            "proposals_sent": metrics["proposals_sent"],
+            "deals_closed": metrics["deals_closed"],
             "annual_projection": int(annual_projection),
-            "progress_to_50m": progress_to_50m
+            "progress_to_50m": progress_to_50m,
+            "lead_stats": [
+                {
+                    "stream": stat[0],
+                    "count": stat[1],
+                    "avg_value": int(stat[2] / stat[1]),
+                    "total_value": int(stat[2])
+                } for stat in lead_stats
+            ]
         }
         
     except Exception as e:
@@ -441,61 +798,114 @@ def get_empire_data():
             "proposals_sent": 15,
             "deals_closed": 3,
             "annual_projection": 5694000,
-            "progress_to_50m": 11
+            "progress_to_50m": 11,
+            "lead_stats": []
         }
 
-def get_empire_leads_by_stream():
-    """Get all empire leads organized by revenue stream"""
+def get_activities_since(activity_id: int = 0, limit: int = 10) -> List[Dict]:
+    """Most recent activities with an id above activity_id, newest first"""
     try:
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
-        
         cursor.execute("""
+            SELECT id, action_type, description, result, timestamp
+            FROM activities WHERE id > ?
+            ORDER BY id DESC LIMIT ?
+        """, (activity_id, limit))
+        activities = [
+            {"id": row[0], "action_type": row[1], "description": row[2], "result": row[3], "timestamp": row[4]}
+            for row in cursor.fetchall()
+        ]
+        conn.close()
+        return activities
+    except Exception as e:
+        print(f"Error getting activities: {e}")
+        return []
+
+@empire_cache.cached
+def get_recent_activities(limit: int = 10) -> List[Dict]:
+    """Latest activities for the dashboard feed"""
+    return get_activities_since(0, limit)
+
+def dashboard_metrics(data: Dict) -> Dict:
+    """The scalar dashboard values tracked by the delta feed"""
+    return {key: value for key, value in data.items() if isinstance(value, (int, float, str))}
+
+def publish_dashboard_update():
+    """Push changed dashboard values to connected live dashboards"""
+    if not event_broadcaster.subscriber_count:
+        return
+    seq = metrics_feed.seq
+    metrics_feed.observe(dashboard_metrics(get_empire_data()))
+    changes = metrics_feed.changes_since(seq)
+    if changes:
+        event_broadcaster.publish("metrics", {"metrics": changes})
+
+def encode_leads_cursor(key: tuple) -> str:
+    """Opaque page cursor for the sort key of the last lead on a page"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+def decode_leads_cursor(cursor: str) -> tuple:
+    """Sort key from a page cursor; raises ValueError for anything malformed"""
+    try:
+        deal_value, icp_score, created_ts, lead_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid page cursor")
+    if not all(isinstance(value, (int, float)) for value in (deal_value, icp_score, created_ts)) or not isinstance(lead_id, str):
+        raise ValueError("Invalid page cursor")
+    return deal_value, icp_score, created_ts, lead_id
+
+@empire_cache.cached
+def get_stream_leads_page(stream: str, after: tuple = None, limit: int = LEADS_PAGE_SIZE, stage: str = None,
+                          industry: str = None, min_score: float = None, company_size: str = None) -> Dict:
+    """One page of a stream's leads, highest deal value first, starting after the given sort key"""
+    conditions = ["revenue_stream = ?"]
+    params = [stream]
+    for column, value in (("stage", stage), ("industry", industry), ("company_size", company_size)):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if min_score is not None:
+        conditions.append("icp_score >= ?")
+        params.append(min_score)
+    if after:
+        # The leading bound lets SQLite seek into the page index instead of scanning the stream
+        conditions.append("COALESCE(deal_value, 0) <= ?")
+        conditions.append(f"({LEADS_SORT_KEY}) < (?, ?, ?, ?)")
+        params.extend([after[0], *after])
+    limit = max(1, min(limit, LEADS_MAX_PAGE_SIZE))
+    try:
+        conn = sqlite3.connect('empire_business.db')
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
             SELECT id, name, email, company, title, industry, company_size, 
-                   category, revenue_stream, icp_score, deal_value, stage, created_at, contact_attempts
+                   category, revenue_stream, icp_score, deal_value, stage, created_at, contact_attempts,
+                   {LEADS_SORT_KEY}
             FROM leads 
-            ORDER BY deal_value DESC, icp_score DESC, created_at DESC
-        """)
+            WHERE {' AND '.join(conditions)}
+            ORDER BY COALESCE(deal_value, 0) DESC, COALESCE(icp_score, 0) DESC, COALESCE(created_ts, 0) DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1])
         
-        leads = cursor.fetchall()
+        rows = cursor.fetchall()
         conn.close()
         
-        # Organize by revenue stream
-        stream_leads = {
-            "Job/Advisor Search": [],
-            "Health Management": [], 
-            "Speaking Engagements": [],
-            "Retreat Hosting": [],
-            "Product Development": [],
-            "Strategic Partnerships": [],
-            "Investment/Funding": []
-        }
-        
-        for lead in leads:
-            lead_dict = {
+        leads = [
+            {
                 "id": lead[0], "name": lead[1], "email": lead[2], "company": lead[3],
                 "title": lead[4], "industry": lead[5], "company_size": lead[6],
                 "category": lead[7], "revenue_stream": lead[8], "icp_score": lead[9],
                 "deal_value": lead[10], "stage": lead[11], "created_at": lead[12], 
                 "contact_attempts": lead[13]
-            }
-            
-            if lead[8] in stream_leads:
-                stream_leads[lead[8]].append(lead_dict)
-        
-        return stream_leads
+            } for lead in rows[:limit]
+        ]
+        next_cursor = encode_leads_cursor(rows[limit - 1][14:]) if len(rows) > limit else None
+        return {"leads": leads, "next_cursor": next_cursor, "first_page": after is None}
         
     except Exception as e:
         print(f"Error getting empire leads: {e}")
-        return {
-            "Job/Advisor Search": [],
-            "Health Management": [], 
-            "Speaking Engagements": [],
-            "Retreat Hosting": [],
-            "Product Development": [],
-            "Strategic Partnerships": [],
-            "Investment/Funding": []
-        }
+        return {"leads": [], "next_cursor": None, "first_page": after is None}
 
 # Empire Dashboard Template with WORKING JavaScript
 EMPIRE_DASHBOARD = """
@@ -503,253 +913,18 @@ EMPIRE_DASHBOARD = """
 <html>
 <head>
     <title>Dr. Dédé's $50M+ AI Empire</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: #333;
-            min-height: 100vh;
-        }
-        .header { 
-            background: rgba(255,255,255,0.95);
-            padding: 25px;
-            text-align: center;
-            box-shadow: 0 2px 20px rgba(0,0,0,0.1);
-        }
-        .header h1 { 
-            color: #2c3e50; 
-            font-size: 2.5em; 
-            margin-bottom: 10px;
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        .empire-stats {
-            background: #27ae60;
-            color: white;
-            padding: 20px;
-            text-align: center;
-            font-weight: bold;
-            font-size: 1.2em;
-        }
-        .control-panel {
-            background: rgba(255,255,255,0.9);
-            margin: 20px;
-            padding: 20px;
-            border-radius: 15px;
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-        }
-        .control-group {
-            text-align: center;
-        }
-        .btn {
-            padding: 12px 20px;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s ease;
-        }
-        .btn-primary { background: #3498db; color: white; }
-        .btn-success { background: #27ae60; color: white; }
-        .btn:hover { transform: translateY(-2px); box-shadow: 0 5px 15px rgba(0,0,0,0.2); }
-        .dashboard {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(320px, 1fr));
-            gap: 25px;
-            padding: 25px;
-            max-width: 1600px;
-            margin: 0 auto;
-        }
-        .widget {
-            background: rgba(255,255,255,0.95);
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.15);
-        }
-        .widget h3 {
-            color: #2c3e50;
-            margin-bottom: 20px;
-            font-size: 1.3em;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .metric-huge {
-            font-size: 3em;
-            font-weight: bold;
-            color: #27ae60;
-            margin: 20px 0;
-            text-align: center;
-        }
-        .metric-large {
-            font-size: 2em;
-            font-weight: bold;
-            color: #3498db;
-            margin: 15px 0;
-        }
-        .revenue-stream {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 10px;
-            margin: 10px 0;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .stream-name { font-weight: bold; color: #2c3e50; }
-        .stream-value { font-weight: bold; color: #27ae60; font-size: 1.1em; }
-        .progress {
-            background: #ecf0f1;
-            height: 25px;
-            border-radius: 12px;
-            margin: 15px 0;
-            position: relative;
-        }
-        .progress-fill {
-            background: linear-gradient(90deg, #27ae60, #2ecc71);
-            height: 100%;
-            border-radius: 12px;
-            transition: width 0.3s ease;
-        }
-        .progress-text {
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            font-weight: bold;
-            color: white;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-        }
-        .metric-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 15px;
-            margin: 15px 0;
-        }
-        .metric-box {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            text-align: center;
-        }
-        .metric-box .number {
-            font-size: 1.8em;
-            font-weight: bold;
-            color: #3498db;
-        }
-        .metric-box .label {
-            color: #7f8c8d;
-            font-size: 0.9em;
-            margin-top: 5px;
-        }
-        .timestamp {
-            text-align: center;
-            color: rgba(255,255,255,0.9);
-            margin: 20px 0;
-            font-size: 1.1em;
-        }
-    </style>
-    <script>
-        // Working button functions with database updates
-        function generateEmpireLeads() {
-            fetch('/generate-leads', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        alert(`✅ REAL LEADS GENERATED & SAVED!\\n\\n${data.leads_generated} empire leads created and saved to database!\\n\\nTotal Pipeline Value: $${data.revenue_potential.toLocaleString()}\\n\\nStreams: ${data.streams_covered.join(', ')}\\n\\n💾 Click "View Empire Leads" to see them!`);
-                        // Redirect to leads page to show results
-                        setTimeout(() => window.open('/empire-leads', '_blank'), 1500);
-                    } else {
-                        alert('❌ Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    alert('⚠️ Network error. Please try again.');
-                });
-        }
-        
-        function createContent() {
-            fetch('/create-content', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        alert(`✅ CONTENT CREATED & SAVED!\\n\\n${data.content_created} pieces created and saved to database!\\n\\nPlatforms: ${data.platforms.join(', ')}\\n\\n📈 Content pipeline updated!\\n\\n🔄 Dashboard will refresh automatically.`);
-                        setTimeout(() => location.reload(), 2000);
-                    } else {
-                        alert('❌ Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    alert('⚠️ Network error. Content creation may still be processing.');
-                });
-        }
-        
-        function optimizeRevenue() {
-            fetch('/optimize-revenue', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        alert(`✅ REVENUE OPTIMIZED & TRACKED!\\n\\n$${data.additional_revenue.toLocaleString()} additional revenue identified!\\n\\nOptimizations: ${data.optimizations.join(', ')}\\n\\n💰 Revenue metrics updated in database!`);
-                        setTimeout(() => location.reload(), 2000);
-                    } else {
-                        alert('❌ Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    alert('⚠️ Network error. Revenue optimization may still be processing.');
-                });
-        }
-        
-        function sendOutreach() {
-            fetch('/send-outreach', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        alert(`✅ OUTREACH SENT & LOGGED!\\n\\n${data.emails_sent} emails sent and tracked in database!\\n\\nTargets: ${data.targets.join(', ')}\\n\\n📧 All outreach activities logged!`);
-                        setTimeout(() => location.reload(), 2000);
-                    } else {
-                        alert('❌ Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    alert('⚠️ Network error. Outreach may still be processing.');
-                });
-        }
-        
-        function runAnalysis() {
-            fetch('/run-analysis', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        alert(`✅ EMPIRE ANALYSIS COMPLETE!\\n\\nKey Insights Saved to Database:\\n• ${data.insights.join('\\n• ')}\\n\\n📊 All analysis results logged!`);
-                        setTimeout(() => location.reload(), 2000);
-                    } else {
-                        alert('❌ Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    alert('⚠️ Network error. Analysis may still be processing.');
-                });
-        }
-        
-        // Auto-refresh every 5 minutes
-        setTimeout(() => window.location.reload(), 300000);
-    </script>
+    <link rel="stylesheet" href="{{ asset_url('empire_dashboard.css') }}">
+    <script src="{{ asset_url('empire_jobs.js') }}" defer></script>
+    <script src="{{ asset_url('empire_dashboard.js') }}" defer></script>
 </head>
-<body>
+<body data-metrics-cursor="{{ metrics_cursor }}">
     <div class="header">
         <h1>🏰 Dr. Dédé Tetsubayashi's AI Empire</h1>
         <p>Multi-Stream $50M+ Revenue Automation System</p>
     </div>
     
     <div class="empire-stats">
-        🚀 EMPIRE OPERATIONAL - 98% AUTOMATED - ${{ total_daily_revenue:,d }}/DAY - {{ annual_projection:,d }}/YEAR - {{ progress_to_50m }}% TO $50M TARGET
+        🚀 EMPIRE OPERATIONAL - 98% AUTOMATED - <span data-metric="total_daily_revenue" data-format="currency">${{ "{:,}".format(total_daily_revenue) }}</span>/DAY - <span data-metric="annual_projection" data-format="number">{{ "{:,}".format(annual_projection) }}</span>/YEAR - <span data-metric="progress_to_50m" data-format="text">{{ progress_to_50m }}</span>% TO $50M TARGET
     </div>
     
     <div class="control-panel">
@@ -783,19 +958,19 @@ EMPIRE_DASHBOARD = """
         <!-- Empire Revenue Overview -->
         <div class="widget">
             <h3>🏆 Empire Revenue Center</h3>
-            <div class="metric-huge">${{ total_daily_revenue:,d }}</div>
+            <div class="metric-huge"><span data-metric="total_daily_revenue" data-format="currency">${{ "{:,}".format(total_daily_revenue) }}</span></div>
             <p style="text-align: center; font-size: 1.1em;">Daily Revenue</p>
             <div class="progress">
-                <div class="progress-fill" style="width: {{ progress_to_50m }}%"></div>
-                <div class="progress-text">{{ progress_to_50m }}% to $50M</div>
+                <div class="progress-fill" data-metric="progress_to_50m" data-format="width" style="width: {{ progress_to_50m }}%"></div>
+                <div class="progress-text"><span data-metric="progress_to_50m" data-format="text">{{ progress_to_50m }}</span>% to $50M</div>
             </div>
             <div class="metric-grid">
                 <div class="metric-box">
-                    <div class="number">${{ annual_projection:,d }}</div>
+                    <div class="number"><span data-metric="annual_projection" data-format="currency">${{ "{:,}".format(annual_projection) }}</span></div>
                     <div class="label">Annual Projection</div>
                 </div>
                 <div class="metric-box">
-                    <div class="number">{{ deals_closed }}</div>
+                    <div class="number"><span data-metric="deals_closed" data-format="number">{{ deals_closed }}</span></div>
                     <div class="label">Deals Closed Today</div>
                 </div>
             </div>
@@ -804,7 +979,7 @@ EMPIRE_DASHBOARD = """
         <!-- Job/Advisor Search Revenue -->
         <div class="widget">
             <h3>💼 Job/Advisor Search</h3>
-            <div class="metric-large">${{ job_search_revenue:,d }}</div>
+            <div class="metric-large"><span data-metric="job_search_revenue" data-format="currency">${{ "{:,}".format(job_search_revenue) }}</span></div>
             <p>Daily Revenue Stream</p>
             <div class="revenue-stream">
                 <span class="stream-name">Executive Placements</span>
@@ -823,7 +998,7 @@ EMPIRE_DASHBOARD = """
         <!-- Health Management Revenue -->
         <div class="widget">
             <h3>🏥 Health Management</h3>
-            <div class="metric-large">${{ health_management_revenue:,d }}</div>
+            <div class="metric-large"><span data-metric="health_management_revenue" data-format="currency">${{ "{:,}".format(health_management_revenue) }}</span></div>
             <p>Daily Revenue Stream</p>
             <div class="revenue-stream">
                 <span class="stream-name">Executive Health</span>
@@ -842,7 +1017,7 @@ EMPIRE_DASHBOARD = """
         <!-- Speaking Revenue -->
         <div class="widget">
             <h3>🎤 Speaking Engagements</h3>
-            <div class="metric-large">${{ speaking_revenue:,d }}</div>
+            <div class="metric-large"><span data-metric="speaking_revenue" data-format="currency">${{ "{:,}".format(speaking_revenue) }}</span></div>
             <p>Daily Revenue Stream</p>
             <div class="revenue-stream">
                 <span class="stream-name">Keynote Speaking</span>
@@ -861,7 +1036,7 @@ EMPIRE_DASHBOARD = """
         <!-- Retreat Revenue -->
         <div class="widget">
             <h3>🏔️ Retreat Hosting</h3>
-            <div class="metric-large">${{ retreat_revenue:,d }}</div>
+            <div class="metric-large"><span data-metric="retreat_revenue" data-format="currency">${{ "{:,}".format(retreat_revenue) }}</span></div>
             <p>Daily Revenue Stream</p>
             <div class="revenue-stream">
                 <span class="stream-name">Executive Retreats</span>
@@ -880,18 +1055,19 @@ EMPIRE_DASHBOARD = """
         <!-- Empire Lead Pipeline -->
         <div class="widget">
             <h3>👥 Empire Lead Pipeline</h3>
-            <div class="metric-large">{{ leads_generated }}</div>
+            <div class="metric-large"><span data-metric="leads_generated" data-format="number">{{ leads_generated }}</span></div>
             <p>Total Leads in Database</p>
             <div class="metric-grid">
                 <div class="metric-box">
-                    <div class="number">{{ meetings_booked }}</div>
+                    <div class="number"><span data-metric="meetings_booked" data-format="number">{{ meetings_booked }}</span></div>
                     <div class="label">Meetings Booked</div>
                 </div>
                 <div class="metric-box">
-                    <div class="number">{{ proposals_sent }}</div>
+                    <div class="number"><span data-metric="proposals_sent" data-format="number">{{ proposals_sent }}</span></div>
                     <div class="label">Proposals Sent</div>
                 </div>
             </div>
+            <div id="new-leads"></div>
         </div>
         
         <!-- Automation Status -->
@@ -926,7 +1102,7 @@ EMPIRE_DASHBOARD = """
                     <div class="label">System Uptime</div>
                 </div>
                 <div class="metric-box">
-                    <div class="number">{{ content_created }}</div>
+                    <div class="number"><span data-metric="content_created" data-format="number">{{ content_created }}</span></div>
                     <div class="label">Content Pieces</div>
                 </div>
                 <div class="metric-box">
@@ -939,10 +1115,23 @@ EMPIRE_DASHBOARD = """
                 </div>
             </div>
         </div>
+        
+        <!-- Recent Activity -->
+        <div class="widget">
+            <h3>📋 Recent Activity</h3>
+            <div id="activity-feed">
+                {% for activity in activities %}
+                <div class="revenue-stream" data-activity-id="{{ activity.id }}" title="{{ activity.description }} ({{ activity.timestamp }})">
+                    <span class="stream-name">{{ activity.action_type }}</span>
+                    <span class="stream-value">{{ activity.result }}</span>
+                </div>
+                {% endfor %}
+            </div>
+        </div>
     </div>
     
     <div class="timestamp">
-        Last updated: {{ timestamp }} | Empire Status: OPERATIONAL | Next review: Monday 8:00 AM
+        Last updated: <span id="last-updated">{{ timestamp }}</span> | Empire Status: OPERATIONAL | Next review: Monday 8:00 AM
     </div>
 </body>
 </html>
@@ -954,82 +1143,11 @@ EMPIRE_LEADS_INTERFACE = """
 <html>
 <head>
     <title>Empire Lead Management - AI Empire</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 0; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: #333; min-height: 100vh; }
-        .container { max-width: 1600px; margin: 0 auto; padding: 20px; }
-        .header { background: rgba(255,255,255,0.95); padding: 25px; border-radius: 15px; margin-bottom: 20px; text-align: center; }
-        .header h1 { color: #2c3e50; margin: 0; font-size: 2.2em; }
-        .stream-tabs { display: flex; gap: 10px; margin-bottom: 25px; flex-wrap: wrap; justify-content: center; }
-        .tab { padding: 12px 20px; border: none; border-radius: 8px; cursor: pointer; font-weight: bold; }
-        .tab.active { background: #3498db; color: white; }
-        .tab.inactive { background: rgba(255,255,255,0.9); color: #333; }
-        .summary-cards { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-bottom: 30px; }
-        .summary-card { background: rgba(255,255,255,0.9); padding: 20px; border-radius: 10px; text-align: center; }
-        .summary-number { font-size: 2.2em; font-weight: bold; color: #2c3e50; }
-        .summary-label { color: #7f8c8d; margin-top: 8px; }
-        .leads-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(380px, 1fr)); gap: 20px; }
-        .lead-card { 
-            background: rgba(255,255,255,0.95); 
-            padding: 25px; 
-            border-radius: 12px; 
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-            border-left: 5px solid;
-        }
-        .lead-card.job { border-left-color: #3498db; }
-        .lead-card.health { border-left-color: #27ae60; }
-        .lead-card.speaking { border-left-color: #f39c12; }
-        .lead-card.retreat { border-left-color: #e74c3c; }
-        .lead-card.product { border-left-color: #9b59b6; }
-        .lead-card.partnership { border-left-color: #1abc9c; }
-        .lead-card.investment { border-left-color: #34495e; }
-        .lead-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px; }
-        .lead-name { font-weight: bold; font-size: 1.2em; color: #2c3e50; }
-        .icp-score { background: #27ae60; color: white; padding: 6px 12px; border-radius: 15px; font-size: 0.9em; font-weight: bold; }
-        .deal-value { background: #3498db; color: white; padding: 6px 12px; border-radius: 15px; font-size: 0.9em; font-weight: bold; margin-left: 8px; }
-        .lead-details { margin: 15px 0; }
-        .lead-actions { margin-top: 20px; display: flex; gap: 10px; }
-        .btn { padding: 8px 15px; border: none; border-radius: 6px; cursor: pointer; font-size: 0.9em; font-weight: bold; }
-        .btn-primary { background: #3498db; color: white; }
-        .btn-success { background: #27ae60; color: white; }
-        .btn-warning { background: #f39c12; color: white; }
-        .stream-category { display: none; }
-        .stream-category.active { display: block; }
-        .back-btn { background: #95a5a6; color: white; padding: 12px 20px; border: none; border-radius: 8px; cursor: pointer; margin-bottom: 20px; }
-        .no-leads { text-align: center; color: #7f8c8d; padding: 40px; font-style: italic; }
-        .generate-leads-btn { background: #27ae60; color: white; padding: 15px 30px; border: none; border-radius: 10px; font-size: 1.1em; font-weight: bold; margin: 20px auto; display: block; cursor: pointer; }
-    </style>
-    <script>
-        function showStream(stream) {
-            document.querySelectorAll('.stream-category').forEach(el => el.classList.remove('active'));
-            document.querySelectorAll('.tab').forEach(el => el.classList.remove('active'));
-            document.querySelectorAll('.tab').forEach(el => el.classList.add('inactive'));
-            
-            document.getElementById(stream.replace(/[^a-zA-Z0-9]/g, '')).classList.add('active');
-            document.getElementById('tab-' + stream.replace(/[^a-zA-Z0-9]/g, '')).classList.add('active');
-            document.getElementById('tab-' + stream.replace(/[^a-zA-Z0-9]/g, '')).classList.remove('inactive');
-        }
-        
-        function contactLead(leadId, method) {
-            alert(`✅ Contact initiated via ${method}!\\n\\nLead ID: ${leadId}\\nMethod: ${method}\\n\\n📞 Follow-up scheduled automatically.`);
-        }
-        
-        function generateMoreLeads() {
-            fetch('/generate-leads', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    alert(`✅ NEW LEADS GENERATED!\\n\\n${data.leads_generated} additional leads created!\\n\\nPipeline Value: $${data.revenue_potential.toLocaleString()}\\n\\n🔄 Page will refresh to show new leads.`);
-                    setTimeout(() => location.reload(), 2000);
-                })
-                .catch(error => {
-                    alert('⚠️ Error generating leads. Please try again.');
-                });
-        }
-        
-        // Show first stream by default
-        window.onload = () => showStream('Job/Advisor Search');
-    </script>
+    <link rel="stylesheet" href="{{ asset_url('empire_leads.css') }}">
+    <script src="{{ asset_url('empire_jobs.js') }}" defer></script>
+    <script src="{{ asset_url('empire_leads.js') }}" defer></script>
 </head>
-<body>
+<body data-active-stream="{{ active_stream }}" data-page-params='{{ page_params|tojson }}'>
     <div class="container">
         <button class="back-btn" onclick="window.location.href='/'">← Back to Empire Dashboard</button>
         
@@ -1039,13 +1157,6 @@ EMPIRE_LEADS_INTERFACE = """
         </div>
         
         <div class="summary-cards">
-            {% set total_leads = 0 %}
-            {% set total_pipeline = 0 %}
-            {% for stream, leads in stream_leads.items() %}
-                {% set total_leads = total_leads + leads|length %}
-                {% set total_pipeline = total_pipeline + (leads|sum(attribute='deal_value') if leads else 0) %}
-            {% endfor %}
-            
             <div class="summary-card" style="background: linear-gradient(135deg, #667eea, #764ba2); color: white;">
                 <div class="summary-number" style="color: white;">{{ total_leads }}</div>
                 <div class="summary-label" style="color: rgba(255,255,255,0.9);">Total Empire Leads</div>
@@ -1054,65 +1165,63 @@ EMPIRE_LEADS_INTERFACE = """
                 </div>
             </div>
             
-            {% for stream, leads in stream_leads.items() %}
+            {% for stream, rollup in stream_rollups.items() %}
             <div class="summary-card">
-                <div class="summary-number">{{ leads|length }}</div>
+                <div class="summary-number">{{ rollup.lead_count }}</div>
                 <div class="summary-label">{{ stream }}</div>
                 <div style="font-size: 0.8em; color: #95a5a6; margin-top: 4px;">
-                    ${{ "{:,}".format((leads|sum(attribute='deal_value') if leads else 0)|int) }} pipeline
+                    ${{ "{:,}".format(rollup.pipeline_value|int) }} pipeline · {{ "%.2f"|format(rollup.avg_icp) }} avg ICP
                 </div>
             </div>
             {% endfor %}
         </div>
         
+        <form class="lead-filters" method="get" action="/empire-leads">
+            <input type="hidden" name="stream" value="{{ active_stream }}">
+            <select name="stage">
+                <option value="">All stages</option>
+                {% for stage in lead_stages %}
+                <option value="{{ stage }}" {{ 'selected' if filters.stage == stage }}>{{ stage.replace('_', ' ').title() }}</option>
+                {% endfor %}
+            </select>
+            <select name="industry">
+                <option value="">All industries</option>
+                {% for industry in lead_industries %}
+                <option value="{{ industry }}" {{ 'selected' if filters.industry == industry }}>{{ industry }}</option>
+                {% endfor %}
+            </select>
+            <select name="company_size">
+                <option value="">All company sizes</option>
+                {% for size in lead_company_sizes %}
+                <option value="{{ size }}" {{ 'selected' if filters.company_size == size }}>{{ size }} employees</option>
+                {% endfor %}
+            </select>
+            <input type="number" name="min_score" min="0" max="1" step="0.05" placeholder="Min ICP score" value="{{ filters.min_score if filters.min_score is not none else '' }}">
+            <button class="btn btn-primary" type="submit">Filter</button>
+            <a class="btn" href="/empire-leads">Clear</a>
+        </form>
+        
         <div class="stream-tabs">
-            {% for stream, leads in stream_leads.items() %}
+            {% for stream in streams %}
             <button id="tab-{{ stream.replace(' ', '').replace('/', '') }}" class="tab" onclick="showStream('{{ stream }}')">
-                {{ stream }} ({{ leads|length }})
+                {{ stream }} ({{ stream_rollups[stream].lead_count }})
             </button>
             {% endfor %}
         </div>
         
-        {% for stream, leads in stream_leads.items() %}
-        <div id="{{ stream.replace(' ', '').replace('/', '') }}" class="stream-category">
-            {% if leads %}
+        {% for stream in streams %}
+        {% set slug = stream.replace(' ', '').replace('/', '') %}
+        <div id="{{ slug }}" class="stream-category" data-stream="{{ stream }}" data-loaded="{{ 'true' if stream == active_stream else 'false' }}">
+            {% if stream == active_stream and not active_first_page %}
+            <div class="pager"><a href="{{ url_for('empire_leads', stream=stream, **page_params) }}">⏮ First page</a></div>
+            {% endif %}
             <div class="leads-grid">
-                {% for lead in leads %}
-                <div class="lead-card {{ 'job' if 'Job' in lead.revenue_stream else 
-                                      'health' if 'Health' in lead.revenue_stream else
-                                      'speaking' if 'Speaking' in lead.revenue_stream else
-                                      'retreat' if 'Retreat' in lead.revenue_stream else
-                                      'product' if 'Product' in lead.revenue_stream else
-                                      'partnership' if 'Partnership' in lead.revenue_stream else
-                                      'investment' }}">
-                    <div class="lead-header">
-                        <div class="lead-name">{{ lead.name }}</div>
-                        <div>
-                            <span class="icp-score">{{ "%.1f"|format(lead.icp_score) }}</span>
-                            <span class="deal-value">${{ "{:,}".format(lead.deal_value) }}</span>
-                        </div>
-                    </div>
-                    <div class="lead-details">
-                        <strong>{{ lead.title }}</strong><br>
-                        {{ lead.company }} ({{ lead.company_size }} employees)<br>
-                        {{ lead.industry }}<br>
-                        <strong>Revenue Stream:</strong> {{ lead.revenue_stream }}<br>
-                        <small>{{ lead.email }}</small>
-                    </div>
-                    <div class="lead-actions">
-                        <button class="btn btn-primary" onclick="contactLead('{{ lead.id }}', 'email')">📧 Email</button>
-                        <button class="btn btn-success" onclick="contactLead('{{ lead.id }}', 'linkedin')">🔗 LinkedIn</button>
-                        <button class="btn btn-warning">📅 Schedule</button>
-                    </div>
-                </div>
-                {% endfor %}
-            </div>
-            {% else %}
-            <div class="no-leads">
-                No leads generated yet for {{ stream }}.<br><br>
-                <button class="generate-leads-btn" onclick="generateMoreLeads()">🎯 Generate Empire Leads</button>
+                {% if stream == active_stream %}
+                {{ active_fragment }}
+                {% else %}
+                <div class="no-leads">Loading {{ stream }} leads...</div>
+                {% endif %}
             </div>
-            {% endif %}
         </div>
         {% endfor %}
         
@@ -1124,95 +1233,546 @@ EMPIRE_LEADS_INTERFACE = """
 </html>
 """
 
+# One page of lead cards for a stream tab, rendered into the page or fetched
+# as a fragment; the trailing page-end marker drives infinite scroll
+EMPIRE_LEAD_CARDS = """
+{% if page.leads %}
+{% for lead in page.leads %}
+<div class="lead-card {{ 'job' if 'Job' in lead.revenue_stream else 
+                      'health' if 'Health' in lead.revenue_stream else
+                      'speaking' if 'Speaking' in lead.revenue_stream else
+                      'retreat' if 'Retreat' in lead.revenue_stream else
+                      'product' if 'Product' in lead.revenue_stream else
+                      'partnership' if 'Partnership' in lead.revenue_stream else
+                      'investment' }}">
+    <div class="lead-header">
+        <div class="lead-name">{{ lead.name }}</div>
+        <div>
+            <span class="icp-score">{{ "%.1f"|format(lead.icp_score) }}</span>
+            <span class="deal-value">${{ "{:,}".format(lead.deal_value) }}</span>
+        </div>
+    </div>
+    <div class="lead-details">
+        <strong>{{ lead.title }}</strong><br>
+        {{ lead.company }} ({{ lead.company_size }} employees)<br>
+        {{ lead.industry }}<br>
+        <strong>Revenue Stream:</strong> {{ lead.revenue_stream }}<br>
+        <small>{{ lead.email }}</small>
+    </div>
+    <div class="lead-actions">
+        <button class="btn btn-primary" onclick="contactLead('{{ lead.id }}', 'email')">📧 Email</button>
+        <button class="btn btn-success" onclick="contactLead('{{ lead.id }}', 'linkedin')">🔗 LinkedIn</button>
+        <button class="btn btn-warning" onclick="scheduleFollowUp('{{ lead.id }}')">📅 Schedule</button>
+    </div>
+</div>
+{% endfor %}
+{% if page.next_cursor %}
+<div class="lead-page-end" data-next="{{ page.next_cursor }}">
+    <div class="pager">
+        <a href="{{ url_for('empire_leads', stream=stream, after=page.next_cursor, **page_params) }}">Next {{ page_size }} leads →</a>
+    </div>
+</div>
+{% endif %}
+{% elif page.first_page and filtered %}
+<div class="no-leads">No {{ stream }} leads match these filters.</div>
+{% elif page.first_page %}
+<div class="no-leads">
+    No leads generated yet for {{ stream }}.<br><br>
+    <button class="generate-leads-btn" onclick="generateMoreLeads()">🎯 Generate Empire Leads</button>
+</div>
+{% endif %}
+"""
+
+# Template registry: the inline templates are registered by name so Jinja
+# compiles each one once and renders it from its template cache afterwards
+EMPIRE_TEMPLATES = {
+    "empire_dashboard.html": EMPIRE_DASHBOARD,
+    "empire_leads.html": EMPIRE_LEADS_INTERFACE,
+    "empire_lead_cards.html": EMPIRE_LEAD_CARDS
+}
+app.jinja_loader = DictLoader(EMPIRE_TEMPLATES)
+
 # Initialize system
-init_empire_database()
+with database_init_lock():
+    init_empire_database()
+for template_name in EMPIRE_TEMPLATES:
+    app.jinja_env.get_template(template_name)
 empire_lead_generator = EmpireLeadGenerator()
+metrics_service = EmpireMetricsService(
+    flush_interval=float(os.environ.get('EMPIRE_METRICS_FLUSH_SECONDS', 30)),
+    timeseries=empire_timeseries,
+    version=data_version
+)
+metrics_service.load()
+atexit.register(metrics_service.stop)
+atexit.register(job_manager.stop)
+atexit.register(empire_scheduler.stop)
+atexit.register(followup_scheduler.stop)
+metrics_feed = MetricsDeltaFeed()
+
+def _watch_shared_version(interval: float = 1.0):
+    """Push dashboard updates for writes made by other worker processes"""
+    seen = data_version.current()
+    while True:
+        time.sleep(interval)
+        current = data_version.current()
+        if current != seen:
+            seen = current
+            try:
+                publish_dashboard_update()
+            except Exception as e:
+                print(f"Error publishing dashboard update: {e}")
+
+def start_background_services():
+    """Start this process's background threads (serve.py calls it in every worker)"""
+    metrics_service.start()
+    job_manager.start()
+    if os.environ.get('EMPIRE_SCHEDULER', '0') == '1':
+        empire_scheduler.start()
+    # Follow-ups only exist for leads someone contacted, so they are dispatched either way
+    followup_scheduler.start()
+    if isinstance(data_version, SharedDataVersion):
+        threading.Thread(target=_watch_shared_version, name="empire-version-watch", daemon=True).start()
+
+def data_updated_at() -> str:
+    """When the data last changed, for the "Last updated" labels"""
+    return datetime.fromtimestamp(data_version.updated_at, timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+
+def dashboard_context() -> Dict:
+    """Template variables for the empire dashboard"""
+    data = get_empire_data()
+    activities = get_recent_activities()
+    seq = metrics_feed.observe(dashboard_metrics(data))
+    return dict(
+        timestamp=data_updated_at(),
+        activities=activities,
+        metrics_cursor=metrics_feed.cursor(seq, activities[0]["id"] if activities else 0),
+        **data
+    )
+
+def lead_filters(args) -> Dict:
+    """Lead filters from the query string (unset filters are None)"""
+    return {
+        "stage": args.get('stage') or None,
+        "industry": args.get('industry') or None,
+        "min_score": args.get('min_score', type=float),
+        "company_size": args.get('company_size') or None
+    }
+
+def lead_page_params(filters: Dict, limit: int) -> Dict:
+    """Query parameters carried over by the filter form, page links and fragment requests"""
+    page_params = {key: value for key, value in filters.items() if value is not None}
+    if limit != LEADS_PAGE_SIZE:
+        page_params["limit"] = limit
+    return page_params
+
+def lead_cards_context(stream: str, filters: Dict = None, after: tuple = None, limit: int = LEADS_PAGE_SIZE) -> Dict:
+    """Template variables for one page of a stream's lead cards"""
+    filters = filters or {}
+    return dict(
+        stream=stream,
+        page=get_stream_leads_page(stream, after, limit, **filters),
+        filtered=any(value is not None for value in filters.values()),
+        page_params=lead_page_params(filters, limit),
+        page_size=limit
+    )
+
+def render_lead_cards(stream: str, filters: Dict = None, after: tuple = None, limit: int = LEADS_PAGE_SIZE) -> Markup:
+    """Rendered lead cards for one page, cached until the next write"""
+    filters = filters or {}
+    key = ("lead_cards", stream, after, limit, tuple(sorted(filters.items())))
+    return empire_cache.get_or_compute(
+        key, lambda: Markup(render_template("empire_lead_cards.html", **lead_cards_context(stream, filters, after, limit))))
+
+def leads_context(filters: Dict = None, active_stream: str = None, after: tuple = None,
+                  limit: int = LEADS_PAGE_SIZE) -> Dict:
+    """Template variables for the leads interface; only the active stream's cards
+    are rendered, the other tabs fetch theirs when first opened"""
+    filters = filters or {}
+    limit = max(1, min(limit, LEADS_MAX_PAGE_SIZE))
+    active_stream = active_stream if active_stream in EMPIRE_REVENUE_STREAMS else EMPIRE_REVENUE_STREAMS[0]
+    stream_rollups = get_stream_rollups()
+    return dict(
+        streams=EMPIRE_REVENUE_STREAMS,
+        stream_rollups=stream_rollups,
+        total_leads=sum(rollup["lead_count"] for rollup in stream_rollups.values()),
+        total_pipeline=sum(rollup["pipeline_value"] for rollup in stream_rollups.values()),
+        active_stream=active_stream,
+        active_fragment=render_lead_cards(active_stream, filters, after, limit),
+        active_first_page=after is None,
+        filters=filters,
+        page_params=lead_page_params(filters, limit),
+        lead_stages=LEAD_STAGES,
+        lead_industries=LEAD_INDUSTRIES,
+        lead_company_sizes=LEAD_COMPANY_SIZES
+    )
 
 # FULLY WORKING ROUTES - All buttons functional with database updates
 @app.route('/')
+@conditional_get
 def empire_dashboard():
     """Complete empire dashboard"""
     try:
-        data = get_empire_data()
-        update_empire_metrics()  # Update metrics from database
-        
-        return render_template_string(
-            EMPIRE_DASHBOARD,
-            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-            **data
-        )
+        return render_template("empire_dashboard.html", **dashboard_context())
     except Exception as e:
         return f"Empire Dashboard Error: {e}", 500
 
 @app.route('/empire-leads')
+@conditional_get
 def empire_leads():
     """Empire leads management interface with real data"""
     try:
-        stream_leads = get_empire_leads_by_stream()
-        return render_template_string(EMPIRE_LEADS_INTERFACE, stream_leads=stream_leads)
+        after = request.args.get('after')
+        context = leads_context(
+            filters=lead_filters(request.args),
+            active_stream=request.args.get('stream'),
+            after=decode_leads_cursor(after) if after else None,
+            limit=request.args.get('limit', LEADS_PAGE_SIZE, type=int)
+        )
+        return render_template("empire_leads.html", **context)
+    except ValueError as e:
+        return f"Empire Leads Error: {e}", 400
     except Exception as e:
         return f"Empire Leads Error: {e}", 500
 
+@app.route('/empire-leads/fragment')
+@conditional_get
+def empire_leads_fragment():
+    """One page of a stream's lead cards as an HTML fragment, or as JSON with ?format=json"""
+    try:
+        stream = request.args.get('stream')
+        if stream not in EMPIRE_REVENUE_STREAMS:
+            return jsonify({"status": "error", "error": "Unknown revenue stream"}), 400
+        after = request.args.get('after')
+        after = decode_leads_cursor(after) if after else None
+        filters = lead_filters(request.args)
+        limit = max(1, min(request.args.get('limit', LEADS_PAGE_SIZE, type=int), LEADS_MAX_PAGE_SIZE))
+        
+        if request.args.get('format') == 'json':
+            return jsonify({"status": "success", "stream": stream, **get_stream_leads_page(stream, after, limit, **filters)})
+        return render_lead_cards(stream, filters, after, limit)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+def run_lead_generation(progress: JobProgress, category: str = "all", count: int = 25) -> Dict:
+    """Lead generation job: generate, save and publish leads"""
+    leads = empire_lead_generator.generate_empire_leads(category=category, count=count, progress=progress)
+    # Totals come from the checkpoint so they include categories saved before a restart
+    saved = progress.checkpoint
+    total_value = saved.get("pipeline_value", sum(lead.get('deal_value', 0) for lead in leads))
+    streams = saved.get("streams", list(set(lead.get('revenue_stream', '') for lead in leads)))
+    leads_generated = saved.get("leads_saved", len(leads))
+    
+    # Update empire metrics after generating leads
+    leads_by_stream = {}
+    for lead in leads:
+        leads_by_stream[lead['revenue_stream']] = leads_by_stream.get(lead['revenue_stream'], 0) + 1
+    metrics_service.record_leads(len(leads), by_stream=leads_by_stream)
+    data_version.bump()
+    event_broadcaster.publish("leads", {"leads": [
+        {key: lead[key] for key in ("id", "name", "company", "title", "revenue_stream", "icp_score", "deal_value")}
+        for lead in leads
+    ]})
+    publish_dashboard_update()
+    
+    log_activity("Lead Generation", f"Generated {leads_generated} empire leads", f"${total_value:,} pipeline value")
+    
+    print(f"✅ Generated {leads_generated} leads with total value ${total_value:,}")
+    progress(1, 1, f"Generated {leads_generated} leads")
+    
+    return {
+        "status": "success",
+        "leads_generated": leads_generated,
+        "message": f"Generated {leads_generated} empire leads across all revenue streams",
+        "revenue_potential": total_value,
+        "streams_covered": streams
+    }
+
+def run_content_creation(progress: Callable, pieces: int = None, platforms: List[str] = None) -> Dict:
+    """Content creation job: generate content pieces across platforms and save them in batches"""
+    if pieces is None:
+        pieces = random.randint(8, 15)
+    # A resumed job keeps its first attempt's plan: cached generations are reused, saved pieces skipped
+    report = content_pipeline.create_for_job(progress, pieces, platforms)
+    if report["failed"] and not report["saved"]:
+        raise RuntimeError(f"All {report['failed']} content generations failed")
+    
+    # Update empire metrics
+    metrics_service.record_content(report["saved"])
+    data_version.bump()
+    publish_dashboard_update()
+    
+    generate = report["stages"]["generate"]
+    log_activity("Content Creation", f"Created {report['saved']} content pieces",
+                 f"Platforms: {', '.join(report['platforms'])}; {generate['mean_ms']}ms mean generation via {report['provider']}")
+    
+    return {
+        "status": "success",
+        "content_created": report["saved"],
+        "platforms": report["platforms"],
+        "report": report
+    }
+
+def accepted_job(kind: str, **params):
+    """Queue a job and answer 202 Accepted pointing at its status URL"""
+    job = job_manager.submit(kind, **params)
+    status_url = url_for('api_job', job_id=job["id"])
+    response = jsonify({"status": "accepted", "job_id": job["id"], "status_url": status_url, "job": job})
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+def lead_generation_params(default_count: int) -> Dict:
+    """category/count for a lead generation job from an optional JSON body"""
+    data = request.get_json(silent=True) or {}
+    category = data.get('category', 'all')
+    if category != 'all' and category not in COMPLETE_ICP_CRITERIA:
+        raise ValueError(f"Unknown category {category}")
+    count = int(data.get('count', default_count))
+    if not 1 <= count <= 500:
+        raise ValueError("count must be between 1 and 500")
+    return {"category": category, "count": count}
+
 @app.route('/generate-leads', methods=['POST'])
 def generate_leads():
-    """Generate leads for complete empire - WORKING WITH DATABASE"""
+    """Generate leads for complete empire - runs as a background job"""
     try:
-        leads = empire_lead_generator.generate_empire_leads(category="all", count=25)
-        total_value = sum(lead.get('deal_value', 0) for lead in leads)
-        streams = list(set(lead.get('revenue_stream', '') for lead in leads))
-        
-        # Update empire metrics after generating leads
-        update_empire_metrics()
-        
-        log_activity("Lead Generation", f"Generated {len(leads)} empire leads", f"${total_value:,} pipeline value")
-        
-        print(f"✅ Generated {len(leads)} leads with total value ${total_value:,}")
-        
-        return jsonify({
-            "status": "success",
-            "leads_generated": len(leads),
-            "revenue_potential": total_value,
-            "streams_covered": streams
-        })
+        return accepted_job("generate_leads", **lead_generation_params(25))
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
     except Exception as e:
         print(f"❌ Error in generate_leads: {e}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route('/api/generate-empire-leads', methods=['POST'])
+def generate_empire_leads():
+    """Generate leads for complete empire (API) - runs as a background job"""
+    try:
+        return accepted_job("generate_leads", **lead_generation_params(20))
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
 @app.route('/create-content', methods=['POST'])
 def create_content():
-    """Create content across all platforms - WORKING WITH DATABASE"""
+    """Create content across all platforms - runs as a background job"""
+    try:
+        data = request.get_json(silent=True) or {}
+        params = {}
+        if data.get('pieces') is not None:
+            params["pieces"] = int(data['pieces'])
+            if not 1 <= params["pieces"] <= 500:
+                return jsonify({"status": "error", "error": "pieces must be between 1 and 500"}), 400
+        if data.get('platforms'):
+            unknown = [platform for platform in data['platforms'] if platform not in PLATFORM_FORMATS]
+            if unknown:
+                return jsonify({"status": "error", "error": f"Unknown platforms {', '.join(unknown)}"}), 400
+            params["platforms"] = data['platforms']
+        return accepted_job("create_content", **params)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/jobs')
+def api_jobs():
+    """Job queue depth by state and this process's worker counters"""
+    try:
+        return jsonify({"status": "success", **job_manager.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/scheduler')
+def api_scheduler():
+    """Recurring task schedule, run counts and timings"""
     try:
-        content_pieces = random.randint(8, 15)
-        platforms = ["LinkedIn", "YouTube", "Blog", "Newsletter", "Twitter"]
+        return jsonify({"status": "success", **empire_scheduler.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/followups', methods=['GET', 'POST'])
+def api_followups():
+    """Schedule a lead's follow-up (JSON lead_id plus days or due_ts), or follow-up counts on GET"""
+    try:
+        if request.method == 'GET':
+            return jsonify({"status": "success", **followup_scheduler.stats()})
+        data = request.get_json(silent=True) or {}
+        lead_id = data.get('lead_id')
+        if not lead_id:
+            return jsonify({"status": "error", "error": "lead_id is required"}), 400
+        if data.get('due_ts') is not None:
+            due_ts = float(data['due_ts'])
+        else:
+            days = float(data.get('days', EMPIRE_FOLLOWUP_DAYS))
+            if not 0 <= days <= 365:
+                return jsonify({"status": "error", "error": "days must be between 0 and 365"}), 400
+            due_ts = time.time() + days * 86400
+        conn = sqlite3.connect('empire_business.db')
+        exists = conn.execute("SELECT 1 FROM leads WHERE id = ?", (lead_id,)).fetchone()
+        conn.close()
+        if not exists:
+            return jsonify({"status": "error", "error": f"Unknown lead {lead_id}"}), 404
+        follow_up = followup_scheduler.schedule(lead_id, due_ts, method=data.get('method', 'email'), note=data.get('note'))
+        return jsonify({"status": "success", "follow_up": follow_up}), 201
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/rate-limits')
+def api_rate_limits():
+    """Per-provider quota buckets shared by every worker"""
+    try:
+        return jsonify({"status": "success", "buckets": rate_limiter.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/providers')
+def api_providers():
+    """Circuit state, concurrency limit and call outcomes per outbound provider (this worker)"""
+    try:
+        return jsonify({"status": "success", "clients": [client.stats() for client in provider_clients.values()]})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """State, progress and result of a background job"""
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"status": "error", "error": f"Unknown job {job_id}"}), 404
+        return jsonify({"status": "success", "job": job})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/contact-empire-lead', methods=['POST'])
+def contact_empire_lead():
+    """Record a contact attempt on an empire lead - WORKING WITH DATABASE"""
+    try:
+        data = request.get_json(silent=True) or {}
+        lead_id = data.get('lead_id')
+        method = data.get('method', 'email')
+        if not lead_id:
+            return jsonify({"status": "error", "error": "lead_id is required"}), 400
         
-        # Save content to database
         conn = sqlite3.connect('empire_business.db')
         cursor = conn.cursor()
         
-        for i in range(content_pieces):
-            platform = random.choice(platforms)
-            cursor.execute("""INSERT INTO content_pieces 
-                            (title, platform, content_type, status, engagement_score, created_at)
-                            VALUES (?, ?, ?, ?, ?, ?)""",
-                          (f"Content Piece {i+1}", platform, "Generated", "Published", 
-                           random.uniform(0.7, 0.95), datetime.now().isoformat()))
+        now = datetime.now()
+        cursor.execute("""
+            UPDATE leads 
+            SET contact_attempts = contact_attempts + 1, 
+                last_contact = ?,
+                updated_at = ?,
+                last_contact_ts = ?,
+                updated_ts = ?
+            WHERE id = ?
+        """, (now.isoformat(), now.isoformat(), to_epoch(now), to_epoch(now), lead_id))
+        if cursor.rowcount == 0:
+            conn.close()
+            return jsonify({"status": "error", "error": f"Unknown lead {lead_id}"}), 404
+        
+        cursor.execute("""
+            INSERT INTO lead_activities 
+            (lead_id, activity_type, description, timestamp, timestamp_ts)
+            VALUES (?, ?, ?, ?, ?)
+        """, (lead_id, "contact", f"Empire contact attempted via {method}", now.isoformat(), to_epoch(now)))
         
         conn.commit()
         conn.close()
+        follow_up = followup_scheduler.schedule(lead_id, time.time() + EMPIRE_FOLLOWUP_DAYS * 86400,
+                                                note=f"Follow-up after {method} contact")
+        data_version.bump()
+        publish_dashboard_update()
         
-        # Update empire metrics
-        update_empire_metrics()
-        
-        log_activity("Content Creation", f"Created {content_pieces} content pieces", f"Platforms: {', '.join(platforms)}")
-        
         return jsonify({
             "status": "success",
-            "content_created": content_pieces,
-            "platforms": platforms
+            "message": f"Empire contact initiated via {method}",
+            "lead_id": lead_id,
+            "follow_up": follow_up
+        })
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/metrics')
+@conditional_get
+def api_metrics():
+    """Dashboard values and activities changed since the ?since= cursor"""
+    try:
+        seq, activity_id = metrics_feed.parse_cursor(request.args.get('since'))
+        current_seq = metrics_feed.observe(dashboard_metrics(get_empire_data()))
+        activities = get_activities_since(activity_id)
+        latest_activity_id = activities[0]["id"] if activities else activity_id
+        return jsonify({
+            "status": "success",
+            "full": seq is None,
+            "cursor": metrics_feed.cursor(current_seq, latest_activity_id),
+            "metrics": metrics_feed.changes_since(seq),
+            "activities": activities,
+            "timestamp": data_updated_at()
         })
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of metric deltas, new activities and new leads"""
+    client_queue = event_broadcaster.subscribe()
+    if client_queue is None:
+        return jsonify({"status": "error", "error": "Too many live connections"}), 503
+    return Response(
+        event_broadcaster.stream(client_queue),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/timeseries')
+def timeseries():
+    """Pre-aggregated metric buckets for trend charts"""
+    try:
+        metric = request.args.get('metric', 'revenue')
+        resolution = request.args.get('resolution', 'hour')
+        if resolution not in RESOLUTIONS:
+            return jsonify({"status": "error", "error": f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+        end = int(request.args.get('end', time.time()))
+        start = int(request.args.get('start', end - 30 * RESOLUTIONS[resolution]))
+        buckets = empire_timeseries.query(
+            metric, start, end,
+            resolution=resolution,
+            stream=request.args.get('stream'),
+            total=request.args.get('total') == '1'
+        )
+        return jsonify({
+            "status": "success",
+            "metric": metric,
+            "resolution": resolution,
+            "start": start,
+            "end": end,
+            "buckets": buckets
+        })
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/forecast')
+@conditional_get
+def api_forecast():
+    """Per-stream revenue forecast behind the annual projection"""
+    try:
+        return jsonify({"status": "success", **get_revenue_forecast()})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """Read cache hit/miss statistics"""
+    return jsonify({**empire_cache.stats(), "compression": response_compressor.stats(), "providers": provider_cache.stats()})
+
 @app.route('/optimize-revenue', methods=['POST'])
 def optimize_revenue():
     """Optimize revenue across all streams - WORKING WITH DATABASE"""
@@ -1230,44 +1790,193 @@ def optimize_revenue():
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+def run_outreach(progress: JobProgress, stream: str = None, limit: int = 50) -> Dict:
+    """Outreach job: email the best uncontacted prospects"""
+    leads = outreach_engine.select_leads(stream=stream, limit=limit)
+    targets = sorted({lead["revenue_stream"] for lead in leads if lead["revenue_stream"]})
+    progress(0, len(leads), f"Sending to {len(leads)} leads")
+    report = outreach_engine.run(leads, progress=progress)
+    
+    if report["sent"]:
+        data_version.bump()
+        publish_dashboard_update()
+    if report["dry_run"]:
+        log_activity("Client Outreach", f"Rendered {report['rendered']} outreach emails (SMTP not configured)", f"Targets: {', '.join(targets)}")
+    else:
+        log_activity("Client Outreach", f"Sent {report['sent']} outreach emails", f"{report['messages_per_second']} msgs/s, {report['failed']} failed")
+    
+    return {
+        "status": "success",
+        "emails_sent": report["sent"],
+        "targets": targets,
+        "report": report
+    }
+
+def run_followup_dispatch(progress: JobProgress, followup_ids: List[int]) -> Dict:
+    """Follow-up job: send the follow-ups the timing wheel found due (each one at most once)"""
+    claimed = followup_scheduler.claim(followup_ids)
+    lead_ids = [followup["lead_id"] for followup in claimed]
+    leads = []
+    if lead_ids:
+        conn = sqlite3.connect('empire_business.db', timeout=30)
+        conn.row_factory = sqlite3.Row
+        leads = [dict(row) for row in conn.execute(
+            f"""SELECT id, name, email, company, title, industry, revenue_stream FROM leads
+                WHERE email LIKE '%_@_%' AND id IN ({', '.join('?' * len(lead_ids))})""", lead_ids).fetchall()]
+        conn.close()
+    progress(0, len(leads), f"Following up with {len(leads)} leads")
+    report = outreach_engine.run(leads, progress=progress, follow_up=True)
+    
+    if report["sent"]:
+        data_version.bump()
+        publish_dashboard_update()
+    if leads:
+        log_activity("Follow-ups", f"{'Rendered' if report['dry_run'] else 'Sent'} {len(leads)} follow-up emails", f"{report['failed']} failed")
+    
+    return {
+        "status": "success",
+        "followups": len(claimed),
+        "emails_sent": report["sent"],
+        "report": report
+    }
+
+def run_empire_analysis(progress: Callable) -> Dict:
+    """Analysis job: funnel, contact-effectiveness and cohort analysis"""
+    report = analysis_engine.run()
+    insights = report["insights"]
+    
+    log_activity("Empire Analysis", "Complete empire analysis performed", f"Key insights: {len(insights)} recommendations")
+    progress(1, 1, f"{len(insights)} insights")
+    
+    return {
+        "status": "success",
+        "insights": insights,
+        "report": report
+    }
+
+def run_lead_rescore(progress: JobProgress, batch_size: int = 1000) -> Dict:
+    """Rescore job: recompute every lead's ICP score in id order, one checkpointed batch at a time"""
+    state = {"after_id": "", "processed": 0, "changed": 0, **progress.checkpoint}
+    conn = sqlite3.connect('empire_business.db', timeout=30)
+    cursor = conn.cursor()
+    total = cursor.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    while True:
+        cursor.execute("""SELECT id, category, title, industry, company_size, icp_score
+                          FROM leads WHERE id > ? ORDER BY id LIMIT ?""", (state["after_id"], batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        now = datetime.now()
+        updates = []
+        for lead_id, category, title, industry, company_size, icp_score in rows:
+            if category not in COMPLETE_ICP_CRITERIA:
+                continue
+            # Scored from the contact fields alone, as at generation (notes are generated text)
+            score = round(empire_lead_generator._calculate_empire_icp_score(
+                {"title": title or "", "industry": industry or "", "size": company_size}, category), 2)
+            if score != icp_score:
+                updates.append((score, now.isoformat(), to_epoch(now), lead_id))
+        cursor.executemany("UPDATE leads SET icp_score = ?, updated_at = ?, updated_ts = ? WHERE id = ?", updates)
+        # The batch and the position after it commit together: a restart never redoes or skips rows
+        progress.save_checkpoint(cursor, {
+            "after_id": rows[-1][0],
+            "processed": state["processed"] + len(rows),
+            "changed": state["changed"] + len(updates)
+        })
+        conn.commit()
+        state = progress.checkpoint
+        progress(state["processed"], total, f"Rescored {state['processed']:,} of {total:,} leads")
+    conn.close()
+    
+    if state["changed"]:
+        data_version.bump()
+        publish_dashboard_update()
+    log_activity("Lead Rescoring", f"Rescored {state['processed']} empire leads", f"{state['changed']} ICP scores changed")
+    
+    return {
+        "status": "success",
+        "leads_rescored": state["processed"],
+        "scores_changed": state["changed"]
+    }
+
+# Interactive actions first; identical queued jobs (e.g. repeated analysis clicks) collapse into one
+job_manager.register("generate_leads", run_lead_generation, priority=10)
+job_manager.register("create_content", run_content_creation, priority=5)
+job_manager.register("send_outreach", run_outreach, priority=5)
+job_manager.register("run_analysis", run_empire_analysis, priority=0)
+job_manager.register("rescore_leads", run_lead_rescore, priority=0)
+job_manager.register("followup_dispatch", run_followup_dispatch, priority=5)
+
+def run_metrics_rollup(progress: Callable) -> Dict:
+    """Rollup job: flush counters and roll hourly buckets up to daily/weekly"""
+    metrics_service.flush()
+    empire_timeseries.rollup()
+    progress(1, 1, "Rolled up metric buckets")
+    return {"status": "success"}
+
+# Recurring automation: (name, job function, minutes between runs, jitter minutes, priority);
+# EMPIRE_SCHEDULE_<NAME>_MINUTES overrides an interval. Scheduled runs queue behind button clicks
+SCHEDULED_TASKS = [
+    ("lead_generation", run_lead_generation, 60, 5, -5),
+    ("content_creation", run_content_creation, 120, 10, -5),
+    ("metrics_rollup", run_metrics_rollup, 15, 1, 0)
+]
+# Scheduled outreach emails real people, so it needs its own switch on top of EMPIRE_SCHEDULER
+if os.environ.get('EMPIRE_SCHEDULE_OUTREACH', '0') == '1':
+    SCHEDULED_TASKS.append(("outreach", run_outreach, 240, 15, -5))
+for task_name, task_handler, every_minutes, jitter_minutes, task_priority in SCHEDULED_TASKS:
+    empire_scheduler.add(
+        task_name, task_handler,
+        every_minutes=float(os.environ.get(f'EMPIRE_SCHEDULE_{task_name.upper()}_MINUTES', every_minutes)),
+        jitter_minutes=jitter_minutes,
+        priority=task_priority
+    )
+
 @app.route('/send-outreach', methods=['POST'])
 def send_outreach():
-    """Send personalized outreach - WORKING WITH DATABASE"""
+    """Send personalized outreach - runs as a background job"""
     try:
-        emails_sent = random.randint(25, 50)
-        targets = ["Job Search Clients", "Health Management Prospects", "Speaking Opportunities", "Retreat Organizers"]
-        
-        log_activity("Client Outreach", f"Sent {emails_sent} outreach emails", f"Targets: {', '.join(targets)}")
-        
-        return jsonify({
-            "status": "success",
-            "emails_sent": emails_sent,
-            "targets": targets
-        })
+        data = request.get_json(silent=True) or {}
+        stream = data.get('stream')
+        if stream and stream not in EMPIRE_REVENUE_STREAMS:
+            return jsonify({"status": "error", "error": f"Unknown stream {stream}"}), 400
+        limit = int(data.get('limit', 50))
+        if not 1 <= limit <= 5000:
+            return jsonify({"status": "error", "error": "limit must be between 1 and 5000"}), 400
+        return accepted_job("send_outreach", stream=stream, limit=limit)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/rescore-leads', methods=['POST'])
+def rescore_leads():
+    """Recompute every lead's ICP score - runs as a resumable background job"""
+    try:
+        data = request.get_json(silent=True) or {}
+        batch_size = int(data.get('batch_size', 1000))
+        if not 1 <= batch_size <= 50000:
+            return jsonify({"status": "error", "error": "batch_size must be between 1 and 50000"}), 400
+        return accepted_job("rescore_leads", batch_size=batch_size)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
 @app.route('/run-analysis', methods=['POST'])
 def run_analysis():
-    """Run empire analysis - WORKING WITH DATABASE"""
+    """Run empire analysis - runs as a background job"""
     try:
-        insights = [
-            "Revenue streams performing 15% above target",
-            "Speaking engagements showing highest ROI",
-            "Health management has 3x conversion rate",
-            "Retreat hosting pipeline value increased 40%"
-        ]
-        
-        log_activity("Empire Analysis", "Complete empire analysis performed", f"Key insights: {len(insights)} recommendations")
-        
-        return jsonify({
-            "status": "success",
-            "insights": insights
-        })
+        return accepted_job("run_analysis")
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+# Started last so every job kind and scheduled task is registered first;
+# serve.py defers the threads until after the workers fork
+if os.environ.get('EMPIRE_DEFER_BACKGROUND') != '1':
+    start_background_services()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"🏰 Starting Dr. Dédé's FINAL WORKING $50M+ AI Empire System on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
@@ -1142,4 +1142,4 @@ def run_analysis():
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"🏰 Starting Dr. Dédé's WORKING $50M+ AI Empire System on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG') == '1')
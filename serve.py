@@ -0,0 +1,101 @@
+"""
+Empire production server - runs an entry module under gunicorn
+Threaded workers, preloading, graceful restarts and keep-alive are configured
+from the command line or EMPIRE_* environment variables:
+
+    python serve.py --workers 4 --threads 8
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+def _hook(module_name: str, function_name: str):
+    """Call an optional function of the (already imported) entry module"""
+    module = sys.modules.get(module_name)
+    function = getattr(module, function_name, None)
+    if function:
+        function()
+
+class EmpireApplication(BaseApplication):
+    """Gunicorn application serving the Flask app of an entry module"""
+
+    def __init__(self, module_name: str, options: dict):
+        self.module_name = module_name
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return importlib.import_module(self.module_name).app
+
+def build_options(args) -> dict:
+    module_name = args.module
+
+    def post_worker_init(worker):
+        # Threads started in the master do not survive fork
+        _hook(module_name, "start_background_services")
+
+    def worker_exit(server, worker):
+        module = sys.modules.get(module_name)
+        # Let in-flight jobs finish; anything cut off is requeued once its lease lapses
+        for service in ("followup_scheduler", "empire_scheduler", "job_manager", "metrics_service"):
+            if getattr(module, service, None):
+                getattr(module, service).stop()
+
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "preload_app": args.preload,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": args.keep_alive,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "accesslog": "-" if args.access_log else None,
+        "post_worker_init": post_worker_init,
+        "worker_exit": worker_exit
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the empire app with gunicorn")
+    parser.add_argument("--module", default=os.environ.get("EMPIRE_APP_MODULE", "final_working_empire"),
+                        help="entry module exposing the Flask app")
+    parser.add_argument("--bind", default=os.environ.get("EMPIRE_BIND", f"0.0.0.0:{os.environ.get('PORT', 5000)}"))
+    parser.add_argument("--workers", type=int,
+                        default=_env_int("EMPIRE_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+    # Every open live dashboard (/api/stream) holds one thread
+    parser.add_argument("--threads", type=int, default=_env_int("EMPIRE_THREADS", 8))
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        default=os.environ.get("EMPIRE_PRELOAD", "1") == "1",
+                        help="import the app in each worker instead of once in the master")
+    parser.add_argument("--timeout", type=int, default=_env_int("EMPIRE_TIMEOUT", 30))
+    parser.add_argument("--graceful-timeout", type=int, default=_env_int("EMPIRE_GRACEFUL_TIMEOUT", 30))
+    parser.add_argument("--keep-alive", type=int, default=_env_int("EMPIRE_KEEPALIVE", 5))
+    parser.add_argument("--max-requests", type=int, default=_env_int("EMPIRE_MAX_REQUESTS", 0),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    # Workers share one data version and start their threads after forking
+    os.environ.setdefault("EMPIRE_VERSION_FILE", "empire_business.db.version")
+    os.environ["EMPIRE_DEFER_BACKGROUND"] = "1"
+
+    print(f"🏰 Serving {args.module} on {args.bind} with {args.workers} workers x {args.threads} threads")
+    EmpireApplication(args.module, build_options(args)).run()
+
+if __name__ == '__main__':
+    main()
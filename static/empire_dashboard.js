@@ -0,0 +1,171 @@
+function showJobProgress(label) {
+    return progress => {
+        const done = progress.total ? ` (${progress.done}/${progress.total})` : '';
+        document.title = `${label}${done} - ${progress.message || 'working'}`;
+    };
+}
+
+const pageTitle = document.title;
+
+// Working button functions with database updates
+function generateEmpireLeads() {
+    runJob('/generate-leads', showJobProgress('Generating leads'))
+        .then(data => {
+            document.title = pageTitle;
+            alert(`✅ REAL LEADS GENERATED & SAVED!\n\n${data.leads_generated} empire leads created and saved to database!\n\nTotal Pipeline Value: $${data.revenue_potential.toLocaleString()}\n\nStreams: ${data.streams_covered.join(', ')}\n\n💾 Click "View Empire Leads" to see them!`);
+            // Redirect to leads page to show results
+            setTimeout(() => window.open('/empire-leads', '_blank'), 1500);
+        })
+        .catch(error => {
+            document.title = pageTitle;
+            console.error('Error:', error);
+            alert('❌ Error: ' + error.message);
+        });
+}
+
+function createContent() {
+    runJob('/create-content', showJobProgress('Creating content'))
+        .then(data => {
+            document.title = pageTitle;
+            alert(`✅ CONTENT CREATED & SAVED!\n\n${data.content_created} pieces created and saved to database!\n\nPlatforms: ${data.platforms.join(', ')}\n\n📈 Content pipeline updated!\n\n🔄 Dashboard will refresh automatically.`);
+            refreshMetrics();
+        })
+        .catch(error => {
+            document.title = pageTitle;
+            alert('❌ Error: ' + error.message);
+        });
+}
+
+function optimizeRevenue() {
+    fetch('/optimize-revenue', {method: 'POST'})
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert(`✅ REVENUE OPTIMIZED & TRACKED!\n\n$${data.additional_revenue.toLocaleString()} additional revenue identified!\n\nOptimizations: ${data.optimizations.join(', ')}\n\n💰 Revenue metrics updated in database!`);
+                refreshMetrics();
+            } else {
+                alert('❌ Error: ' + data.error);
+            }
+        })
+        .catch(error => {
+            alert('⚠️ Network error. Revenue optimization may still be processing.');
+        });
+}
+
+function sendOutreach() {
+    runJob('/send-outreach', showJobProgress('Sending outreach'))
+        .then(data => {
+            document.title = pageTitle;
+            if (data.report.dry_run) {
+                alert(`📝 OUTREACH DRY RUN\n\n${data.report.rendered} personalized emails rendered, none sent - set EMPIRE_SMTP_HOST to send them.\n\nTargets: ${data.targets.join(', ')}`);
+            } else {
+                alert(`✅ OUTREACH SENT & LOGGED!\n\n${data.emails_sent} emails sent and tracked in database (${data.report.messages_per_second} msgs/s)!\n\nTargets: ${data.targets.join(', ')}\n\n📧 All outreach activities logged!`);
+            }
+            refreshMetrics();
+        })
+        .catch(error => {
+            document.title = pageTitle;
+            alert('❌ Error: ' + error.message);
+        });
+}
+
+function runAnalysis() {
+    runJob('/run-analysis', showJobProgress('Running analysis'))
+        .then(data => {
+            document.title = pageTitle;
+            alert(`✅ EMPIRE ANALYSIS COMPLETE!\n\nKey Insights Saved to Database:\n• ${data.insights.join('\n• ')}\n\n📊 All analysis results logged!`);
+            refreshMetrics();
+        })
+        .catch(error => {
+            document.title = pageTitle;
+            alert('❌ Error: ' + error.message);
+        });
+}
+
+// Live metrics: patch changed values in place instead of reloading the page
+let metricsCursor = document.body.dataset.metricsCursor;
+
+function applyMetric(el, value) {
+    const format = el.dataset.format;
+    if (format === 'currency') {
+        el.textContent = '$' + Number(value).toLocaleString();
+    } else if (format === 'number') {
+        el.textContent = Number(value).toLocaleString();
+    } else if (format === 'width') {
+        el.style.width = value + '%';
+    } else {
+        el.textContent = value;
+    }
+}
+
+const shownActivities = new Set();
+
+function applyMetrics(metrics) {
+    Object.entries(metrics).forEach(([key, value]) => {
+        document.querySelectorAll(`[data-metric="${key}"]`).forEach(el => applyMetric(el, value));
+    });
+}
+
+function addActivity(activity) {
+    if (shownActivities.has(activity.id)) return;
+    shownActivities.add(activity.id);
+    const feed = document.getElementById('activity-feed');
+    const row = document.createElement('div');
+    row.className = 'revenue-stream';
+    const name = document.createElement('span');
+    name.className = 'stream-name';
+    name.textContent = activity.action_type;
+    const result = document.createElement('span');
+    result.className = 'stream-value';
+    result.textContent = activity.result;
+    row.append(name, result);
+    row.title = activity.description + ' (' + activity.timestamp + ')';
+    feed.prepend(row);
+    while (feed.children.length > 10) feed.lastElementChild.remove();
+}
+
+function refreshMetrics() {
+    fetch('/api/metrics?since=' + encodeURIComponent(metricsCursor))
+        .then(response => response.json())
+        .then(data => {
+            if (data.status !== 'success') return;
+            metricsCursor = data.cursor;
+            applyMetrics(data.metrics);
+            data.activities.slice().reverse().forEach(addActivity);
+            document.getElementById('last-updated').textContent = data.timestamp;
+        })
+        .catch(error => console.error('Metrics refresh failed:', error));
+}
+
+function showNewLeads(leads) {
+    const list = document.getElementById('new-leads');
+    leads.slice(0, 5).forEach(lead => {
+        const row = document.createElement('div');
+        row.className = 'revenue-stream';
+        const name = document.createElement('span');
+        name.className = 'stream-name';
+        name.textContent = `🆕 ${lead.name} (${lead.company})`;
+        const value = document.createElement('span');
+        value.className = 'stream-value';
+        value.textContent = '$' + Number(lead.deal_value).toLocaleString();
+        row.append(name, value);
+        row.title = `${lead.title} - ${lead.revenue_stream} - ICP ${lead.icp_score}`;
+        list.prepend(row);
+    });
+    while (list.children.length > 5) list.lastElementChild.remove();
+}
+
+// Live updates pushed over Server-Sent Events; polling is the fallback
+if (window.EventSource) {
+    const events = new EventSource('/api/stream');
+    events.addEventListener('metrics', e => applyMetrics(JSON.parse(e.data).metrics));
+    events.addEventListener('activity', e => addActivity(JSON.parse(e.data)));
+    events.addEventListener('leads', e => showNewLeads(JSON.parse(e.data).leads));
+    setInterval(refreshMetrics, 300000);
+} else {
+    setInterval(refreshMetrics, 30000);
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('#activity-feed [data-activity-id]').forEach(el => shownActivities.add(Number(el.dataset.activityId)));
+});
@@ -0,0 +1,23 @@
+// Long-running actions answer 202 with a job; poll /api/jobs/<id> until it finishes
+function runJob(url, onProgress) {
+    return fetch(url, {method: 'POST'})
+        .then(response => response.json())
+        .then(data => {
+            if (data.status !== 'accepted') throw new Error(data.error);
+            return pollJob(data.status_url, onProgress);
+        });
+}
+
+function pollJob(statusUrl, onProgress, delay = 250) {
+    return new Promise(resolve => setTimeout(resolve, delay))
+        .then(() => fetch(statusUrl))
+        .then(response => response.json())
+        .then(data => {
+            if (data.status !== 'success') throw new Error(data.error);
+            const job = data.job;
+            if (job.state === 'succeeded') return job.result;
+            if (job.state === 'failed') throw new Error(job.error);
+            if (onProgress) onProgress(job.progress);
+            return pollJob(statusUrl, onProgress, Math.min(delay * 2, 2000));
+        });
+}
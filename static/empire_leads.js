@@ -0,0 +1,126 @@
+// Filters and page size carried into every fragment request
+const PAGE_PARAMS = JSON.parse(document.body.dataset.pageParams);
+
+function fragmentUrl(stream, after) {
+    const params = new URLSearchParams(PAGE_PARAMS);
+    params.set('stream', stream);
+    if (after) params.set('after', after);
+    return '/empire-leads/fragment?' + params.toString();
+}
+
+// Fetch a page of lead cards; the first page replaces the placeholder,
+// later pages replace the page-end marker that requested them
+function loadLeads(category, pageEnd) {
+    const grid = category.querySelector('.leads-grid');
+    return fetch(fragmentUrl(category.dataset.stream, pageEnd ? pageEnd.dataset.next : null))
+        .then(response => {
+            if (!response.ok) throw new Error(response.status);
+            return response.text();
+        })
+        .then(html => {
+            if (pageEnd) {
+                pageEnd.remove();
+            } else {
+                grid.innerHTML = '';
+            }
+            grid.insertAdjacentHTML('beforeend', html);
+            category.dataset.loaded = 'true';
+            observePageEnd(grid);
+        })
+        .catch(error => {
+            if (!pageEnd) category.dataset.loaded = 'false';
+            grid.insertAdjacentHTML('beforeend', '<div class="no-leads">⚠️ Could not load leads. Please try again.</div>');
+        });
+}
+
+// Infinite scroll: load the next page as its marker nears the viewport.
+// Without IntersectionObserver the marker's "Next" link still pages.
+const pageEndObserver = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+        if (!entry.isIntersecting) return;
+        pageEndObserver.unobserve(entry.target);
+        loadLeads(entry.target.closest('.stream-category'), entry.target);
+    });
+}, {rootMargin: '400px'}) : null;
+
+function observePageEnd(grid) {
+    const pageEnd = grid.querySelector('.lead-page-end');
+    if (pageEndObserver && pageEnd) pageEndObserver.observe(pageEnd);
+}
+
+function showStream(stream) {
+    document.querySelectorAll('.stream-category').forEach(el => el.classList.remove('active'));
+    document.querySelectorAll('.tab').forEach(el => el.classList.remove('active'));
+    document.querySelectorAll('.tab').forEach(el => el.classList.add('inactive'));
+
+    const category = document.getElementById(stream.replace(/[^a-zA-Z0-9]/g, ''));
+    category.classList.add('active');
+    document.getElementById('tab-' + stream.replace(/[^a-zA-Z0-9]/g, '')).classList.add('active');
+    document.getElementById('tab-' + stream.replace(/[^a-zA-Z0-9]/g, '')).classList.remove('inactive');
+
+    // Tabs fetch their cards the first time they are opened
+    if (category.dataset.loaded === 'false') {
+        category.dataset.loaded = 'loading';
+        loadLeads(category);
+    }
+}
+
+function contactLead(leadId, method) {
+    fetch('/api/contact-empire-lead', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({lead_id: leadId, method: method})
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                const due = new Date(data.follow_up.due_ts * 1000).toLocaleString();
+                alert(`✅ Contact initiated via ${method}!\n\nLead ID: ${leadId}\nMethod: ${method}\n\n📞 Follow-up scheduled automatically for ${due}.`);
+            } else {
+                alert('❌ Error: ' + data.error);
+            }
+        })
+        .catch(error => {
+            alert('⚠️ Network error. Please try again.');
+        });
+}
+
+function scheduleFollowUp(leadId) {
+    const days = prompt('Follow up in how many days?', '3');
+    if (days === null) {
+        return;
+    }
+    fetch('/api/followups', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({lead_id: leadId, days: Number(days)})
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert(`📅 Follow-up scheduled for ${new Date(data.follow_up.due_ts * 1000).toLocaleString()}`);
+            } else {
+                alert('❌ Error: ' + data.error);
+            }
+        })
+        .catch(error => {
+            alert('⚠️ Network error. Please try again.');
+        });
+}
+
+function generateMoreLeads() {
+    runJob('/generate-leads')
+        .then(data => {
+            alert(`✅ NEW LEADS GENERATED!\n\n${data.leads_generated} additional leads created!\n\nPipeline Value: $${data.revenue_potential.toLocaleString()}\n\n🔄 Page will refresh to show new leads.`);
+            setTimeout(() => location.reload(), 2000);
+        })
+        .catch(error => {
+            alert('⚠️ Error generating leads: ' + error.message);
+        });
+}
+
+// Show the requested stream (first stream by default)
+window.onload = () => {
+    showStream(document.body.dataset.activeStream);
+    document.querySelectorAll('.leads-grid').forEach(observePageEnd);
+};
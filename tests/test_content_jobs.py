@@ -0,0 +1,86 @@
+import json
+import sqlite3
+
+import pytest
+
+from empire_cache import ProviderCache
+from empire_content import CachedProvider, ContentPipeline, TemplateProvider
+from empire_jobs import JobManager, JobProgress
+
+class CountingProvider(TemplateProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate(self, request):
+        self.calls += 1
+        return super().generate(request)
+
+class WorkerDied(Exception):
+    pass
+
+@pytest.fixture
+def setup(tmp_path):
+    db_path = str(tmp_path / "empire.db")
+    jobs = JobManager(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE content_pieces (id INTEGER PRIMARY KEY, title TEXT, platform TEXT, content_type TEXT,
+                    status TEXT, engagement_score REAL, created_at TEXT, created_ts INTEGER)""")
+    jobs.init_schema(conn.cursor())
+    provider = CountingProvider()
+    pipeline = ContentPipeline(CachedProvider(provider, ProviderCache(str(tmp_path / "cache.db"))),
+                               db_path=db_path, concurrency=1, batch_size=5)
+    pipeline.init_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    jobs.register("create_content", lambda progress, pieces: pipeline.create_for_job(progress, pieces))
+    return db_path, jobs, provider, pipeline
+
+def _claim(jobs):
+    job_id, kind, params, checkpoint = jobs._claim()
+    return JobProgress(jobs, job_id, json.loads(checkpoint) if checkpoint else None)
+
+def test_requeued_content_job_replays_its_plan_from_the_cache(setup, monkeypatch):
+    db_path, jobs, provider, pipeline = setup
+    jobs.submit("create_content", pieces=12)
+
+    # First attempt: the worker dies while writing the second batch
+    writes = []
+    original_write = pipeline._write
+
+    def dying_write(rows, checkpoint=None):
+        writes.append(len(rows))
+        if len(writes) == 2:
+            raise WorkerDied()
+        original_write(rows, checkpoint)
+
+    monkeypatch.setattr(pipeline, "_write", dying_write)
+    with pytest.raises(WorkerDied):
+        pipeline.create_for_job(_claim(jobs), 12)
+    monkeypatch.setattr(pipeline, "_write", original_write)
+    first_calls = provider.calls
+    assert first_calls == 12
+
+    # The lease lapses and the job is requeued with its checkpoint
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE jobs SET heartbeat_ts = 0")
+    conn.commit()
+    conn.close()
+    assert jobs.recover() == 1
+    report = pipeline.create_for_job(_claim(jobs), 12)
+
+    assert report["already_saved"] == 5
+    assert report["saved"] == 7
+    assert provider.calls == first_calls
+    assert pipeline.provider.cache.stats()["hits"] == 7
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM content_pieces").fetchone()[0] == 12
+    conn.close()
+
+def test_new_content_jobs_generate_new_requests(setup):
+    db_path, jobs, provider, pipeline = setup
+    for _ in range(2):
+        jobs.submit("create_content", dedup=False, pieces=6)
+        pipeline.create_for_job(_claim(jobs), 6)
+    assert provider.calls == 12
+    assert pipeline.provider.cache.stats()["hits"] == 0
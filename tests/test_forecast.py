@@ -0,0 +1,38 @@
+import sqlite3
+import time
+
+from empire_forecast import EmpireForecaster
+from empire_timeseries import DAY, EMPIRE_STREAM, EmpireTimeSeries, bucket_start
+
+STREAM = "Retreat Hosting"
+
+def _seed(db_path, days):
+    """days: (days ago, revenue, accrued hours) day buckets"""
+    conn = sqlite3.connect(db_path)
+    EmpireTimeSeries(db_path).init_schema(conn.cursor())
+    conn.execute("""CREATE TABLE stream_stage_rollups (revenue_stream TEXT, stage TEXT, lead_count INTEGER,
+                    pipeline_value REAL)""")
+    today = bucket_start(time.time(), "day")
+    for ago, revenue, hours in days:
+        conn.execute("INSERT INTO metric_series VALUES (?, 'revenue', ?, ?, ?)", (DAY, STREAM, today - ago * DAY, revenue))
+        conn.execute("INSERT INTO metric_series VALUES (?, 'accrued_hours', ?, ?, ?)",
+                     (DAY, EMPIRE_STREAM, today - ago * DAY, hours))
+    conn.commit()
+    conn.close()
+
+def test_partial_day_does_not_drag_the_trend_down(tmp_path):
+    db_path = str(tmp_path / "empire.db")
+    # Four full days at 1000/day, then a day the app was only up for 5 hours
+    _seed(db_path, [(5, 1000, 24), (4, 1000, 24), (3, 1000, 24), (2, 1000, 24), (1, 1000 * 5 / 24, 5)])
+    stream = EmpireForecaster(db_path, min_history_days=3).forecast()["streams"][STREAM]
+    assert stream["method"] == "trend"
+    assert stream["history_days"] == 4
+    assert stream["daily_run_rate"] == 1000
+    assert stream["daily_trend"] == 0
+
+def test_too_few_complete_days_falls_back_to_the_baseline(tmp_path):
+    db_path = str(tmp_path / "empire.db")
+    _seed(db_path, [(3, 1000, 24), (2, 400, 10), (1, 1000, 24)])
+    stream = EmpireForecaster(db_path, min_history_days=3).forecast({STREAM: 900})["streams"][STREAM]
+    assert stream["method"] == "baseline"
+    assert stream["daily_run_rate"] == 900
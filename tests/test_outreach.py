@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+from empire_outreach import OutreachEngine
+
+LEADS_SCHEMA = """CREATE TABLE leads (id TEXT PRIMARY KEY, name TEXT, email TEXT, company TEXT, title TEXT,
+                  industry TEXT, revenue_stream TEXT, stage TEXT, icp_score REAL, contact_attempts INTEGER,
+                  last_contact TEXT, last_contact_ts INTEGER, updated_at TEXT, updated_ts INTEGER)"""
+
+def _seed(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.execute(LEADS_SCHEMA)
+    conn.execute("""CREATE TABLE lead_activities (lead_id TEXT, activity_type TEXT, description TEXT,
+                    timestamp TEXT, timestamp_ts INTEGER)""")
+    conn.executemany("""INSERT INTO leads (id, name, email, stage, icp_score, contact_attempts, last_contact_ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+    conn.commit()
+    conn.close()
+
+def test_select_leads_returns_one_row_per_address(tmp_path):
+    db_path = str(tmp_path / "leads.db")
+    # The same person re-inserted under new ids by repeated lead generation runs
+    _seed(db_path, [
+        ("a1", "Amanda", "amanda@growthcapital.com", "prospect", 80, 0, None),
+        ("a2", "Amanda", "Amanda@GrowthCapital.com", "prospect", 90, 0, None),
+        ("a3", "Amanda", "amanda@growthcapital.com", "prospect", 70, 0, None),
+        ("b1", "Ben", "ben@example.com", "prospect", 60, 0, None)
+    ])
+    leads = OutreachEngine(None, db_path=db_path).select_leads(limit=50)
+    assert sorted(lead["id"] for lead in leads) == ["a2", "b1"]
+
+def test_cooldown_and_attempt_cap_apply_per_address(tmp_path):
+    db_path = str(tmp_path / "leads.db")
+    now = int(time.time())
+    _seed(db_path, [
+        # Contacted yesterday under another row: still cooling down
+        ("c1", "Cara", "cara@example.com", "prospect", 90, 1, now - 86400),
+        ("c2", "Cara", "cara@example.com", "prospect", 90, 0, None),
+        # Three attempts spread over duplicate rows reach the cap
+        ("d1", "Dan", "dan@example.com", "prospect", 80, 2, 0),
+        ("d2", "Dan", "dan@example.com", "prospect", 80, 1, 0),
+        # Already qualified under one row: no cold email to the duplicate
+        ("e1", "Eve", "eve@example.com", "qualified", 70, 0, None),
+        ("e2", "Eve", "eve@example.com", "prospect", 70, 0, None),
+        ("f1", "Finn", "finn@example.com", "prospect", 60, 0, None)
+    ])
+    leads = OutreachEngine(None, db_path=db_path, max_attempts=3).select_leads(limit=50)
+    assert [lead["id"] for lead in leads] == ["f1"]
+
+def test_run_mails_each_address_once(tmp_path):
+    db_path = str(tmp_path / "leads.db")
+    _seed(db_path, [])
+    engine = OutreachEngine(None, db_path=db_path)
+    report = engine.run([{"id": "a1", "email": "amanda@growthcapital.com", "name": "Amanda"},
+                         {"id": "a2", "email": "AMANDA@growthcapital.com", "name": "Amanda"}])
+    assert report["rendered"] == 1
@@ -0,0 +1,51 @@
+from email.message import EmailMessage
+
+import smtplib
+import socket
+import time
+
+import pytest
+
+from empire_bench import SMTPSink
+from empire_outreach import OutreachEngine, SMTPPool
+
+def _message(to):
+    message = EmailMessage()
+    message["From"] = "empire@localhost"
+    message["To"] = to
+    message["Subject"] = "Hello"
+    message.set_content("Hi")
+    return message
+
+@pytest.fixture
+def sink():
+    server = SMTPSink(refuse=("gone@example.com",)).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _engine(sink):
+    host, port = sink.server_address
+    return OutreachEngine(SMTPPool(host, port, size=1), domain_per_minute=0)
+
+def test_refused_recipient_is_not_retried_and_keeps_the_session(sink):
+    engine = _engine(sink)
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        engine._deliver(_message("gone@example.com"))
+    engine._deliver(_message("ok@example.com"))
+    engine.pool.close()
+    assert sink.rcpt["gone@example.com"] == 1
+    assert sink.messages == 1
+    assert engine.pool.opened == 1
+
+def test_session_dropped_between_sends_is_retried_once(sink):
+    engine = _engine(sink)
+    engine._deliver(_message("first@example.com"))
+    # The relay drops the pooled session before its idle check would notice
+    smtp, _ = engine.pool._idle.get_nowait()
+    smtp.sock.shutdown(socket.SHUT_RDWR)
+    engine.pool._idle.put((smtp, time.time()))
+    engine._deliver(_message("second@example.com"))
+    engine.pool.close()
+    assert sink.messages == 2
+    assert engine.pool.opened == 2